@@ -1,10 +1,14 @@
 """Analyzer routes for the API."""
+import json
 from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, status, Form
-from privato.app.dependencies import get_analyzer,get_ingestor
+from fastapi.responses import StreamingResponse
+from privato.app.batch import run_batch, spool_upload
+from privato.app.dependencies import get_inference_pool, get_ingestor
 from privato.core.ingestion import Ingestor
 from privato.app.schemas.analyzer import  AnalyzerResponse
-from privato.core.analyzer import Analyzer
-from typing import Annotated
+from privato.core.analysis_store import AnalysisStore, get_analysis_store
+from privato.core.workers import InferencePool, WorkerPoolFullError, WorkerCrashedError, analyze_upload, analyze_uploads
+from typing import Annotated, List
 from privato.core.config import logger,SUPPORTED_LANGUAGES
 
 
@@ -19,14 +23,16 @@ router = APIRouter(
     description="Upload a file (image, text, json, csv) for analysis of sensitive information.",
     response_model=AnalyzerResponse,
 )
-def analyze_file(
+async def analyze_file(
     file: Annotated[UploadFile, File(description="File to be analyzed.")],
     language: Annotated[str, Form(description="Language of the content, e.g., 'en' for English.")] = "en",
-    ingestor: Ingestor = Depends(get_ingestor),
-    analyzer: Analyzer = Depends(get_analyzer)
+    pool: InferencePool = Depends(get_inference_pool),
+    analysis_store: AnalysisStore = Depends(get_analysis_store)
 ):
     """
     Endpoint to upload a file for analysis.
+    The file is analyzed by a worker process, so the server keeps serving other requests meanwhile.
+    The returned `analysis_id` can be passed to the redactor to redact the same file without analyzing it again.
     """
     if language not in SUPPORTED_LANGUAGES:
         raise HTTPException(
@@ -34,15 +40,64 @@ def analyze_file(
             detail=f"Language '{language}' is not supported. Supported languages are: {list(SUPPORTED_LANGUAGES)}"
         )
 
+    path = None
     try:
-        ingested_file, ext = ingestor.ingest(file)
-        analysis_result = analyzer.analyze(ingested_file, data_type=ext, language=language)  
-        logger.info(f"File '{file.filename}' analyzed successfully.")  
-        return AnalyzerResponse(analysis=analysis_result, message="Analysis completed successfully.")
-    
+        # The worker reads the upload from disk, so that it is neither held in memory nor pickled
+        path = await spool_upload(file)
+        analysis_result, ext, content_hash = await pool.run(analyze_upload, path, language=language)
+        # The store lives in the server process, where the redactor route redeems the handle
+        analysis_id = analysis_store.put(analysis_result, data_type=ext, fingerprint=content_hash)
+        logger.info(f"File '{file.filename}' analyzed successfully.")
+        return AnalyzerResponse(analysis=analysis_result, analysis_id=analysis_id, message="Analysis completed successfully.")
+
+    except (WorkerPoolFullError, WorkerCrashedError) as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error during file analysis: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred during file analysis."
         )
+    finally:
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+
+@router.post(
+    path="/batch",
+    summary="Upload many files for analysis",
+    description="Upload many files, or zip archives of files, for analysis. Results are streamed as NDJSON, one line per file.",
+)
+async def analyze_batch(
+    files: Annotated[List[UploadFile], File(description="Files or zip archives to be analyzed.")],
+    language: Annotated[str, Form(description="Language of the content, e.g., 'en' for English.")] = "en",
+    ingestor: Ingestor = Depends(get_ingestor),
+    pool: InferencePool = Depends(get_inference_pool),
+    analysis_store: AnalysisStore = Depends(get_analysis_store)
+):
+    """
+    Endpoint to upload many files for analysis.
+    Files are analyzed in windows, whose texts share one NLP run and whose images one detector batch,
+    and each line is sent as soon as its window is done, in upload order. A line holds the `filename`
+    and either its `data_type`, `analysis` and `analysis_id`, or an `error`.
+    """
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Language '{language}' is not supported. Supported languages are: {list(SUPPORTED_LANGUAGES)}"
+        )
+    windows, cleanup = await run_batch(files, ingestor, pool, analyze_uploads, language=language)
+
+    def to_line(outcome: dict) -> str:
+        if "error" not in outcome:
+            content_hash = outcome.pop("fingerprint")
+            outcome["analysis_id"] = analysis_store.put(outcome["analysis"], data_type=outcome["data_type"],
+                                                        fingerprint=content_hash)
+        return json.dumps(outcome, default=str) + "\n"
+
+    async def lines():
+        async for window in windows:
+            for outcome in window:
+                yield to_line(outcome)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", background=cleanup)
@@ -2,6 +2,7 @@
 from fastapi import APIRouter
 from privato.app.api.routes import redactor
 from privato.app.api.routes import analyzer
+from privato.app.api.routes import jobs
 from privato.core.config import logger
 
 
@@ -13,4 +14,5 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
     )
 router.include_router(redactor.router, tags=["redactor"], prefix="/v1")
-router.include_router(analyzer.router, tags=["analyzer"], prefix="/v1")
\ No newline at end of file
+router.include_router(analyzer.router, tags=["analyzer"], prefix="/v1")
+router.include_router(jobs.router, tags=["jobs"], prefix="/v1")
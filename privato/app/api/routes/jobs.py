@@ -0,0 +1,110 @@
+"""Job routes for the API."""
+import mimetypes
+import shutil
+from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, status, Form
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from privato.app.dependencies import get_job_runner
+from privato.app.schemas.jobs import JobResponse
+from privato.core.jobs import Job, JobStore, JOB_OPERATIONS, get_job_store
+from privato.core.ingestion import Ingestor
+from privato.core.workers import JobRunner
+from pathlib import Path
+from typing import Annotated
+from privato.core.config import logger, SUPPORTED_LANGUAGES
+
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"]
+)
+
+
+def _job_response(job: Job) -> JobResponse:
+    """Build the response describing a job."""
+    return JobResponse(
+        job_id=job.id, operation=job.operation, status=job.status, pages_done=job.pages_done,
+        pages_total=job.pages_total, error=job.error, created_at=job.created_at, updated_at=job.updated_at,
+    )
+
+
+def _get_job(job_store: JobStore, job_id: str) -> Job:
+    """Look up a job, removing expired ones first, or answer 404."""
+    job_store.purge_expired()
+    try:
+        return job_store.get(job_id)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+
+
+@router.post(
+    path="",
+    summary="Submit a file for background analysis or redaction",
+    description="Upload a file and get a job ID at once. Poll the job for its progress and download the result when it is done.",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_job(
+    file: Annotated[UploadFile, File(description="File to be analyzed or redacted.")],
+    operation: Annotated[str, Form(description="'analyze' or 'redact'.")] = "redact",
+    language: Annotated[str, Form(description="Language of the content, e.g., 'en' for English.")] = "en",
+    job_store: JobStore = Depends(get_job_store),
+    job_runner: JobRunner = Depends(get_job_runner)
+):
+    """
+    Endpoint to submit a job.
+    The upload is saved to disk and processed by a background worker, so the request returns immediately.
+    """
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Language '{language}' is not supported. Supported languages are: {list(SUPPORTED_LANGUAGES)}"
+        )
+    if operation not in JOB_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Operation '{operation}' is not supported. Supported operations are: {list(JOB_OPERATIONS)}"
+        )
+    if Path(file.filename).suffix.lower() not in Ingestor.SUPPORTED_FILE_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported file type: {file.filename}")
+
+    job_store.purge_expired()
+    job = job_store.create(operation, filename=file.filename, language=language)
+    with open(job_store.input_path(job), "wb") as f:
+        await run_in_threadpool(shutil.copyfileobj, file.file, f)
+    job_runner.submit(job)
+    logger.info(f"Job {job.id} submitted for file '{file.filename}'.")
+    return _job_response(job)
+
+
+@router.get(
+    path="/{job_id}",
+    summary="Get the status of a job",
+    description="Get the status of a job and, for PDF documents, the number of pages processed.",
+    response_model=JobResponse,
+)
+def get_job(job_id: str, job_store: JobStore = Depends(get_job_store)):
+    """
+    Endpoint to poll a job.
+    """
+    return _job_response(_get_job(job_store, job_id))
+
+
+@router.get(
+    path="/{job_id}/result",
+    summary="Download the result of a job",
+    description="Download the analysis (JSON) or the redacted file of a finished job.",
+)
+def get_job_result(job_id: str, job_store: JobStore = Depends(get_job_store)):
+    """
+    Endpoint to download the result of a job.
+    """
+    job = _get_job(job_store, job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"The job failed: {job.error}")
+    result_path = job_store.result_path(job)
+    if job.status != "done" or result_path is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"The job is not done yet, it is {job.status}.")
+    media_type = mimetypes.guess_type(result_path.name)[0] or "application/octet-stream"
+    filename = f"{Path(job.filename).stem}_{'analysis' if job.operation == 'analyze' else 'redacted'}{result_path.suffix}"
+    return FileResponse(result_path, media_type=media_type, filename=filename)
@@ -1,12 +1,15 @@
 """Redactor routes for the API."""
+import os
+from privato.app.batch import run_batch, iter_zip, spool_upload
+from privato.app.dependencies import get_inference_pool, get_ingestor
 from privato.core.ingestion import Ingestor
-from privato.app.dependencies import  get_ingestor, get_redactor
 from fastapi import UploadFile, File, Depends, APIRouter, HTTPException, Form
-from privato.core.redactor import Redactor
-from privato.core.utils import save_img_to_buffer
-from fastapi.responses import StreamingResponse, JSONResponse
+from privato.core.analysis_store import AnalysisStore, AnalysisNotFoundError, AnalysisMismatchError, get_analysis_store
+from privato.core.workers import InferencePool, WorkerPoolFullError, WorkerCrashedError, redact_upload, redact_uploads
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from starlette.background import BackgroundTask
 from io import BytesIO
-from typing import Annotated
+from typing import Annotated, List, Optional
 from privato.core.config import logger, SUPPORTED_LANGUAGES
 
 
@@ -23,23 +26,28 @@ router = APIRouter(
 )
 
 
-def redact_file(
+async def redact_file(
     file : Annotated[UploadFile, File(description="File to be analyzed and redacted.")],
-    ingestor : Ingestor = Depends(get_ingestor),
-    redactor : Redactor = Depends(get_redactor),
-    language: str = Form(default="en", description="Language for redaction")
+    pool : InferencePool = Depends(get_inference_pool),
+    analysis_store : AnalysisStore = Depends(get_analysis_store),
+    language: str = Form(default="en", description="Language for redaction"),
+    analysis_id: Optional[str] = Form(default=None, description="Handle of a previous analysis of the same file, to redact without analyzing it again")
 ):
     """
     Endpoint to upload a file for analysis and redaction.
+    The file is redacted by a worker process, so the server keeps serving other requests meanwhile.
     """
     if language not in SUPPORTED_LANGUAGES:
         raise HTTPException(status_code=400, detail=f"Language '{language}' is not supported. Supported languages are: {list(SUPPORTED_LANGUAGES)}")
+    path = None
     try:
-        ingested_file, ext = ingestor.ingest(file=file)
-        redacted_result = redactor.redact(ingested_file, data_type=ext, language=language, download=True)
+        # Handles are redeemed here, as the store lives in the server process
+        stored_analysis = analysis_store.get(analysis_id) if analysis_id else None
+        # The worker reads the upload from disk, so that it is neither held in memory nor pickled
+        path = await spool_upload(file)
+        ext, redacted_result = await pool.run(redact_upload, path, language=language, analysis=stored_analysis)
         if ext == "img":
-            buffer = save_img_to_buffer(redacted_result)
-            return StreamingResponse(buffer, media_type="image/png")
+            return StreamingResponse(BytesIO(redacted_result), media_type="image/png")
         elif ext == "text":
             return JSONResponse(content=redacted_result, status_code=200)
         elif ext == "imgs":
@@ -48,10 +56,48 @@ def redact_file(
             return StreamingResponse(BytesIO(redacted_result), media_type="application/pdf",
                                      headers={"Content-Disposition": f"attachment; filename=redacted_output.pdf"})
         elif ext == "json":
-            NotImplementedError("JSON redaction not implemented yet.")
+            return JSONResponse(content=redacted_result, status_code=200)
         elif ext == "df":
-            NotImplementedError("DataFrame redaction not implemented yet.")
-    
+            return StreamingResponse(BytesIO(redacted_result), media_type="text/csv",
+                                     headers={"Content-Disposition": "attachment; filename=redacted_output.csv"})
+        elif ext == "dfs":
+            # The worker wrote the redacted chunks to a temporary file, removed once it is sent
+            return FileResponse(redacted_result, media_type="text/csv", filename="redacted_output.csv",
+                                background=BackgroundTask(os.unlink, redacted_result))
+
+    except (WorkerPoolFullError, WorkerCrashedError) as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except AnalysisNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except AnalysisMismatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error during file redaction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+
+@router.post(
+    path="/batch",
+    summary="Upload many files for redaction",
+    description="Upload many files, or zip archives of files, for redaction. The redacted files are streamed back as a zip archive."
+)
+async def redact_batch(
+    files : Annotated[List[UploadFile], File(description="Files or zip archives to be redacted.")],
+    ingestor : Ingestor = Depends(get_ingestor),
+    pool : InferencePool = Depends(get_inference_pool),
+    language: str = Form(default="en", description="Language for redaction")
+):
+    """
+    Endpoint to upload many files for redaction.
+    Files are redacted in windows, whose texts share one NLP run and whose images one detector batch,
+    and added to the streamed archive as soon as their window is done. Files that fail are listed in
+    an `errors.json` member.
+    """
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Language '{language}' is not supported. Supported languages are: {list(SUPPORTED_LANGUAGES)}")
+    windows, cleanup = await run_batch(files, ingestor, pool, redact_uploads, language=language)
+    return StreamingResponse(iter_zip(windows), media_type="application/zip", background=cleanup,
+                             headers={"Content-Disposition": "attachment; filename=redacted_output.zip"})
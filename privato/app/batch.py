@@ -0,0 +1,259 @@
+"""Helpers of the upload endpoints: spooling uploads to disk, reading many uploads and streaming a zip archive of results."""
+from io import RawIOBase
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from fastapi import HTTPException, UploadFile, status
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from privato.core.ingestion import Ingestor
+from privato.core.utils import batched
+from privato.core.workers import InferencePool, WorkerPoolFullError, WorkerCrashedError
+from privato.core.config import API_BATCH_MAX_FILES, API_BATCH_MAX_BYTES, PIPELINE_WINDOW_SIZE
+
+
+class BatchEntry(NamedTuple):
+    """A file of a batch request, kept on disk until its window is processed.
+    Attributes:
+        filename (str): The upload or archive member name.
+        path (Path): The spooled upload holding the file.
+        member (Optional[zipfile.ZipInfo]): The archive member, None for a plain upload.
+    """
+    filename: str
+    path: Path
+    member: Optional[zipfile.ZipInfo]
+
+
+def _spool(file: UploadFile, path: Path) -> int:
+    """Copy an upload to disk.
+    Args:
+        file (UploadFile): The upload.
+        path (Path): The path it is copied to.
+    Returns:
+        int: The size of the upload in bytes.
+    """
+    with open(path, "wb") as f:
+        shutil.copyfileobj(file.file, f)
+    return path.stat().st_size
+
+
+async def spool_upload(file: UploadFile) -> Path:
+    """Copy an upload to a temporary file, off the event loop, so that a worker can read it from disk.
+    Args:
+        file (UploadFile): The upload.
+    Returns:
+        Path: The temporary file, with the extension of the upload name. The caller removes it.
+    """
+    fd, path = tempfile.mkstemp(prefix="privato-upload-", suffix=Path(file.filename).suffix.lower())
+    os.close(fd)
+    try:
+        await run_in_threadpool(_spool, file, Path(path))
+    except BaseException:
+        os.unlink(path)
+        raise
+    return Path(path)
+
+
+async def read_uploads(files: List[UploadFile], ingestor: Ingestor, spool_dir: Path,
+                       max_files: int = API_BATCH_MAX_FILES, max_bytes: int = API_BATCH_MAX_BYTES) -> List[BatchEntry]:
+    """Spool the files of a batch request to disk, listing the supported members of zip archives.
+
+    Archives are not extracted here: their members are counted against the limits with the size
+    their central directory declares, which is also the most a member extracts to.
+    Args:
+        files (List[UploadFile]): The uploaded files.
+        ingestor (Ingestor): The ingestor listing the members of zip archives.
+        spool_dir (Path): The directory the uploads are copied to.
+        max_files (int, optional): Maximum number of files accepted. Defaults to API_BATCH_MAX_FILES.
+        max_bytes (int, optional): Maximum total size of the files, archive members uncompressed.
+            Defaults to API_BATCH_MAX_BYTES.
+    Returns:
+        List[BatchEntry]: The files, in upload order.
+    Raises:
+        HTTPException: 400 for an unreadable archive, 413 when there are more than `max_files` files or
+            more than `max_bytes` bytes.
+    """
+    entries: List[BatchEntry] = []
+    total_bytes = 0
+    for index, file in enumerate(files):
+        suffix = Path(file.filename).suffix.lower()
+        path = spool_dir / f"{index}{suffix}"
+        size = await run_in_threadpool(_spool, file, path)
+        if suffix in Ingestor.SUPPORTED_ARCHIVE_FORMATS:
+            try:
+                members = await run_in_threadpool(ingestor.list_archive, path)
+            except zipfile.BadZipFile as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{file.filename}: {e}")
+            sized_entries = [(BatchEntry(member.filename, path, member), member.file_size) for member in members]
+        else:
+            sized_entries = [(BatchEntry(file.filename, path, None), size)]
+        for entry, entry_size in sized_entries:
+            entries.append(entry)
+            total_bytes += entry_size
+            if len(entries) > max_files:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"A batch holds at most {max_files} files."
+                )
+            if total_bytes > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"A batch holds at most {max_bytes} bytes, counting archive members uncompressed."
+                )
+    return entries
+
+
+def _read_window(window: List[BatchEntry]) -> List[Tuple[str, bytes]]:
+    """Read the files of a window from their spooled uploads, extracting archive members.
+    Args:
+        window (List[BatchEntry]): The files.
+    Returns:
+        List[Tuple[str, bytes]]: Pairs of file name and content, in order.
+    """
+    uploads = []
+    archives: Dict[Path, zipfile.ZipFile] = {}
+    try:
+        for entry in window:
+            if entry.member is None:
+                uploads.append((entry.filename, entry.path.read_bytes()))
+                continue
+            if entry.path not in archives:
+                archives[entry.path] = zipfile.ZipFile(entry.path)
+            uploads.append((entry.filename, archives[entry.path].read(entry.member)))
+    finally:
+        for archive in archives.values():
+            archive.close()
+    return uploads
+
+
+async def iter_windows(entries: List[BatchEntry], size: int = PIPELINE_WINDOW_SIZE) -> AsyncIterator[List[Tuple[str, bytes]]]:
+    """Read the files of a batch window by window, off the event loop.
+    Args:
+        entries (List[BatchEntry]): The files.
+        size (int, optional): Number of files per window. Defaults to PIPELINE_WINDOW_SIZE.
+    Returns:
+        AsyncIterator[List[Tuple[str, bytes]]]: The pairs of file name and content of each window.
+    """
+    for window in batched(entries, size):
+        yield await run_in_threadpool(_read_window, list(window))
+
+
+async def run_batch(files: List[UploadFile], ingestor: Ingestor, pool: InferencePool,
+                    func: Callable[..., List[Dict]], **kwargs: Any) -> Tuple[AsyncIterator[List[Dict]], BackgroundTask]:
+    """Start processing the files of a batch request in the inference pool.
+
+    Uploads are spooled to a temporary directory, and each window of files is read only when it is
+    submitted, so that only the windows in flight are held in memory.
+    Args:
+        files (List[UploadFile]): The uploaded files.
+        ingestor (Ingestor): The ingestor listing the members of zip archives.
+        pool (InferencePool): The pool running the task.
+        func (Callable[..., List[Dict]]): The task run on each window, such as `analyze_uploads`.
+        **kwargs: Keyword arguments of the task.
+    Returns:
+        Tuple[AsyncIterator[List[Dict]], BackgroundTask]: The outcomes of each window, in order, and the
+            task removing the spooled uploads, to run once the response is sent.
+    Raises:
+        HTTPException: 400 for an unreadable archive, 413 for a batch too large, 503 when every inference
+            worker is busy and the queue is full, or the worker died.
+    """
+    spool_dir = Path(tempfile.mkdtemp(prefix="privato-batch-"))
+    cleanup = BackgroundTask(shutil.rmtree, spool_dir, ignore_errors=True)
+    try:
+        entries = await read_uploads(files, ingestor, spool_dir)
+        outcomes = pool.iter_map(func, iter_windows(entries), **kwargs)
+        # Awaited before the response starts, so that an overloaded pool still gets a 503
+        try:
+            first_window: Optional[List[Dict]] = await outcomes.__anext__()
+        except StopAsyncIteration:
+            first_window = None
+    except (WorkerPoolFullError, WorkerCrashedError) as e:
+        await cleanup()
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+    except BaseException:
+        await cleanup()
+        raise
+
+    async def windows() -> AsyncIterator[List[Dict]]:
+        if first_window is not None:
+            yield first_window
+            async for window in outcomes:
+                yield window
+
+    return windows(), cleanup
+
+
+class _StreamBuffer(RawIOBase):
+    """A write-only stream collecting what zipfile writes, to be sent chunk by chunk."""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _member_name(filename: str, extension: str, used: Set[str]) -> str:
+    """Name a redacted file in the output archive.
+
+    The name is made a relative POSIX path, without parent or root components, and made unique
+    by numbering it when another file of the archive already took it.
+    Args:
+        filename (str): The upload or archive member name.
+        extension (str): The extension of the redacted file.
+        used (Set[str]): The names already in the archive, to which the new name is added.
+    Returns:
+        str: The member name.
+    """
+    parts = [
+        part for part in PurePosixPath(filename.replace("\\", "/")).parts
+        if part not in ("/", ".", "..") and not part.endswith(":")
+    ]
+    path = PurePosixPath(*parts).with_suffix(extension) if parts else PurePosixPath("file" + extension)
+    name = path.as_posix()
+    number = 1
+    while name in used:
+        name = path.with_name(f"{path.stem}_{number}{path.suffix}").as_posix()
+        number += 1
+    used.add(name)
+    return name
+
+
+async def iter_zip(outcomes: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """Stream a zip archive of redacted files as their batches complete.
+
+    Each redacted file is stored under its upload name with the extension of its output, made a
+    relative path and numbered when several files share it. Files that failed are listed with their
+    error in an 'errors.json' member at the end.
+    Args:
+        outcomes (AsyncIterator[List[Dict]]): Batches of outcomes as returned by `redact_uploads`.
+    Returns:
+        AsyncIterator[bytes]: The bytes of the archive.
+    """
+    buffer = _StreamBuffer()
+    errors = []
+    used_names = {"errors.json"}
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        async for batch in outcomes:
+            for outcome in batch:
+                if "error" in outcome:
+                    errors.append({"filename": outcome["filename"], "error": outcome["error"]})
+                    continue
+                name = _member_name(outcome["filename"], outcome["extension"], used_names)
+                archive.writestr(name, outcome["content"])
+            yield buffer.drain()
+        if errors:
+            archive.writestr("errors.json", json.dumps(errors, ensure_ascii=False, indent=4))
+    yield buffer.drain()
@@ -1,13 +1,21 @@
 """Dependency injection functions for the app."""
-
+import threading
+from typing import Optional
 from privato.core.ingestion import Ingestor
 from privato.core.analyzer import Analyzer
 from privato.core.redactor import Redactor
+from privato.core.jobs import get_job_store
+from privato.core.workers import InferencePool, JobRunner
 
-# These objects are created once and shared across all requests.
-ingestor = Ingestor()
-analyzer = Analyzer()
-redactor = Redactor()
+# These objects are created on first use and shared across all requests.
+# The routes run inference in the pool's workers, so the server process only builds
+# the analyzer and redactor engines if something asks for them directly.
+ingestor: Optional[Ingestor] = None
+analyzer: Optional[Analyzer] = None
+redactor: Optional[Redactor] = None
+inference_pool: Optional[InferencePool] = None
+job_runner: Optional[JobRunner] = None
+_lock = threading.Lock()
 
 def get_ingestor() -> Ingestor:
     """
@@ -17,6 +25,11 @@ def get_ingestor() -> Ingestor:
     Returns:
         Ingestor: The shared Ingestor instance.
     """
+    global ingestor
+    if ingestor is None:
+        with _lock:
+            if ingestor is None:
+                ingestor = Ingestor()
     return ingestor
 
 def get_analyzer() -> Analyzer:
@@ -27,6 +40,11 @@ def get_analyzer() -> Analyzer:
     Returns:
         Analyzer: The shared Analyzer instance.
     """
+    global analyzer
+    if analyzer is None:
+        with _lock:
+            if analyzer is None:
+                analyzer = Analyzer()
     return analyzer
 
 def get_redactor() -> Redactor:
@@ -37,4 +55,63 @@ def get_redactor() -> Redactor:
     Returns:
         Redactor: The shared Redactor instance.
     """
+    global redactor
+    if redactor is None:
+        with _lock:
+            if redactor is None:
+                redactor = Redactor()
     return redactor
+
+def get_inference_pool() -> InferencePool:
+    """
+    Dependency function to get the pool of inference workers.
+    Args:
+        None
+    Returns:
+        InferencePool: The shared inference pool.
+    """
+    global inference_pool
+    if inference_pool is None:
+        with _lock:
+            if inference_pool is None:
+                inference_pool = InferencePool()
+    return inference_pool
+
+def shutdown_inference_pool() -> None:
+    """
+    Stop the inference workers, if they were started.
+    Args:
+        None
+    """
+    global inference_pool
+    with _lock:
+        if inference_pool is not None:
+            inference_pool.shutdown()
+            inference_pool = None
+
+def get_job_runner() -> JobRunner:
+    """
+    Dependency function to get the runner of background jobs.
+    Args:
+        None
+    Returns:
+        JobRunner: The shared job runner.
+    """
+    global job_runner
+    if job_runner is None:
+        with _lock:
+            if job_runner is None:
+                job_runner = JobRunner(get_job_store())
+    return job_runner
+
+def shutdown_job_runner() -> None:
+    """
+    Stop the job workers, if they were started. Unfinished jobs are resumed on the next start.
+    Args:
+        None
+    """
+    global job_runner
+    with _lock:
+        if job_runner is not None:
+            job_runner.shutdown()
+            job_runner = None
@@ -1,8 +1,11 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from privato.app.api.routes.api import router as api_router
+from privato.app.dependencies import get_inference_pool, shutdown_inference_pool, get_job_runner, shutdown_job_runner
+from privato.core.jobs import get_job_store
 import logging
 
 logging.getLogger("presidio-analyzer").setLevel(logging.ERROR)
@@ -14,7 +17,17 @@ origins = [
     "http://127.0.0.1:8080"
 ]
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the inference workers and load their models before serving requests
+    get_inference_pool().warm_up()
+    get_job_store().purge_expired()
+    get_job_runner().resume()
+    yield
+    shutdown_job_runner()
+    shutdown_inference_pool()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(api_router)
 
 app.add_middleware(
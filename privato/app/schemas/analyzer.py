@@ -24,6 +24,7 @@ class StructuredAnalysisResult(BaseModel):
 
 class AnalyzerResponse(BaseModel):
     analysis: Optional[Union[List[AnalysisResult], List[List[AnalysisResult]], StructuredAnalysisResult]] 
+    analysis_id: Optional[str] = None
     message: Optional[str] = None
     error: Optional[str] = None
     
@@ -47,6 +48,7 @@ class AnalyzerResponse(BaseModel):
                     "height": 100
                 }
             ],
+            "analysis_id": "3f2b9c0e8a4d4e6f9b1c2d3e4f5a6b7c",
             "message": "Analysis completed successfully",
             "error": None
         }]
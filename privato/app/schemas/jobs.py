@@ -0,0 +1,29 @@
+"""Schemas for job responses."""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    operation: str
+    status: str
+    pages_done: int = 0
+    pages_total: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+    model_config = {
+        "json_schema_extra": {
+        "example": {
+            "job_id": "9d1c2b3a4f5e6d7c8b9a0f1e2d3c4b5a",
+            "operation": "redact",
+            "status": "running",
+            "pages_done": 120,
+            "pages_total": 300,
+            "error": None,
+            "created_at": 1760000000.0,
+            "updated_at": 1760000095.5
+        }
+    }
+    }
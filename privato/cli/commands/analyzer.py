@@ -4,7 +4,9 @@ import typer
 from privato.core.analyzer import Analyzer
 from privato.core.ingestion import Ingestor
 from pathlib import Path
-from privato.core.config import logger,SUPPORTED_LANGUAGES
+from privato.core.config import logger,SUPPORTED_LANGUAGES,CLI_WORKERS,DF_CHUNK_ROWS
+from privato.core.workers import iter_analyze_parallel
+from privato.core.pipeline import iter_analyze
 import rich
 from privato.core.save_files import SaveFiles
 
@@ -25,27 +27,36 @@ def analyze(
     hide_output: bool = Option(False, help="Hide the analysis result from the console.", show_default=True),
     save_output: bool = Option(False, help="Save the analysis result to a JSON file.", show_default=True),
     output_path: Path = Option(None, help="The output file path to save the analysis result if --save-output is set."),
+    workers: int = Option(CLI_WORKERS, help="Number of worker processes used to analyze a directory.", show_default=True),
+    chunk_rows: int = Option(DF_CHUNK_ROWS, help="Read CSV and XLSX files in chunks of this many rows instead of loading them whole.", show_default=True),
     ):
     
     """Analyze a file or directory for Personally Identifiable Information.
     Args:
         path (Path): Path to the file or directory to be analyzed.
         language (str, optional): Language of the content. Defaults to "en".
+        workers (int, optional): Number of worker processes used to analyze a directory. Defaults to CLI_WORKERS.
+        chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files. Defaults to DF_CHUNK_ROWS.
     Returns:
 
     """
-    analyzer = Analyzer()
-    ingestor = Ingestor()
+    ingestor = Ingestor(df_chunk_rows=chunk_rows)
     
     try:
         if language not in SUPPORTED_LANGUAGES:
             raise ValueError("Language Not Supported. Atleast Not yet. Supported languages are: " + ", ".join(SUPPORTED_LANGUAGES))
-        if path.is_dir():
-            files = ingestor.ingest_directory(path)
-            analysis_result = analyzer.analyze_files(files,language=language)
+        if path.is_dir() and workers > 1:
+            paths = list(ingestor.iter_directory_files(path))
+            analysis_result = [result for _, result in iter_analyze_parallel(paths, language=language, workers=workers,
+                                                                                  df_chunk_rows=chunk_rows)]
+        elif path.is_dir():
+            analyzer = Analyzer()
+            entries = ingestor.iter_directory(path)
+            analysis_result = [result for _, result in iter_analyze(entries, analyzer, language=language)]
         elif not path.is_file():
             raise ValueError(f"The provided path is neither a file nor a directory: {path}")
         else:
+            analyzer = Analyzer()
             ingested_file,ext = ingestor.ingest(path)
             analysis_result = analyzer.analyze(ingested_file,data_type=ext,language=language)
         if save_output:
@@ -7,9 +7,9 @@ from privato.core.ingestion import Ingestor
 from privato.core.save_files import SaveFiles
 from pathlib import Path
 from privato.core.config import logger
-from typing import Dict, List, Union, Any
-from privato.core.utils import get_dir_files_names
-from privato.core.config import SUPPORTED_LANGUAGES
+from privato.core.config import SUPPORTED_LANGUAGES, CLI_WORKERS, PDF_REDACTION_MODE, PDF_REDACTION_MODES, DF_CHUNK_ROWS
+from privato.core.workers import iter_redact_parallel
+from privato.core.pipeline import redact_and_save
 
 redactor_app = Typer(
     name="redactor",
@@ -26,36 +26,47 @@ def redact(
     input_path: Path = Argument(..., help="The file or directory to redact.", exists=True),
     output_path: Path = Argument(..., help="The output file or directory for the redacted content."),
     language: str = Option("en", help="Language of the content, e.g., 'en' for English."),
+    workers: int = Option(CLI_WORKERS, help="Number of worker processes used to redact a directory.", show_default=True),
+    pdf_redaction_mode: str = Option(PDF_REDACTION_MODE, help="How PDFs are redacted: 'raster' re-renders redacted page images, 'vector' redacts the original document and keeps its text layer.", show_default=True),
+    chunk_rows: int = Option(DF_CHUNK_ROWS, help="Read CSV and XLSX files in chunks of this many rows and write the redacted CSV chunk by chunk.", show_default=True),
 ):
     """Redact the specified file or directory."""
     logger.info(f"Redacting {input_path}...")
-    redactor = Redactor()
-    ingestor = Ingestor()
+    ingestor = Ingestor(df_chunk_rows=chunk_rows)
     saver = SaveFiles(output_path)
-    file_names: List[str] = []
-    files : List[tuple[Any, str]] = []
 
     if language not in SUPPORTED_LANGUAGES:
         raise ValueError("Language Not Supported. Atleast Not yet. Supported languages are: " + ", ".join(SUPPORTED_LANGUAGES))
+    if pdf_redaction_mode not in PDF_REDACTION_MODES:
+        raise ValueError("PDF redaction mode not supported. Supported modes are: " + ", ".join(PDF_REDACTION_MODES))
     try:
         if output_path.is_file():
             raise ValueError(f"Output path {output_path} cannot be a file.")
         if not output_path.exists():
                 output_path.mkdir(parents=True, exist_ok=True)
+        if input_path.is_dir() and workers > 1:
+            paths = list(ingestor.iter_directory_files(input_path))
+            for path, saved_path in iter_redact_parallel(paths, output_path, language=language, workers=workers,
+                                                         pdf_redaction_mode=pdf_redaction_mode, df_chunk_rows=chunk_rows,
+                                                         root=input_path):
+                logger.info(f"Redacted {path} to {saved_path}.")
+            logger.info(f"Redaction complete. Output saved to {output_path}.")
+            return
+        redactor = Redactor(pdf_redaction_mode=pdf_redaction_mode)
         if input_path.is_dir():
-            files.extend(ingestor.ingest_directory(input_path))
-            file_names.extend(get_dir_files_names(input_path))
+            entries = ingestor.iter_directory(input_path)
+            for path, saved_path in redact_and_save(entries, redactor, saver, language=language,
+                                                     root=input_path):
+                logger.info(f"Redacted {path} to {saved_path}.")
+        elif input_path.is_file() and input_path.suffix.lower() in Ingestor.SUPPORTED_JSON_FORMATS | Ingestor.SUPPORTED_JSONL_FORMATS:
+            # Stream JSON exports record by record instead of loading them whole
+            redactor.redact_json_file(input_path, output_path / input_path.name, language=language)
         elif input_path.is_file():
-            files.append(ingestor.ingest(input_path))
-            file_names.append(input_path.stem)
+            redacted_files = redactor.redact_files([ingestor.ingest(input_path)], language=language)
+            saver.save_files(redacted_files, filenames=[input_path.stem])
         else:
             raise ValueError(f"The provided path is neither a file nor a directory: {input_path}")
 
-        assert len(files) == len(file_names), "Mismatch between number of files and filenames."
-
-        redacted_files = redactor.redact_files(files, language=language)
-        saver.save_files(redacted_files, filenames=file_names)
-
         logger.info(f"Redaction complete. Output saved to {output_path}.")
     except Exception as e:
         logger.error(f"Error during redaction: {e}")
@@ -0,0 +1,117 @@
+"""In-memory store of analysis results that can be redeemed later for redaction."""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from privato.core.config import ANALYSIS_STORE_TTL, ANALYSIS_STORE_MAX_ENTRIES
+
+
+class AnalysisNotFoundError(KeyError):
+    """Raised when an analysis handle is unknown or has expired."""
+
+
+class AnalysisMismatchError(ValueError):
+    """Raised when a stored analysis is redeemed for content other than the analyzed one."""
+
+
+@dataclass
+class StoredAnalysis:
+    """An analysis result kept for a later redaction of the same content.
+    Attributes:
+        analysis (Any): The analysis result, as returned by the Analyzer.
+        data_type (str): The type of the analyzed data ('img', 'imgs', 'text', 'json', 'df').
+        fingerprint (str, optional): The content hash of the analyzed data, None if it cannot be hashed.
+        created_at (float): When the analysis was stored, as a monotonic timestamp.
+    """
+    analysis: Any
+    data_type: str
+    fingerprint: Optional[str]
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class AnalysisStore:
+    """
+    A bounded, thread-safe store of analysis results addressed by opaque handles.
+
+    Entries expire after `ttl` seconds and the least recently stored entries are
+    evicted once `max_entries` is reached.
+    """
+    def __init__(self, ttl: Optional[float] = ANALYSIS_STORE_TTL, max_entries: int = ANALYSIS_STORE_MAX_ENTRIES):
+        """Initialize the store.
+        Args:
+            ttl (float, optional): Seconds an entry stays redeemable, None to never expire. Defaults to ANALYSIS_STORE_TTL.
+            max_entries (int, optional): Maximum number of entries kept. Defaults to ANALYSIS_STORE_MAX_ENTRIES.
+        """
+        if max_entries < 1:
+            raise ValueError("The analysis store must hold at least one entry.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, StoredAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, analysis: Any, data_type: str, fingerprint: Optional[str]) -> str:
+        """Store an analysis result.
+        Args:
+            analysis (Any): The analysis result.
+            data_type (str): The type of the analyzed data.
+            fingerprint (str, optional): The content hash of the analyzed data, None if it cannot be hashed.
+        Returns:
+            str: The handle to redeem the analysis with.
+        """
+        handle = uuid.uuid4().hex
+        with self._lock:
+            self._evict_expired()
+            self._entries[handle] = StoredAnalysis(analysis, data_type, fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> StoredAnalysis:
+        """Look up a stored analysis.
+        Args:
+            handle (str): The handle returned by `put`.
+        Returns:
+            StoredAnalysis: The stored analysis.
+        Raises:
+            AnalysisNotFoundError: If the handle is unknown or has expired.
+        """
+        with self._lock:
+            self._evict_expired()
+            if handle not in self._entries:
+                raise AnalysisNotFoundError(f"Analysis '{handle}' was not found or has expired.")
+            return self._entries[handle]
+
+    def clear(self) -> None:
+        """Drop every stored analysis."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_expired(self) -> None:
+        """Drop the entries older than the TTL. Must be called with the lock held."""
+        if self.ttl is None:
+            return
+        deadline = time.monotonic() - self.ttl
+        while self._entries:
+            handle, entry = next(iter(self._entries.items()))
+            if entry.created_at > deadline:
+                break
+            del self._entries[handle]
+
+
+_analysis_store: Optional[AnalysisStore] = None
+_analysis_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> AnalysisStore:
+    """Get the process-wide analysis store, creating it on first use.
+    Returns:
+        AnalysisStore: The shared analysis store.
+    """
+    global _analysis_store
+    if _analysis_store is None:
+        with _analysis_store_lock:
+            if _analysis_store is None:
+                _analysis_store = AnalysisStore()
+    return _analysis_store
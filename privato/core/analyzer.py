@@ -1,60 +1,185 @@
 """Analyzer module for text and image analysis."""
 from pandas import DataFrame
-from privato.core.image_analyzer_engine import CustomImageAnalyzerEngine as ImageAnalyzerEngine
 from PIL import Image
-from typing import Any, List,Dict, Optional, Tuple, Union
-from presidio_structured import  PandasAnalysisBuilder, JsonAnalysisBuilder
-from presidio_structured.config import StructuredAnalysis
-from privato.core.analyzer_engine import CustomAnalyzerEngine as AnalyzerEngine
-from privato.core.utils import check_json_complexity
-from dataclasses import asdict
+from typing import Any, Callable, Iterable, List,Dict, Optional, Tuple, Union
+from privato.core.engine_registry import EngineRegistry, get_engine_registry
+from privato.core.utils import track_progress, try_fingerprint
+from privato.core.analysis_store import AnalysisStore, get_analysis_store
+from privato.core.cache import ResultCache, get_chunk_cache, get_result_cache
+from privato.core.config import NLP_BATCH_SIZE, NLP_N_PROCESS, PAGE_WORKERS, MEMOIZATION_FLAG
+from privato.core.config import TEXT_INCREMENTAL, TEXT_INCREMENTAL_MIN_CHARS, TEXT_WINDOW_CHARS
+from privato.core.converter import iter_page_images
+from privato.core.structured import DataFrameAnalyzer, JsonAnalyzer
 
 
 class Analyzer:
     """Analyzer class for text and image analysis."""
-    def __init__(self):
+    def __init__(self, registry: Optional[EngineRegistry] = None, page_workers: int = PAGE_WORKERS,
+                 analysis_store: Optional[AnalysisStore] = None, use_cache: bool = MEMOIZATION_FLAG,
+                 cache: Optional[ResultCache] = None, incremental_text: bool = TEXT_INCREMENTAL,
+                 chunk_cache: Optional[ResultCache] = None):
         """
         Initialize the Analyzer class.
-        Initializes the underlying analysis engines and sets up a handler map for different data types.
+        Fetches the shared analysis engines and sets up a handler map for different data types.
+        Args:
+            registry (EngineRegistry, optional): The engine registry to take engines from. Defaults to the process-wide registry.
+            page_workers (int, optional): Number of threads analyzing the pages of a document concurrently. Defaults to PAGE_WORKERS.
+            analysis_store (AnalysisStore, optional): Where analyses are kept for a later redaction. Defaults to the
+                process-wide store.
+            use_cache (bool, optional): Reuse the results of content analyzed before. Defaults to MEMOIZATION_FLAG.
+            cache (ResultCache, optional): The result cache to use. Defaults to the process-wide cache.
+            incremental_text (bool, optional): Analyze large texts paragraph by paragraph, reusing the cached results
+                of paragraphs seen before. Defaults to TEXT_INCREMENTAL.
+            chunk_cache (ResultCache, optional): The cache of paragraph results. Defaults to the process-wide
+                paragraph cache.
         """
-        self.analyzer = AnalyzerEngine()
-        self.image_analyzer = ImageAnalyzerEngine()
-        self.pandas_analyzer = PandasAnalysisBuilder(analyzer=self.analyzer._analyzer_engine)
-        self.json_analyzer = JsonAnalysisBuilder(analyzer=self.analyzer._analyzer_engine)
+        registry = registry or get_engine_registry()
+        self.page_workers = page_workers
+        self.analysis_store = analysis_store or get_analysis_store()
+        self.cache = (cache or get_result_cache()) if use_cache else None
+        self.incremental_text = incremental_text
+        self.chunk_cache = (chunk_cache or get_chunk_cache()) if incremental_text else None
+        self.analyzer = registry.get_analyzer_engine()
+        self.image_analyzer = registry.get_image_analyzer_engine()
+        self.dataframe_analyzer = DataFrameAnalyzer(self.analyzer)
+        self.json_analyzer = JsonAnalyzer(self.analyzer)
         self._handler_map : Dict[str, callable] = {
             "img": self.analyze_image,
             "imgs": self.analyze_images,
             "text": self.analyze_text,
             "df": self.analyze_dataframe,
+            "dfs": self.analyze_dataframe_chunks,
             "json": self.analyze_json
         }
-    def analyze(self, data: Any, data_type: str, language: str = "en", entities: list = None) -> Union[List[Dict], Dict]:
+    def analyze(self, data: Any, data_type: str, language: str = "en", entities: list = None,
+                progress: Optional[Callable[[int, int], None]] = None) -> Union[List[Dict], Dict]:
         """Analyze the given data based on its type.
         Args:
             data (Any): The data to analyze.
             data_type (str): The type of the data ('img', 'text', 'json', 'df').
             language (str, optional): The language of the content. Defaults to "en".
             entities (list, optional): List of entity types to look for. Defaults to None.
+            progress (Callable[[int, int], None], optional): Called with the number of pages analyzed and the
+                page count after each page of an 'imgs' document. Defaults to None.
+        Returns:
+            Union[List[Dict], Dict]: The analysis result.
+        """
+        return self._analyze(data, data_type, language, entities, progress)
+
+    def analyze_with_fingerprint(self, data: Any, data_type: str, language: str = "en", entities: list = None,
+                                 progress: Optional[Callable[[int, int], None]] = None
+                                 ) -> Tuple[Union[List[Dict], Dict], Optional[str]]:
+        """Analyze the given data and return the content hash it was cached under.
+
+        The content is hashed once, for both the result cache and the caller storing the analysis.
+        Args:
+            data (Any): The data to analyze.
+            data_type (str): The type of the data ('img', 'imgs', 'text', 'json', 'df', 'dfs').
+            language (str, optional): The language of the content. Defaults to "en".
+            entities (list, optional): List of entity types to look for. Defaults to None.
+            progress (Callable[[int, int], None], optional): Called with the number of pages analyzed and the
+                page count after each page of an 'imgs' document. Defaults to None.
+        Returns:
+            Tuple[Union[List[Dict], Dict], Optional[str]]: The analysis result and the content hash of the data,
+                None if the data cannot be hashed.
+        """
+        content_hash = try_fingerprint(data, data_type)
+        return self._analyze(data, data_type, language, entities, progress, content_hash=content_hash), content_hash
+
+    def _analyze(self, data: Any, data_type: str, language: str, entities: Optional[list],
+                 progress: Optional[Callable[[int, int], None]], content_hash: Optional[str] = None
+                 ) -> Union[List[Dict], Dict]:
+        """Analyze the given data, going through the result cache.
+        Args:
+            data (Any): The data to analyze.
+            data_type (str): The type of the data.
+            language (str): The language of the content.
+            entities (list, optional): List of entity types to look for.
+            progress (Callable[[int, int], None], optional): Called with the pages analyzed and the page count.
+            content_hash (str, optional): The content hash of the data, if already computed. Defaults to None.
         Returns:
             Union[List[Dict], Dict]: The analysis result.
         """
         if data_type not in self._handler_map:
             raise ValueError(f"Unsupported data type: {data_type}")
-        return self._handler_map[data_type](data, language=language, entities=entities)
+        key = self._cache_key(data, data_type, language, entities, content_hash=content_hash)
+        if key is not None:
+            cached_result = self.cache.get(key)
+            if cached_result is not None:
+                if progress is not None and data_type == "imgs":
+                    progress(len(data), len(data))
+                return cached_result
+        result = self._handler_map[data_type](data, language=language, entities=entities, progress=progress)
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def _cache_key(self, data: Any, data_type: str, language: str, entities: Optional[list],
+                   content_hash: Optional[str] = None) -> Optional[str]:
+        """Build the result cache key of an analysis.
+        Args:
+            data (Any): The data to analyze.
+            data_type (str): The type of the data.
+            language (str): The language of the content.
+            entities (list, optional): List of entity types to look for.
+            content_hash (str, optional): The content hash of the data, if already computed. Defaults to None.
+        Returns:
+            Optional[str]: The cache key, or None if caching is disabled or the data cannot be hashed.
+        """
+        if self.cache is None:
+            return None
+        if content_hash is None:
+            if data_type == "dfs":
+                # Hashing a chunked table would read the whole file once more
+                return None
+            content_hash = try_fingerprint(data, data_type)
+            if content_hash is None:
+                return None
+        return self.cache.make_key(content_hash, "analyze", data_type, language, entities,
+                                   incremental_text=self.incremental_text)
     
+    def analyze_with_handle(self, data: Any, data_type: str, language: str = "en",
+                            entities: list = None) -> Tuple[Union[List[Dict], Dict], str]:
+        """Analyze the given data and keep the result so that it can be redeemed by the Redactor.
+
+        Passing the handle to `Redactor.redact` redacts the same content without running OCR,
+        the detectors or the NLP pipeline again.
+        Args:
+            data (Any): The data to analyze.
+            data_type (str): The type of the data ('img', 'imgs', 'text', 'json', 'df', 'dfs').
+            language (str, optional): The language of the content. Defaults to "en".
+            entities (list, optional): List of entity types to look for. Defaults to None.
+        Returns:
+            Tuple[Union[List[Dict], Dict], str]: The analysis result and its handle.
+        """
+        analysis, content_hash = self.analyze_with_fingerprint(data, data_type=data_type, language=language,
+                                                               entities=entities)
+        handle = self.analysis_store.put(analysis, data_type=data_type, fingerprint=content_hash)
+        return analysis, handle
+
     def analyze_files(self, files: List[Tuple[Union[str,Image.Image, DataFrame, Dict],Any]], language: str = "en", entities: list = None) -> List[Union[List[Dict], Dict]]:
         """Analyze a list of files based on their type.
         Args:
             files (List[Tuple[Union[str, Image.Image, pd.DataFrame, dict], Any]]): The list of files to analyze.
-            data_type (str): The type of the data ('img', 'text', 'json', 'df').
+                Text files are grouped and analyzed in a single batched NLP run, and images in a single detector batch.
             language (str, optional): The language of the content. Defaults to "en".
             entities (list, optional): List of entity types to look for. Defaults to None.
         Returns:
             List[Union[List[Dict], Dict]]: The list of analysis results.
         """
-        return [self.analyze(file, data_type=ext, language=language, entities=entities) for file, ext in files]
+        files = list(files)
+        text_indices = [i for i, (_, ext) in enumerate(files) if ext == "text"]
+        text_results = self.analyze_texts([files[i][0] for i in text_indices], language=language, entities=entities)
+        image_indices = [i for i, (_, ext) in enumerate(files) if ext == "img"]
+        image_results = self.analyze_image_batch([files[i][0] for i in image_indices], language=language, entities=entities)
+        results = dict(zip(text_indices, text_results))
+        results.update(zip(image_indices, image_results))
+        return [
+            results[i] if i in results else self.analyze(file, data_type=ext, language=language, entities=entities)
+            for i, (file, ext) in enumerate(files)
+        ]
 
-    def analyze_text(self, text: str, language: str = "en", entities: list = None) -> List[Dict]:
+    def analyze_text(self, text: str, language: str = "en", entities: list = None, **kwargs) -> List[Dict]:
         """Analyze text for sensitive information.
         Args:
             text (str): The text to analyze.
@@ -63,13 +188,70 @@ class Analyzer:
         Returns:
             List[Dict]: List of recognized entities with their details.
         """
-        results = self.analyzer.analyze(
-            text=text,
-            entities=entities,
-            language=language
-        )
+        text_mode = self._text_mode(text)
+        if text_mode == "incremental":
+            results = self.analyzer.analyze_incremental(text, language=language, cache=self.chunk_cache, entities=entities)
+        elif text_mode == "windowed":
+            results = self.analyzer.analyze_windowed(text, language=language, entities=entities)
+        else:
+            results = self.analyzer.analyze(
+                text=text,
+                entities=entities,
+                language=language
+            )
         return [result.to_dict() for result in results]
 
+    def _text_mode(self, text: str) -> str:
+        """Choose how a text is analyzed.
+        Args:
+            text (str): The text to analyze.
+        Returns:
+            str: "incremental" to analyze it paragraph by paragraph with cached paragraph results, "windowed"
+                to analyze it in overlapping windows when it is longer than TEXT_WINDOW_CHARS, or "whole".
+        """
+        if self.chunk_cache is not None and len(text) >= TEXT_INCREMENTAL_MIN_CHARS:
+            return "incremental"
+        if len(text) > TEXT_WINDOW_CHARS:
+            return "windowed"
+        return "whole"
+
+    def analyze_texts(self, texts: List[str], language: str = "en", entities: list = None,
+                      batch_size: int = NLP_BATCH_SIZE, n_process: int = NLP_N_PROCESS) -> List[List[Dict]]:
+        """Analyze many texts in one batched NLP run.
+
+        Texts found in the result cache are not analyzed again and large texts are analyzed incrementally or in windows.
+        Args:
+            texts (List[str]): The texts to analyze.
+            language (str, optional): The language of the texts. Defaults to "en".
+            entities (list, optional): List of entity types to look for. Defaults to None.
+            batch_size (int, optional): Number of texts per spaCy batch. Defaults to NLP_BATCH_SIZE.
+            n_process (int, optional): Number of spaCy worker processes. Defaults to NLP_N_PROCESS.
+        Returns:
+            List[List[Dict]]: The recognized entities of each text, in input order.
+        """
+        if not texts:
+            return []
+        keys = [self._cache_key(text, "text", language, entities) for text in texts]
+        results: List[Optional[List[Dict]]] = [
+            self.cache.get(key) if key is not None else None for key in keys
+        ]
+        for i, text in enumerate(texts):
+            if results[i] is None and self._text_mode(text) != "whole":
+                results[i] = self.analyze_text(text, language=language, entities=entities)
+                if keys[i] is not None:
+                    self.cache.put(keys[i], results[i])
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            batch_results = self.analyzer.analyze_batch(
+                [texts[i] for i in missing], language=language, entities=entities,
+                batch_size=batch_size, n_process=n_process
+            )
+            for i, text_results in zip(missing, batch_results):
+                results[i] = [result.to_dict() for result in text_results]
+                if keys[i] is not None:
+                    self.cache.put(keys[i], results[i])
+        return results
+
     def analyze_image(self, img: Image.Image, language: str = "en", **kwargs) -> List[Dict]:
         """Analyze image for sensitive information.
         Args:
@@ -86,38 +268,87 @@ class Analyzer:
 
         return [result.to_dict() for result in results]
 
-    def analyze_images(self, images: List[Image.Image], language: str = "en", **kwargs) -> List[List[Dict]]:
+    def analyze_image_batch(self, images: List[Image.Image], language: str = "en",
+                            entities: list = None) -> List[List[Dict]]:
+        """Analyze many separate images together, running the detectors on them in batches.
+
+        Images found in the result cache are not analyzed again.
+        Args:
+            images (List[Image.Image]): The images to analyze.
+            language (str, optional): The language of the image content. Defaults to "en".
+            entities (list, optional): List of entity types to look for, part of the cache key. Defaults to None.
+        Returns:
+            List[List[Dict]]: The recognized entities of each image, in input order.
+        """
+        if not images:
+            return []
+        keys = [self._cache_key(img, "img", language, entities) for img in images]
+        results: List[Optional[List[Dict]]] = [
+            self.cache.get(key) if key is not None else None for key in keys
+        ]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            pages = self.image_analyzer.iter_analyze_pages(
+                ((images[i], None) for i in missing), language=language, max_workers=self.page_workers
+            )
+            for i, (_, image_results) in zip(missing, pages):
+                results[i] = [result.to_dict() for result in image_results]
+                if keys[i] is not None:
+                    self.cache.put(keys[i], results[i])
+        return results
+
+    def analyze_images(self, images: List[Image.Image], language: str = "en",
+                       progress: Optional[Callable[[int, int], None]] = None, **kwargs) -> List[List[Dict]]:
         """Analyze a list of images for sensitive information.
         Args:
-            images (List[Image.Image]): The list of images to analyze.
+            images (List[Image.Image]): The list of images to analyze. Born-digital PDF pages are analyzed
+                from their embedded text layer instead of OCR. The detectors run on batches of pages and
+                OCR runs on `page_workers` threads.
             language (str, optional): The language of the image content. Defaults to "en".
+            progress (Callable[[int, int], None], optional): Called with the number of pages analyzed and the
+                page count after each page. Defaults to None.
         Returns:
             List[List[Dict]]: A list where each element is the analysis result for an image.
         """
-        return [self.analyze_image(img, language=language) for img in images]
+        pages = self.image_analyzer.iter_analyze_pages(
+            iter_page_images(images), language=language, max_workers=self.page_workers
+        )
+        pages = track_progress(pages, len(images), progress)
+        return [[result.to_dict() for result in results] for _, results in pages]
     
 
-    def analyze_dataframe(self, df: DataFrame, language: str = "en", **kwargs) -> Dict:
+    def analyze_dataframe(self, df: DataFrame, language: str = "en", entities: list = None, **kwargs) -> Dict:
         """Analyze text data within a DataFrame.
+        Distinct values are analyzed once per DataFrame and numeric and date columns are skipped.
         Args:
             df (pd.DataFrame): The DataFrame to analyze.
             language (str): The language of the data.
+            entities (list, optional): List of entity types to look for. Defaults to None.
+        Returns:
+            Dict: The structured analysis result, mapping columns to the entity type they hold.
+        """
+        return self.dataframe_analyzer.analyze(df, language=language, entities=entities)
+
+    def analyze_dataframe_chunks(self, chunks: Iterable[DataFrame], language: str = "en", entities: list = None, **kwargs) -> Dict:
+        """Analyze text data within a table read in chunks, holding one chunk in memory at a time.
+        Args:
+            chunks (Iterable[pd.DataFrame]): The chunks of the table.
+            language (str): The language of the data.
+            entities (list, optional): List of entity types to look for. Defaults to None.
         Returns:
-            Dict: The structured analysis result.
+            Dict: The structured analysis result, mapping columns to the entity type they hold.
         """
-        tabular_analysis = self.pandas_analyzer.generate_analysis(df=df,language=language)
-        return asdict(tabular_analysis)
+        return self.dataframe_analyzer.analyze_chunks(chunks, language=language, entities=entities)
 
 
-    def analyze_json(self, json_data: Dict, language: str = "en", **kwargs) -> Dict:
-        """Analyze text data within a JSON object.
+    def analyze_json(self, json_data: Union[Dict, List], language: str = "en", entities: list = None, **kwargs) -> Dict:
+        """Analyze text data within JSON data of any nesting, including arrays of records.
         Args:
-            json_data (dict): The JSON data to analyze.
+            json_data (Union[Dict, List]): The JSON data to analyze.
             language (str): The language of the data.
+            entities (list, optional): List of entity types to look for. Defaults to None.
         Returns:
-            Dict: The structured analysis result.
+            Dict: The structured analysis result, mapping dotted field paths to the entity type they hold.
         """
-        check_json_complexity(json_data)
-        analysis = self.json_analyzer.generate_analysis(data=json_data, language=language)
-        return asdict(analysis)
+        return self.json_analyzer.analyze(json_data, language=language, entities=entities)
 
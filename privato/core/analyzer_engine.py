@@ -1,22 +1,33 @@
-from presidio_analyzer import AnalyzerEngine
-from presidio_analyzer.nlp_engine import NlpEngineProvider
-from privato.core.config import SUPPORTED_LANGUAGES, LANGUAGE_CONFIG
+import hashlib
+from typing import Dict, List, Optional
+from presidio_analyzer import AnalyzerEngine, RecognizerRegistry, RecognizerResult
+from presidio_analyzer.nlp_engine import NlpEngine, NlpEngineProvider
+from privato.core.cache import ResultCache
+from privato.core.text_chunking import split_paragraphs, shift_results, split_windows, merge_window_results
+from privato.core.config import SUPPORTED_LANGUAGES, LANGUAGE_CONFIG, NLP_BATCH_SIZE, NLP_N_PROCESS
+from privato.core.config import TEXT_WINDOW_CHARS, TEXT_WINDOW_OVERLAP
 
 class CustomAnalyzerEngine:
     """
     A custom wrapper around the Presidio AnalyzerEngine.
-    
+
     This class handles the setup of a multi-lingual engine and can be
     extended with more custom methods in the future.
     """
-    def __init__(self, language_conf: str = LANGUAGE_CONFIG):
+    def __init__(self, language_conf: str = LANGUAGE_CONFIG, nlp_engine: Optional[NlpEngine] = None,
+                 registry: Optional[RecognizerRegistry] = None):
         """Initializes the engine.
         Args:
             language_conf (str): Path to the language configuration file.
+            nlp_engine (NlpEngine, optional): A pre-built NLP engine to reuse. Built from `language_conf` if not given.
+            registry (RecognizerRegistry, optional): A pre-built recognizer registry to reuse. Defaults to None.
         """
-        provider = NlpEngineProvider(conf_file=language_conf)
+        if nlp_engine is None:
+            provider = NlpEngineProvider(conf_file=language_conf)
+            nlp_engine = provider.create_engine()
         self._analyzer_engine = AnalyzerEngine(
-            nlp_engine=provider.create_engine(),
+            nlp_engine=nlp_engine,
+            registry=registry,
             supported_languages=SUPPORTED_LANGUAGES
         )
 
@@ -29,3 +40,115 @@ class CustomAnalyzerEngine:
         """
         return self._analyzer_engine.analyze(*args, **kwargs)
 
+    def analyze_batch(self, texts: List[str], language: str, entities: Optional[List[str]] = None,
+                      batch_size: int = NLP_BATCH_SIZE, n_process: int = NLP_N_PROCESS,
+                      **kwargs) -> List[List[RecognizerResult]]:
+        """
+        Analyzes many texts of the same language with a single streamed `nlp.pipe` run.
+
+        The NLP artifacts of every text are computed in batches first, then the
+        recognizers run on the precomputed artifacts, as in Presidio's BatchAnalyzerEngine.
+        Args:
+            texts (List[str]): The texts to analyze.
+            language (str): The language of the texts.
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+            batch_size (int, optional): Number of texts per spaCy batch. Defaults to NLP_BATCH_SIZE.
+            n_process (int, optional): Number of spaCy worker processes. Defaults to NLP_N_PROCESS.
+            **kwargs: Extra keyword arguments for the analyze method.
+        Returns:
+            List[List[RecognizerResult]]: The results of each text, in input order.
+        """
+        nlp_artifacts_batch = self._analyzer_engine.nlp_engine.process_batch(
+            texts=texts, language=language, batch_size=batch_size, n_process=n_process
+        )
+        return [
+            self._analyzer_engine.analyze(
+                text=text, language=language, entities=entities, nlp_artifacts=nlp_artifacts, **kwargs
+            )
+            for text, nlp_artifacts in nlp_artifacts_batch
+        ]
+
+    def analyze_incremental(self, text: str, language: str, cache: ResultCache, entities: Optional[List[str]] = None,
+                            batch_size: int = NLP_BATCH_SIZE, n_process: int = NLP_N_PROCESS,
+                            **kwargs) -> List[RecognizerResult]:
+        """
+        Analyzes a large text paragraph by paragraph, reusing the cached results of paragraphs seen before.
+
+        Only paragraphs missing from the cache are analyzed, in one batched run, and each distinct
+        paragraph is analyzed once even when repeated. Entities spanning a blank line are not found.
+        Args:
+            text (str): The text to analyze.
+            language (str): The language of the text.
+            cache (ResultCache): The cache holding the results of every paragraph.
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+            batch_size (int, optional): Number of paragraphs per spaCy batch. Defaults to NLP_BATCH_SIZE.
+            n_process (int, optional): Number of spaCy worker processes. Defaults to NLP_N_PROCESS.
+            **kwargs: Extra keyword arguments for the analyze method.
+        Returns:
+            List[RecognizerResult]: The results, with offsets in the whole text.
+        """
+        chunks = split_paragraphs(text)
+        keys = [
+            cache.make_key(hashlib.sha256(chunk.encode()).hexdigest(), "analyze_chunk", "text", language, entities)
+            for _, chunk in chunks
+        ]
+        chunk_results: Dict[str, List[Dict]] = {}
+        missing: Dict[str, str] = {}
+        for key, (_, chunk) in zip(keys, chunks):
+            if key in chunk_results or key in missing:
+                continue
+            cached_results = cache.get(key)
+            if cached_results is None:
+                missing[key] = chunk
+            else:
+                chunk_results[key] = cached_results
+        # Lines too long for a single spaCy run are analyzed in windows, the rest in one batch
+        long_chunks = {key: chunk for key, chunk in missing.items() if len(chunk) > TEXT_WINDOW_CHARS}
+        short_chunks = {key: chunk for key, chunk in missing.items() if key not in long_chunks}
+        analyzed = {
+            key: self.analyze_windowed(chunk, language=language, entities=entities, n_process=n_process, **kwargs)
+            for key, chunk in long_chunks.items()
+        }
+        if short_chunks:
+            batch_results = self.analyze_batch(
+                list(short_chunks.values()), language=language, entities=entities,
+                batch_size=batch_size, n_process=n_process, **kwargs
+            )
+            analyzed.update(zip(short_chunks, batch_results))
+        for key, results in analyzed.items():
+            chunk_results[key] = [result.to_dict() for result in results]
+            cache.put(key, chunk_results[key])
+        return [
+            result
+            for key, (start, _) in zip(keys, chunks)
+            for result in shift_results(chunk_results[key], start)
+        ]
+
+    def analyze_windowed(self, text: str, language: str, entities: Optional[List[str]] = None,
+                         window_chars: int = TEXT_WINDOW_CHARS, overlap_chars: int = TEXT_WINDOW_OVERLAP,
+                         batch_size: int = 1, n_process: int = NLP_N_PROCESS, **kwargs) -> List[RecognizerResult]:
+        """
+        Analyzes a very large text in overlapping windows cut at sentence boundaries.
+
+        The windows are streamed through `analyze_batch`, so spaCy never sees more than
+        `window_chars` characters at once and `n_process` windows can be parsed in parallel.
+        Args:
+            text (str): The text to analyze.
+            language (str): The language of the text.
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+            window_chars (int, optional): The maximum window length. Defaults to TEXT_WINDOW_CHARS.
+            overlap_chars (int, optional): The overlap between consecutive windows. Defaults to TEXT_WINDOW_OVERLAP.
+            batch_size (int, optional): Number of windows per spaCy batch. Defaults to 1.
+            n_process (int, optional): Number of spaCy worker processes. Defaults to NLP_N_PROCESS.
+            **kwargs: Extra keyword arguments for the analyze method.
+        Returns:
+            List[RecognizerResult]: The de-duplicated results, with offsets in the whole text.
+        """
+        windows = split_windows(text, window_chars=window_chars, overlap_chars=overlap_chars)
+        batch_results = self.analyze_batch(
+            [window for _, window in windows], language=language, entities=entities,
+            batch_size=batch_size, n_process=n_process, **kwargs
+        )
+        return merge_window_results([
+            (start, len(window), results) for (start, window), results in zip(windows, batch_results)
+        ])
@@ -0,0 +1,294 @@
+"""Content-addressed cache of analysis and redaction results."""
+import functools
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+from privato.core import config
+from privato.core.config import (
+    logger,
+    CACHE_MAX_ENTRIES,
+    CACHE_MEMORY_MAX_BYTES,
+    CACHE_DISK_PATH,
+    CACHE_DISK_MAX_BYTES,
+    TEXT_CHUNK_CACHE_MAX_ENTRIES,
+    TEXT_CHUNK_CACHE_MAX_BYTES,
+)
+
+# The settings the analysis and redaction results depend on, read when a key is built
+_RESULT_SETTINGS = (
+    "VERSION",
+    "LANGUAGE_CONFIG",
+    "SUPPORTED_LANGUAGES",
+    "TEXT_INCREMENTAL",
+    "TEXT_INCREMENTAL_MIN_CHARS",
+    "TEXT_CHUNK_MAX_CHARS",
+    "TEXT_WINDOW_CHARS",
+    "TEXT_WINDOW_OVERLAP",
+    "DF_SAMPLE_SIZE",
+    "DF_ENTITY_THRESHOLD",
+    "DF_REDACTION_OPERATOR",
+    "DF_REDACTION_OPERATORS",
+    "DF_MASK_CHAR",
+    "DF_HASH_SALT",
+    "PDF_TEXT_LAYER",
+    "PDF_TEXT_LAYER_MIN_CHARS",
+    "IMAGE_DETECTION_MAX_SIDE",
+    "IMAGE_OCR_MAX_SIDE",
+    "IMAGE_TILE_SIZE",
+    "IMAGE_TILE_OVERLAP",
+    "DETECTION_BACKEND",
+    "DETECTION_QUANTIZED",
+    "DETECTION_CONFIDENCE_THRESHOLD",
+    "DETECTION_CLASSES",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str) -> Optional[str]:
+    """Hash a configuration file, e.g. the language configuration naming the NLP models.
+    Args:
+        path (str): The file path.
+    Returns:
+        Optional[str]: The SHA-256 of the file, or None if it cannot be read.
+    """
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def engine_version() -> str:
+    """Describe the engines producing the results, so that cached results are not reused across upgrades
+    or configuration changes.
+    Returns:
+        str: The package version, the settings affecting results and the language configuration.
+    """
+    settings = {name: getattr(config, name) for name in _RESULT_SETTINGS}
+    settings["LANGUAGE_CONFIG_DIGEST"] = _file_digest(str(config.LANGUAGE_CONFIG))
+    return json.dumps(settings, sort_keys=True, default=_setting_repr)
+
+
+def _setting_repr(value: Any) -> Any:
+    """Describe a setting JSON cannot encode, with sets in a stable order."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+class ResultCache:
+    """
+    A two-tier cache of results keyed by content hash.
+
+    Both tiers hold pickled results, so every hit returns a fresh copy that callers are free to modify.
+    The memory tier is an LRU bounded by an entry count and by the size of the pickled results; a result larger
+    than the whole budget is not kept in memory. The optional disk tier is a SQLite database shared by every process
+    using the same path; the least recently used rows are evicted once it exceeds `disk_max_bytes`.
+    """
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MEMORY_MAX_BYTES,
+                 disk_path: Optional[Union[str, Path]] = CACHE_DISK_PATH, disk_max_bytes: int = CACHE_DISK_MAX_BYTES):
+        """Initialize the cache.
+        Args:
+            max_entries (int, optional): Maximum number of results kept in memory, 0 to disable the memory tier.
+                Defaults to CACHE_MAX_ENTRIES.
+            max_bytes (int, optional): Maximum size of the pickled results kept in memory.
+                Defaults to CACHE_MEMORY_MAX_BYTES.
+            disk_path (Union[str, Path], optional): Path of the SQLite database of the disk tier, None to disable it.
+                Defaults to CACHE_DISK_PATH.
+            disk_max_bytes (int, optional): Maximum total size of the pickled results on disk.
+                Defaults to CACHE_DISK_MAX_BYTES.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path), timeout=30, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            # The total size is kept up to date on every write, so inserts do not sum the whole table
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)"
+            )
+            self._db.execute(
+                "INSERT OR IGNORE INTO results_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM results"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(content_hash: str, operation: str, data_type: str, language: str,
+                 entities: Optional[Iterable[str]] = None, **options: Any) -> str:
+        """Build the cache key of a result.
+        Args:
+            content_hash (str): The fingerprint of the input data.
+            operation (str): What produced the result, e.g. 'analyze' or 'redact'.
+            data_type (str): The type of the input data.
+            language (str): The language of the content.
+            entities (Iterable[str], optional): The entity types looked for, None for all. Defaults to None.
+            **options: Any other setting the result depends on.
+        Returns:
+            str: The cache key.
+        """
+        parts = [
+            content_hash, operation, data_type, language,
+            sorted(entities) if entities is not None else None,
+            engine_version(), sorted(options.items()),
+        ]
+        return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a result, promoting disk hits to memory.
+        Args:
+            key (str): The cache key.
+            default (Any, optional): Returned on a miss. Defaults to None.
+        Returns:
+            Any: The cached result, or `default`.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                blob = self._memory[key]
+            else:
+                blob = self._disk_get(key)
+                if blob is None:
+                    return default
+                self._memory_put(key, blob)
+        try:
+            return pickle.loads(blob)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning(f"Could not read cached result {key}: {e}")
+            return default
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result in every enabled tier.
+        Args:
+            key (str): The cache key.
+            value (Any): The result to store.
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Could not cache result {key}: {e}")
+            return
+        with self._lock:
+            self._memory_put(key, blob)
+            self._disk_put(key, blob)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.execute("UPDATE results_size SET total = 0")
+                self._db.commit()
+
+    def _memory_put(self, key: str, blob: bytes) -> None:
+        """Store a pickled result in the memory tier. Must be called with the lock held."""
+        if self.max_entries <= 0:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        if len(blob) > self.max_bytes:
+            return
+        self._memory[key] = blob
+        self._memory_bytes += len(blob)
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            self._memory_bytes -= len(self._memory.popitem(last=False)[1])
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        """Look up a pickled result in the disk tier. Must be called with the lock held."""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read cached result {key}: {e}")
+            return None
+
+    def _disk_put(self, key: str, blob: bytes) -> None:
+        """Store a pickled result in the disk tier and evict the least recently used rows. Must be called with the lock held."""
+        if self._db is None:
+            return
+        if len(blob) > self.disk_max_bytes:
+            return
+        try:
+            # Locks the database at once, so that concurrent processes keep the total size consistent
+            self._db.execute("BEGIN IMMEDIATE")
+            replaced = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            growth = len(blob) - (replaced[0] if replaced else 0)
+            self._db.execute("UPDATE results_size SET total = total + ?", (growth,))
+            total = self._db.execute("SELECT total FROM results_size").fetchone()[0]
+            if total > self.disk_max_bytes:
+                evicted = []
+                freed = 0
+                rows = self._db.execute("SELECT key, size FROM results WHERE key != ? ORDER BY accessed", (key,))
+                for row_key, size in rows:
+                    if total - freed <= self.disk_max_bytes:
+                        break
+                    evicted.append((row_key,))
+                    freed += size
+                rows.close()
+                self._db.executemany("DELETE FROM results WHERE key = ?", evicted)
+                self._db.execute("UPDATE results_size SET total = total - ?", (freed,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            self._db.rollback()
+            logger.warning(f"Could not cache result {key} on disk: {e}")
+
+
+_result_cache: Optional[ResultCache] = None
+_chunk_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache, creating it on first use.
+    Returns:
+        ResultCache: The shared result cache.
+    """
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache()
+    return _result_cache
+
+
+def get_chunk_cache() -> ResultCache:
+    """Get the process-wide cache of paragraph results used by incremental text analysis, creating it on first use.
+
+    It is kept apart from the result cache, so that the many small paragraph results of a large text
+    do not evict whole results, and it stays in memory only.
+    Returns:
+        ResultCache: The shared paragraph result cache.
+    """
+    global _chunk_cache
+    if _chunk_cache is None:
+        with _result_cache_lock:
+            if _chunk_cache is None:
+                _chunk_cache = ResultCache(max_entries=TEXT_CHUNK_CACHE_MAX_ENTRIES,
+                                           max_bytes=TEXT_CHUNK_CACHE_MAX_BYTES, disk_path=None)
+    return _chunk_cache
@@ -0,0 +1,33 @@
+"""Concurrency helpers."""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+def map_ordered(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 1,
+                max_in_flight: Optional[int] = None) -> Iterator[Any]:
+    """Apply `func` to every item on a thread pool, yielding the results in input order.
+
+    Items are pulled from `items` in the calling thread, so lazily produced inputs
+    (such as rendered PDF pages) are only created when a worker is about to be free,
+    and at most `max_in_flight` of them are held at once.
+    Args:
+        func (Callable[[Any], Any]): The function to apply.
+        items (Iterable[Any]): The inputs.
+        max_workers (int, optional): Number of worker threads. Runs serially when 1 or less. Defaults to 1.
+        max_in_flight (int, optional): Maximum number of submitted, unconsumed tasks. Defaults to twice `max_workers`.
+    Returns:
+        Iterator[Any]: The results, in input order.
+    """
+    if max_workers <= 1:
+        yield from map(func, items)
+        return
+    max_in_flight = max_in_flight or 2 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -7,7 +7,14 @@ from loguru import logger
 API_PREFIX = "/api"
 VERSION = "0.1.2"
 DEBUG: bool = False
+# Cache analysis and redaction results by content hash, so resubmitted files are not processed again
 MEMOIZATION_FLAG: bool = True
+# Results kept in memory, up to a total pickled size in bytes, and the optional SQLite database (None disables it)
+# with its size limit in bytes
+CACHE_MAX_ENTRIES: int = 512
+CACHE_MEMORY_MAX_BYTES: int = 256 * 1024 * 1024
+CACHE_DISK_PATH = None
+CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
 
 PROJECT_NAME: str = "Privato"
 
@@ -24,8 +31,97 @@ SIGNATURE_REPO_ID = "tech4humans/yolov8s-signature-detector"
 HUGGING_FACE_KEY = ""
 FACE_MODEL_NAME = "model.pt"
 FACE_REPO_ID = "arnabdhar/YOLOv8-Face-Detection"
+# ONNX export of the face model, produced locally by privato.ml.pull_models
+FACE_ONNX_MODEL_NAME = "model.onnx"
 LANGUAGE_CONFIG = "docs/languages-config.yml"
 SUPPORTED_LANGUAGES = "en,es,de".split(",")
+# Load a language's spaCy pipeline the first time it is used instead of at startup
+NLP_LAZY_LOADING: bool = True
+# Maximum number of language pipelines kept in memory (least recently used are evicted), None for no limit
+NLP_MAX_LOADED_LANGUAGES = None
+# Batch size and number of processes used by spaCy's nlp.pipe when analyzing many texts at once
+NLP_BATCH_SIZE: int = 32
+NLP_N_PROCESS: int = 1
+# Opt in to analyze texts of at least TEXT_INCREMENTAL_MIN_CHARS paragraph by paragraph, reusing cached paragraph
+# results; entities spanning a blank line are then missed
+TEXT_INCREMENTAL: bool = False
+TEXT_INCREMENTAL_MIN_CHARS: int = 10_000
+# Paragraph results are kept in their own in-memory cache, limited in entries and in pickled bytes
+TEXT_CHUNK_CACHE_MAX_ENTRIES: int = 100_000
+TEXT_CHUNK_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+# Paragraphs longer than this are split into lines
+TEXT_CHUNK_MAX_CHARS: int = 5_000
+# Texts longer than TEXT_WINDOW_CHARS are analyzed in overlapping windows cut at sentence boundaries
+TEXT_WINDOW_CHARS: int = 100_000
+TEXT_WINDOW_OVERLAP: int = 1_000
+# Rows sampled to classify DataFrame columns (None uses every row), and the share of a column's values
+# that must hold an entity type for the column to be mapped to it
+DF_SAMPLE_SIZE = None
+DF_ENTITY_THRESHOLD: float = 0.5
+# Read CSV and XLSX files in chunks of this many rows so memory does not grow with the file (None loads them whole)
+DF_CHUNK_ROWS = None
+# Operators redacting DataFrame columns: "replace", "mask" or "hash", per entity type with a default
+DF_REDACTION_OPERATOR: str = "replace"
+DF_REDACTION_OPERATORS = {}
+DF_MASK_CHAR: str = "*"
+DF_HASH_SALT: str = ""
+# Characters read at a time when streaming a JSON file, and records redacted together
+JSON_STREAM_CHUNK_CHARS: int = 1 << 20
+JSON_STREAM_BATCH_SIZE: int = 1000
+# Number of worker processes used by the CLI to analyze or redact a directory
+CLI_WORKERS: int = 1
+# Pre-warmed worker processes running API inference (0 runs it in one thread of the server process),
+# and the number of requests allowed to wait for a worker before new ones are refused with a 503
+API_WORKERS: int = 2
+API_MAX_QUEUE: int = 8
+# Maximum number of files, and their total size in bytes, accepted by a batch request. Members of zip archives
+# count with their uncompressed size, checked before they are extracted
+API_BATCH_MAX_FILES: int = 1000
+API_BATCH_MAX_BYTES: int = 1024 * 1024 * 1024
+# Job API: worker processes running submitted jobs (0 runs them in one thread of the server process),
+# the directory holding the job database, uploads and results, and seconds a job is kept once done or failed
+JOB_WORKERS: int = 1
+JOBS_DIR: str = ".privato/jobs"
+JOBS_TTL: int = 24 * 3600
+# Number of documents held in memory at once when streaming a directory through analysis or redaction
+PIPELINE_WINDOW_SIZE: int = 16
+# Render PDF pages lazily in memory instead of writing temporary PNG files
+PDF_IN_MEMORY: bool = True
+# Analyze born-digital PDF pages from their embedded text layer instead of OCR
+PDF_TEXT_LAYER: bool = True
+# Minimum number of embedded characters for a page to be treated as born-digital
+PDF_TEXT_LAYER_MIN_CHARS: int = 20
+# How PDFs are redacted: "raster" re-renders redacted page images, "vector" applies redactions to the original document
+PDF_REDACTION_MODES = ("raster", "vector")
+PDF_REDACTION_MODE: str = "raster"
+# Number of threads analyzing or redacting the pages of a document concurrently
+PAGE_WORKERS: int = 1
+# Number of images sent through each YOLO detector per call
+DETECTION_BATCH_SIZE: int = 8
+# Minimum confidence of a kept face/signature detection, and the detector class names to keep (None keeps all)
+DETECTION_CONFIDENCE_THRESHOLD: float = 0.0
+DETECTION_CLASSES = None
+# Long side images are downscaled to before detection and before OCR (None keeps full resolution)
+IMAGE_DETECTION_MAX_SIDE = 1280
+IMAGE_OCR_MAX_SIDE = None
+# Images with a long side above IMAGE_TILE_SIZE are split into overlapping tiles for detection (None disables tiling)
+IMAGE_TILE_SIZE = None
+IMAGE_TILE_OVERLAP: int = 128
+# Threads running the face and signature detectors alongside OCR (0 runs them one after the other)
+IMAGE_DETECTION_WORKERS: int = 2
+# Seconds an analysis stays redeemable for redaction by its handle, and how many analyses are kept
+ANALYSIS_STORE_TTL: float = 3600
+ANALYSIS_STORE_MAX_ENTRIES: int = 256
+# Backend running the face and signature detectors: "ultralytics" or "onnxruntime"
+DETECTION_BACKENDS = ("ultralytics", "onnxruntime")
+DETECTION_BACKEND: str = "ultralytics"
+# Use the INT8 dynamic-quantized ONNX models with the "onnxruntime" backend
+DETECTION_QUANTIZED: bool = False
+# ONNX Runtime session options, 0 threads lets ONNX Runtime decide
+ORT_INTRA_OP_THREADS: int = 0
+ORT_INTER_OP_THREADS: int = 0
+ORT_GRAPH_OPTIMIZATION_LEVEL: str = "all"
+ORT_EXECUTION_PROVIDERS = ["CPUExecutionProvider"]
 
 logging.getLogger("presidio-analyzer").setLevel(logging.ERROR)
 logging.getLogger("presidio-analyzer").propagate = False
\ No newline at end of file
@@ -1,16 +1,165 @@
 """PDF to Image Converter Module."""
 import os
+from collections.abc import Sequence
 from pathlib import Path
-from typing import List, IO
+from typing import Dict, Iterator, List, IO, Optional, Tuple, Union
 import fitz
 from PIL import Image
 import tempfile
 from io import BytesIO
+from privato.core.config import PDF_TEXT_LAYER, PDF_TEXT_LAYER_MIN_CHARS
+
+
+def render_page(page: fitz.Page, dpi: int) -> Image.Image:
+    """
+    Render a PDF page straight from its pixmap buffer into a PIL image.
+    Args:
+        page (fitz.Page): The page to render.
+        dpi (int): Dots per inch for the output image.
+    Returns:
+        Image.Image: The rendered RGB page.
+    """
+    pix = page.get_pixmap(dpi=dpi)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def extract_text_layer(page: fitz.Page, dpi: int, min_chars: int = PDF_TEXT_LAYER_MIN_CHARS) -> Optional[Dict[str, list]]:
+    """
+    Extract the embedded words of a page as an OCR-style result in rendered image coordinates.
+
+    The result has the same layout as Tesseract's `image_to_data` dictionary, so it can
+    replace an OCR pass for born-digital pages.
+    Args:
+        page (fitz.Page): The page to extract words from.
+        dpi (int): Dots per inch of the rendered page image the boxes refer to.
+        min_chars (int, optional): Minimum number of extracted characters for the text layer to be used.
+            Defaults to PDF_TEXT_LAYER_MIN_CHARS.
+    Returns:
+        Optional[Dict[str, list]]: The words with their boxes, or None if the page has no usable text layer.
+    """
+    words = page.get_text("words")
+    if sum(len(word[4]) for word in words) < max(min_chars, 1):
+        return None
+    matrix = page.rotation_matrix * fitz.Matrix(dpi / 72, dpi / 72)
+    ocr_result = {"left": [], "top": [], "width": [], "height": [], "conf": [], "text": []}
+    for word in words:
+        rect = fitz.Rect(word[:4]) * matrix
+        ocr_result["left"].append(int(rect.x0))
+        ocr_result["top"].append(int(rect.y0))
+        ocr_result["width"].append(int(rect.width))
+        ocr_result["height"].append(int(rect.height))
+        ocr_result["conf"].append(100.0)
+        ocr_result["text"].append(word[4])
+    return ocr_result
+
+
+class PDFPages(Sequence):
+    """
+    The pages of a PDF document, rendered to images on access.
+
+    Nothing is written to disk and pages are only rasterized when they are
+    iterated over or indexed, so the first page can be analyzed before the
+    rest of the document is rendered. `iter_pages` also yields the embedded
+    text layer of born-digital pages so that they can skip OCR.
+    Attributes:
+        pdf_bytes (bytes): The bytes of the PDF document.
+        dpi (int): Dots per inch for the rendered images.
+    """
+    def __init__(self, pdf_bytes: bytes, dpi: int = 200):
+        """Open the document once to count its pages.
+        Args:
+            pdf_bytes (bytes): The bytes of the PDF document.
+            dpi (int, optional): Dots per inch for the rendered images. Defaults to 200.
+        """
+        self.pdf_bytes = pdf_bytes
+        self.dpi = dpi
+        with self._open() as pdf:
+            self._page_count = pdf.page_count
+
+    def _open(self) -> fitz.Document:
+        """Open the underlying PDF document."""
+        return fitz.open(stream=self.pdf_bytes, filetype="pdf")
+
+    def __len__(self) -> int:
+        return self._page_count
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Image.Image, List[Image.Image]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PDF page index out of range.")
+        with self._open() as pdf:
+            return render_page(pdf[index], self.dpi)
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        with self._open() as pdf:
+            for page in pdf:
+                yield render_page(page, self.dpi)
+
+    def iter_pages(self, use_text_layer: bool = True) -> Iterator[Tuple[Image.Image, Optional[Dict[str, list]]]]:
+        """
+        Iterate over the rendered pages together with their embedded text layer.
+        Args:
+            use_text_layer (bool, optional): Whether to extract the text layer. Defaults to True.
+        Returns:
+            Iterator[Tuple[Image.Image, Optional[Dict[str, list]]]]: Pairs of page image and OCR-style
+            text layer, which is None for scanned pages.
+        """
+        with self._open() as pdf:
+            for page in pdf:
+                text_layer = extract_text_layer(page, self.dpi) if use_text_layer else None
+                yield render_page(page, self.dpi), text_layer
+
+    def redact(self, page_boxes: Sequence, fill: Tuple[float, float, float] = (0, 0, 0)) -> bytes:
+        """
+        Redact the original document with PyMuPDF redaction annotations.
+
+        Text, vector graphics and image pixels under each box are removed from the PDF
+        itself, so the output keeps its text layer and is not re-rasterized.
+        Args:
+            page_boxes (Sequence): For each page, the boxes to redact with `left`, `top`, `width` and `height`
+                attributes in rendered image coordinates.
+            fill (Tuple[float, float, float], optional): RGB fill color of the redacted areas, in the 0-1 range.
+                Defaults to black.
+        Returns:
+            bytes: The bytes of the redacted PDF document.
+        """
+        scale = fitz.Matrix(72 / self.dpi, 72 / self.dpi)
+        with self._open() as pdf:
+            for page, boxes in zip(pdf, page_boxes):
+                if not boxes:
+                    continue
+                matrix = scale * page.derotation_matrix
+                for box in boxes:
+                    rect = fitz.Rect(box.left, box.top, box.left + box.width, box.top + box.height) * matrix
+                    page.add_redact_annot(rect, fill=fill)
+                page.apply_redactions()
+            return pdf.tobytes(garbage=3, deflate=True)
+
+
+def iter_page_images(images: Sequence, use_text_layer: bool = PDF_TEXT_LAYER) -> Iterator[Tuple[Image.Image, Optional[Dict[str, list]]]]:
+    """
+    Iterate over page images with their embedded text layer, when the pages come from a PDF.
+    Args:
+        images (Sequence): The page images, either a PDFPages or a list of images.
+        use_text_layer (bool, optional): Whether to extract the text layer of PDF pages. Defaults to PDF_TEXT_LAYER.
+    Returns:
+        Iterator[Tuple[Image.Image, Optional[Dict[str, list]]]]: Pairs of page image and text layer, which is None
+        when the page has to be OCRed.
+    """
+    if isinstance(images, PDFPages):
+        yield from images.iter_pages(use_text_layer=use_text_layer)
+    else:
+        for img in images:
+            yield img, None
+
 
 class PDFToImageConverter:
     """
     Convert PDF pages to images using PyMuPDF and PIL.
-    Each page is converted to a PNG image and saved as a temporary file.
+    Pages are either rendered lazily in memory or converted to PNG images saved as temporary files.
     Args:
         dpi (int): Dots per inch for the output images. Default is 200.
     Returns:
@@ -30,8 +179,7 @@ class PDFToImageConverter:
 
         with fitz.open(stream=BytesIO(file), filetype="pdf") as pdf:
             for page_num, page in enumerate(pdf,start=1):
-                pix = page.get_pixmap(dpi = self.dpi)
-                img =  Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                img = render_page(page, self.dpi)
                 fd, temp_path = tempfile.mkstemp(suffix=f"_page{page_num}.png")
                 os.close(fd)
                 output_path = Path(temp_path)
@@ -39,3 +187,13 @@ class PDFToImageConverter:
                 img.close()
                 output_files.append(output_path)
         return output_files
+
+    def convert_in_memory(self, file: bytes) -> PDFPages:
+        """
+        Wrap a PDF file into lazily rendered in-memory page images, without any PNG encoding or disk I/O.
+        Args:
+            file (bytes): The bytes of the input PDF file.
+        Returns:
+            PDFPages: The pages of the document, rendered on access.
+        """
+        return PDFPages(file, dpi=self.dpi)
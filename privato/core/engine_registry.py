@@ -0,0 +1,127 @@
+"""Process-wide registry of shared, lazily built analysis engines."""
+import threading
+from typing import Any, Callable, Dict, Optional
+from presidio_analyzer import RecognizerRegistry
+from presidio_analyzer.nlp_engine import NlpEngine, NlpEngineProvider
+from presidio_anonymizer import AnonymizerEngine
+from presidio_image_redactor import OCR, TesseractOCR
+from privato.core.analyzer_engine import CustomAnalyzerEngine
+from privato.core.image_analyzer_engine import CustomImageAnalyzerEngine
+from privato.core.nlp_engine import LazyNlpEngine
+from privato.core.config import LANGUAGE_CONFIG, SUPPORTED_LANGUAGES, NLP_LAZY_LOADING, NLP_MAX_LOADED_LANGUAGES, logger
+from privato.ml.inference import ImageInference
+
+
+class EngineRegistry:
+    """Builds each engine on first use and hands out the same instance afterwards.
+
+    spaCy pipelines and YOLO models are by far the most expensive objects in the
+    application, so every `Analyzer` and `Redactor` in a process should share a
+    single copy of them instead of loading their own.
+    Attributes:
+        language_conf (str): Path to the language configuration file used for the NLP engine.
+        lazy_nlp (bool): Whether language pipelines are loaded on first use.
+        max_loaded_languages (Optional[int]): Cap on resident language pipelines in lazy mode.
+    """
+    def __init__(self, language_conf: str = LANGUAGE_CONFIG, lazy_nlp: bool = NLP_LAZY_LOADING,
+                 max_loaded_languages: Optional[int] = NLP_MAX_LOADED_LANGUAGES):
+        """Initialize an empty registry.
+        Args:
+            language_conf (str, optional): Path to the language configuration file. Defaults to LANGUAGE_CONFIG.
+            lazy_nlp (bool, optional): Load each language pipeline on first use. Defaults to NLP_LAZY_LOADING.
+            max_loaded_languages (int, optional): Cap on resident language pipelines in lazy mode. Defaults to NLP_MAX_LOADED_LANGUAGES.
+        """
+        self.language_conf = language_conf
+        self.lazy_nlp = lazy_nlp
+        self.max_loaded_languages = max_loaded_languages
+        self._engines: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the engine registered under `name`, building it with `factory` on first access.
+        Args:
+            name (str): The registry key of the engine.
+            factory (Callable[[], Any]): Builds the engine when it is not registered yet.
+        Returns:
+            Any: The shared engine instance.
+        """
+        engine = self._engines.get(name)
+        if engine is None:
+            with self._lock:
+                engine = self._engines.get(name)
+                if engine is None:
+                    logger.info(f"Loading shared engine '{name}'...")
+                    engine = factory()
+                    self._engines[name] = engine
+        return engine
+
+    def get_nlp_engine(self) -> NlpEngine:
+        """Get the shared spaCy NLP engine for all configured languages."""
+        def factory() -> NlpEngine:
+            if self.lazy_nlp:
+                return LazyNlpEngine(self.language_conf, max_loaded_languages=self.max_loaded_languages)
+            return NlpEngineProvider(conf_file=self.language_conf).create_engine()
+        return self._get_or_create("nlp", factory)
+
+    def get_recognizer_registry(self) -> RecognizerRegistry:
+        """Get the shared registry of predefined Presidio recognizers."""
+        def factory() -> RecognizerRegistry:
+            registry = RecognizerRegistry(supported_languages=SUPPORTED_LANGUAGES)
+            registry.load_predefined_recognizers(languages=SUPPORTED_LANGUAGES, nlp_engine=self.get_nlp_engine())
+            return registry
+        return self._get_or_create("recognizers", factory)
+
+    def get_analyzer_engine(self) -> CustomAnalyzerEngine:
+        """Get the shared text analyzer engine."""
+        return self._get_or_create(
+            "analyzer",
+            lambda: CustomAnalyzerEngine(
+                language_conf=self.language_conf,
+                nlp_engine=self.get_nlp_engine(),
+                registry=self.get_recognizer_registry()
+            )
+        )
+
+    def get_ocr_engine(self) -> OCR:
+        """Get the shared OCR engine."""
+        return self._get_or_create("ocr", TesseractOCR)
+
+    def get_image_inference(self) -> ImageInference:
+        """Get the shared YOLO signature and face detectors."""
+        return self._get_or_create("image_inference", ImageInference)
+
+    def get_image_analyzer_engine(self) -> CustomImageAnalyzerEngine:
+        """Get the shared image analyzer engine built on top of the other shared engines."""
+        return self._get_or_create(
+            "image_analyzer",
+            lambda: CustomImageAnalyzerEngine(
+                analyzer_engine=self.get_analyzer_engine(),
+                image_inference=self.get_image_inference(),
+                ocr=self.get_ocr_engine()
+            )
+        )
+
+    def get_anonymizer_engine(self) -> AnonymizerEngine:
+        """Get the shared text anonymizer engine."""
+        return self._get_or_create("anonymizer", AnonymizerEngine)
+
+    def clear(self) -> None:
+        """Drop every cached engine so that the next access rebuilds it."""
+        with self._lock:
+            self._engines.clear()
+
+
+_default_registry: Optional[EngineRegistry] = None
+_default_registry_lock = threading.Lock()
+
+def get_engine_registry() -> EngineRegistry:
+    """Get the process-wide engine registry.
+    Returns:
+        EngineRegistry: The registry shared by every Analyzer and Redactor in this process.
+    """
+    global _default_registry
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                _default_registry = EngineRegistry()
+    return _default_registry
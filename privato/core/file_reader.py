@@ -4,8 +4,37 @@ import pandas as pd
 from pandas import DataFrame
 import json
 from PIL import Image
-from typing import IO, Union
+from typing import IO, Callable, Iterator, Union
 from io import BytesIO
+from itertools import islice
+from openpyxl import load_workbook
+
+
+class DataFrameChunks:
+    """
+    A table read as a sequence of bounded DataFrame chunks.
+
+    Each iteration reads the source again from the start, so the chunks can be
+    analyzed in one pass and redacted in another while holding a single chunk in memory.
+    """
+    def __init__(self, factory: Callable[[], Iterator[DataFrame]]):
+        """Initialize the chunk sequence.
+        Args:
+            factory (Callable[[], Iterator[DataFrame]]): Returns a fresh iterator over the chunks on every call.
+        """
+        self._factory = factory
+
+    def __iter__(self) -> Iterator[DataFrame]:
+        return self._factory()
+
+    def map(self, func: Callable[[DataFrame], DataFrame]) -> "DataFrameChunks":
+        """Lazily apply a function to every chunk.
+        Args:
+            func (Callable[[DataFrame], DataFrame]): The function to apply.
+        Returns:
+            DataFrameChunks: The transformed chunks.
+        """
+        return DataFrameChunks(lambda: (func(chunk) for chunk in self))
 
 class FileReader:
     """
@@ -45,6 +74,47 @@ class FileReader:
         if isinstance(file, Path):
             return pd.read_csv(file)
         return pd.read_csv(BytesIO(file))
+    def read_csv_chunks(self, file: Union[Path, IO[bytes]], chunk_rows: int) -> DataFrameChunks:
+        """
+        Read a .csv file lazily, `chunk_rows` rows at a time.
+        Args:
+            file (Union[Path, IO[bytes]]): The file path or a seekable binary file object.
+            chunk_rows (int): Number of rows per chunk.
+        Returns:
+            DataFrameChunks: The chunks of the file.
+        """
+        def iter_chunks() -> Iterator[DataFrame]:
+            if not isinstance(file, Path):
+                file.seek(0)
+            with pd.read_csv(file, chunksize=chunk_rows) as reader:
+                yield from reader
+        return DataFrameChunks(iter_chunks)
+
+    def read_xlsx_chunks(self, file: Union[Path, IO[bytes]], chunk_rows: int) -> DataFrameChunks:
+        """
+        Stream the rows of the first sheet of a .xlsx file, `chunk_rows` rows at a time.
+        The first row holds the column names.
+        Args:
+            file (Union[Path, IO[bytes]]): The file path or a seekable binary file object.
+            chunk_rows (int): Number of rows per chunk.
+        Returns:
+            DataFrameChunks: The chunks of the file.
+        """
+        def iter_chunks() -> Iterator[DataFrame]:
+            if not isinstance(file, Path):
+                file.seek(0)
+            workbook = load_workbook(file, read_only=True, data_only=True)
+            try:
+                rows = workbook.worksheets[0].iter_rows(values_only=True)
+                columns = next(rows, None)
+                if columns is None:
+                    return
+                while chunk := list(islice(rows, chunk_rows)):
+                    yield DataFrame(chunk, columns=columns)
+            finally:
+                workbook.close()
+        return DataFrameChunks(iter_chunks)
+
     def read_json(self, file: Union[bytes, Path]) -> dict:
         """
         Read Content from a .json file and returns a Dictionary.
@@ -58,6 +128,17 @@ class FileReader:
                 return json.load(f)
         return json.loads(file)
 
+    def read_json_lines(self, file: Union[bytes, Path]) -> list:
+        """
+        Read the records of a .jsonl file, one JSON value per line.
+        Args:
+            file (Union[bytes, Path]): The bytes of the .jsonl file or the file path.
+        Returns:
+            list: The records of the file, blank lines skipped.
+        """
+        text = self.read_text(file)
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
     def read_image(self, file: Union[bytes, Path]) -> Image.Image:
         """
         Read an image from the specified file path.
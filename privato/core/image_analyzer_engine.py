@@ -1,28 +1,170 @@
 """Custom Image Analyzer Engine integrating ML model with Presidio."""
-from presidio_image_redactor import ImageAnalyzerEngine
+from presidio_image_redactor import ImageAnalyzerEngine, OCR
 from privato.ml.inference import ImageInference
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
 from presidio_image_redactor.entities import ImageRecognizerResult
 from privato.core.analyzer_engine import CustomAnalyzerEngine as AnalyzerEngine
+from privato.core.concurrency import map_ordered
+from privato.core.utils import batched
+from privato.core.image_preprocessing import resize_to_max_side, tile_boxes, map_results_to_original, merge_overlapping_results
+from privato.core.config import DETECTION_BATCH_SIZE, IMAGE_DETECTION_MAX_SIDE, IMAGE_OCR_MAX_SIDE, IMAGE_TILE_SIZE, IMAGE_TILE_OVERLAP
+from privato.core.config import IMAGE_DETECTION_WORKERS
 class CustomImageAnalyzerEngine():
-    def __init__(self):
+    def __init__(self, analyzer_engine: Optional[AnalyzerEngine] = None,
+                 image_inference: Optional[ImageInference] = None,
+                 ocr: Optional[OCR] = None,
+                 detection_max_side: Optional[int] = IMAGE_DETECTION_MAX_SIDE,
+                 ocr_max_side: Optional[int] = IMAGE_OCR_MAX_SIDE,
+                 tile_size: Optional[int] = IMAGE_TILE_SIZE,
+                 tile_overlap: int = IMAGE_TILE_OVERLAP,
+                 detection_workers: int = IMAGE_DETECTION_WORKERS):
+        """Initialize the image analyzer engine.
+        Args:
+            analyzer_engine (AnalyzerEngine, optional): Text analyzer engine to reuse. A new one is built if not given.
+            image_inference (ImageInference, optional): YOLO inference wrapper to reuse. A new one is built if not given.
+            ocr (OCR, optional): OCR engine to reuse. Presidio's default Tesseract OCR is used if not given.
+            detection_max_side (int, optional): Long side images are downscaled to before detection, None to keep
+                full resolution. Defaults to IMAGE_DETECTION_MAX_SIDE.
+            ocr_max_side (int, optional): Long side images are downscaled to before OCR, None to keep full
+                resolution. Defaults to IMAGE_OCR_MAX_SIDE.
+            tile_size (int, optional): Images with a long side above this are split into tiles of this size for
+                detection, None to disable tiling. Defaults to IMAGE_TILE_SIZE.
+            tile_overlap (int, optional): Overlap between neighbouring tiles. Defaults to IMAGE_TILE_OVERLAP.
+            detection_workers (int, optional): Threads running the detectors concurrently with OCR, 0 to run
+                everything serially. Defaults to IMAGE_DETECTION_WORKERS.
+        """
         super().__init__()
-        self.image_inference = ImageInference()
-        self.analyzer_engine = AnalyzerEngine()
+        self.detection_max_side = detection_max_side
+        self.ocr_max_side = ocr_max_side
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.image_inference = image_inference or ImageInference()
+        # Runs the face and signature detectors while the calling thread does OCR and text analysis.
+        # Kept apart from the page pool so that its tasks never wait on each other.
+        self._detection_executor = (
+            ThreadPoolExecutor(max_workers=detection_workers, thread_name_prefix="privato-detect")
+            if detection_workers > 0 else None
+        )
+        self.analyzer_engine = analyzer_engine or AnalyzerEngine()
         self.image_analyzer_engine = ImageAnalyzerEngine(
-            analyzer_engine=self.analyzer_engine
+            analyzer_engine=self.analyzer_engine,
+            ocr=ocr
         )
 
-    def analyze(self, image, ocr_kwargs: Optional[dict] = None, **text_analyzer_kwargs) -> List[ImageRecognizerResult]:
+    def analyze(self, image, ocr_kwargs: Optional[dict] = None, ocr_result: Optional[Dict[str, list]] = None,
+                **text_analyzer_kwargs) -> List[ImageRecognizerResult]:
         """Analyze the given image for sensitive information.
 
         Args:
             image (PIL.Image): The image to analyze.
+            ocr_kwargs (dict, optional): Extra arguments for the OCR engine. Defaults to None.
+            ocr_result (Dict[str, list], optional): A precomputed OCR-style result, such as the text layer of a
+                born-digital PDF page. OCR is skipped when it is given. Defaults to None.
         Returns:
             List[Dict]: A list of recognized entities with their details.
         """
-        results = self.image_inference.perform_inference(image)
-        image_analyzer_results = self.image_analyzer_engine.analyze(image=image, ocr_kwargs=ocr_kwargs, **text_analyzer_kwargs)
-        results.extend(image_analyzer_results)
-        return results
+        return self.analyze_batch([image], ocr_kwargs=ocr_kwargs, ocr_results=[ocr_result], **text_analyzer_kwargs)[0]
+
+    def analyze_batch(self, images: List[Image.Image], ocr_kwargs: Optional[dict] = None,
+                      ocr_results: Optional[List[Optional[Dict[str, list]]]] = None, max_workers: int = 1,
+                      **text_analyzer_kwargs) -> List[List[ImageRecognizerResult]]:
+        """Analyze many images, running the YOLO detectors on them in batches.
+
+        The face detector, the signature detector and the OCR text analysis are independent,
+        so they run concurrently and the batch takes about as long as the slowest of them.
+        Args:
+            images (List[PIL.Image]): The images to analyze.
+            ocr_kwargs (dict, optional): Extra arguments for the OCR engine. Defaults to None.
+            ocr_results (List[Optional[Dict[str, list]]], optional): A precomputed OCR-style result per image,
+                None for images that need OCR. Defaults to None.
+            max_workers (int, optional): Number of threads running OCR and text analysis. Defaults to 1.
+        Returns:
+            List[List[ImageRecognizerResult]]: The recognized entities of each image, in input order.
+        """
+        ocr_results = ocr_results or [None] * len(images)
+        crops, crop_owners, crop_transforms, tiled = self._prepare_crops(images)
+        detectors = (self.image_inference.detect_faces, self.image_inference.detect_signatures)
+        if self._detection_executor is not None:
+            pending = [self._detection_executor.submit(detector, crops) for detector in detectors]
+        else:
+            pending = None
+            crop_detections = [detector(crops) for detector in detectors]
+
+        def analyze_text(page: Tuple[Image.Image, Optional[Dict[str, list]]]) -> List[ImageRecognizerResult]:
+            image, ocr_result = page
+            if ocr_result is None:
+                ocr_image, scale = resize_to_max_side(image, self.ocr_max_side)
+                results = self.image_analyzer_engine.analyze(image=ocr_image, ocr_kwargs=ocr_kwargs, **text_analyzer_kwargs)
+                return map_results_to_original(results, scale=scale)
+            return self._analyze_ocr_result(ocr_result, **dict(text_analyzer_kwargs))
 
+        text_results = list(map_ordered(analyze_text, zip(images, ocr_results), max_workers=max_workers))
+        if pending is not None:
+            crop_detections = [future.result() for future in pending]
+
+        detections: List[List[ImageRecognizerResult]] = [[] for _ in images]
+        for detector_results in crop_detections:
+            for owner, (scale, offset), results in zip(crop_owners, crop_transforms, detector_results):
+                detections[owner].extend(map_results_to_original(results, scale=scale, offset=offset))
+        for index in tiled:
+            detections[index] = merge_overlapping_results(detections[index])
+        return [image_detections + image_text_results for image_detections, image_text_results in zip(detections, text_results)]
+
+    def _prepare_crops(self, images: List[Image.Image]) -> Tuple[List[Image.Image], List[int], List[Tuple[float, Tuple[int, int]]], Set[int]]:
+        """Build the detector inputs: downscaled images, or downscaled tiles of very large images.
+        Args:
+            images (List[PIL.Image]): The images to run the detectors on.
+        Returns:
+            Tuple: The crops, the index of the image each crop comes from, the (scale, offset) mapping each
+                crop back to its image, and the indices of the tiled images.
+        """
+        crops, crop_owners, crop_transforms = [], [], []
+        tiled = set()
+        for index, image in enumerate(images):
+            if self.tile_size and max(image.size) > self.tile_size:
+                tiled.add(index)
+                boxes = tile_boxes(image.size, self.tile_size, self.tile_overlap)
+            else:
+                boxes = [(0, 0, image.width, image.height)]
+            for box in boxes:
+                crop = image if box == (0, 0, image.width, image.height) else image.crop(box)
+                crop, scale = resize_to_max_side(crop, self.detection_max_side)
+                crops.append(crop)
+                crop_owners.append(index)
+                crop_transforms.append((scale, box[:2]))
+        return crops, crop_owners, crop_transforms, tiled
+
+    def iter_analyze_pages(self, pages: Iterable[Tuple[Image.Image, Optional[Dict[str, list]]]],
+                           batch_size: int = DETECTION_BATCH_SIZE, max_workers: int = 1,
+                           **text_analyzer_kwargs) -> Iterator[Tuple[Image.Image, List[ImageRecognizerResult]]]:
+        """Analyze a stream of pages in batches of `batch_size`, yielding each page with its results in order.
+        Args:
+            pages (Iterable[Tuple[PIL.Image, Optional[Dict[str, list]]]]): Pairs of page image and optional text layer.
+            batch_size (int, optional): Number of pages analyzed together. Defaults to DETECTION_BATCH_SIZE.
+            max_workers (int, optional): Number of threads running OCR and text analysis. Defaults to 1.
+        Returns:
+            Iterator[Tuple[PIL.Image, List[ImageRecognizerResult]]]: Pairs of page image and recognized entities.
+        """
+        for batch in batched(pages, batch_size):
+            images = [image for image, _ in batch]
+            ocr_results = [ocr_result for _, ocr_result in batch]
+            results = self.analyze_batch(images, ocr_results=ocr_results, max_workers=max_workers, **text_analyzer_kwargs)
+            yield from zip(images, results)
+
+    def _analyze_ocr_result(self, ocr_result: Dict[str, list], **text_analyzer_kwargs) -> List[ImageRecognizerResult]:
+        """Analyze the text of an OCR-style result and map the entities back to word boxes.
+        Args:
+            ocr_result (Dict[str, list]): The words and their boxes.
+            **text_analyzer_kwargs: Keyword arguments for the text analyzer.
+        Returns:
+            List[ImageRecognizerResult]: The recognized entities with their bounding boxes.
+        """
+        text = OCR.get_text_from_ocr_dict(ocr_result)
+        text_analyzer_kwargs.setdefault("language", "en")
+        analyzer_results = self.analyzer_engine.analyze(text=text, **text_analyzer_kwargs)
+        allow_list = text_analyzer_kwargs.get("allow_list") or []
+        return self.image_analyzer_engine.map_analyzer_results_to_bounding_boxes(
+            analyzer_results, ocr_result, text, allow_list
+        )
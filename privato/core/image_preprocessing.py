@@ -0,0 +1,95 @@
+"""Image resizing and tiling ahead of detection and OCR."""
+from typing import List, Optional, Tuple
+from PIL import Image
+from presidio_image_redactor.entities import ImageRecognizerResult
+
+Box = Tuple[int, int, int, int]
+
+
+def resize_to_max_side(image: Image.Image, max_side: Optional[int]) -> Tuple[Image.Image, float]:
+    """Downscale an image so that its long side is at most `max_side`. Images are never upscaled.
+    Args:
+        image (Image.Image): The image to resize.
+        max_side (Optional[int]): The target long side, or None to keep the image as is.
+    Returns:
+        Tuple[Image.Image, float]: The resized image and the scale applied to it.
+    """
+    long_side = max(image.size)
+    if not max_side or long_side <= max_side:
+        return image, 1.0
+    scale = max_side / long_side
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.BILINEAR), scale
+
+
+def tile_boxes(image_size: Tuple[int, int], tile_size: int, overlap: int) -> List[Box]:
+    """Split an image into overlapping square tiles covering it entirely.
+    Args:
+        image_size (Tuple[int, int]): The (width, height) of the image.
+        tile_size (int): The side of a tile.
+        overlap (int): The overlap between neighbouring tiles, so objects on a seam appear whole in one tile.
+    Returns:
+        List[Box]: The (left, top, right, bottom) box of each tile.
+    """
+    if overlap >= tile_size:
+        raise ValueError("Tile overlap must be smaller than the tile size.")
+    width, height = image_size
+    stride = tile_size - overlap
+
+    def starts(length: int) -> List[int]:
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, stride))
+        return positions + [length - tile_size]
+
+    return [
+        (left, top, min(left + tile_size, width), min(top + tile_size, height))
+        for top in starts(height)
+        for left in starts(width)
+    ]
+
+
+def map_results_to_original(results: List[ImageRecognizerResult], scale: float = 1.0,
+                            offset: Tuple[int, int] = (0, 0)) -> List[ImageRecognizerResult]:
+    """Map boxes found on a resized crop back to the coordinates of the original image, in place.
+    Args:
+        results (List[ImageRecognizerResult]): The results found on the crop.
+        scale (float, optional): The scale applied to the crop before analysis. Defaults to 1.0.
+        offset (Tuple[int, int], optional): The (left, top) position of the crop in the original image. Defaults to (0, 0).
+    Returns:
+        List[ImageRecognizerResult]: The same results, in original image coordinates.
+    """
+    if scale == 1.0 and offset == (0, 0):
+        return results
+    for result in results:
+        result.left = int(result.left / scale) + offset[0]
+        result.top = int(result.top / scale) + offset[1]
+        result.width = int(result.width / scale)
+        result.height = int(result.height / scale)
+    return results
+
+
+def merge_overlapping_results(results: List[ImageRecognizerResult],
+                              iou_threshold: float = 0.5) -> List[ImageRecognizerResult]:
+    """Drop duplicate detections of the same entity found in overlapping tiles, keeping the highest score.
+    Args:
+        results (List[ImageRecognizerResult]): The results of all tiles.
+        iou_threshold (float, optional): Boxes of the same entity type overlapping more than this are duplicates.
+            Defaults to 0.5.
+    Returns:
+        List[ImageRecognizerResult]: The de-duplicated results.
+    """
+    kept: List[ImageRecognizerResult] = []
+    for result in sorted(results, key=lambda r: r.score, reverse=True):
+        if all(other.entity_type != result.entity_type or _iou(other, result) <= iou_threshold for other in kept):
+            kept.append(result)
+    return kept
+
+
+def _iou(a: ImageRecognizerResult, b: ImageRecognizerResult) -> float:
+    """Intersection over union of two result boxes."""
+    inter_w = max(0, min(a.left + a.width, b.left + b.width) - max(a.left, b.left))
+    inter_h = max(0, min(a.top + a.height, b.top + b.height) - max(a.top, b.top))
+    inter = inter_w * inter_h
+    union = a.width * a.height + b.width * b.height - inter
+    return inter / union if union else 0.0
@@ -1,11 +1,14 @@
 """Module for ingesting and normalizing various file types."""
-from typing import List, Union, Dict, Tuple, Any, Callable
+from typing import List, Optional, Union, Dict, Tuple, Any, Callable, Iterator
 from pathlib import Path
+from io import BytesIO
+import zipfile
 from PIL import Image
 from pandas import DataFrame
 from fastapi import UploadFile
-from .converter import PDFToImageConverter
-from .file_reader import FileReader
+from .converter import PDFToImageConverter, PDFPages
+from .config import PDF_IN_MEMORY, DF_CHUNK_ROWS
+from .file_reader import FileReader, DataFrameChunks
 
 
 class Ingestor:
@@ -21,7 +24,9 @@ class Ingestor:
     SUPPORTED_CSV_FORMATS = {".csv"}
     SUPPORTED_XLSX_FORMATS = {".xlsx"}
     SUPPORTED_JSON_FORMATS = {".json"}
+    SUPPORTED_JSONL_FORMATS = {".jsonl"}
     SUPPORTED_PDF_FORMATS = {".pdf"}
+    SUPPORTED_ARCHIVE_FORMATS = {".zip"}
 
     SUPPORTED_FILE_FORMATS = (
         SUPPORTED_IMAGE_FORMATS |
@@ -29,15 +34,22 @@ class Ingestor:
         SUPPORTED_CSV_FORMATS |
         SUPPORTED_XLSX_FORMATS |
         SUPPORTED_JSON_FORMATS |
+        SUPPORTED_JSONL_FORMATS |
         SUPPORTED_PDF_FORMATS
     )
 
-    def __init__(self, dpi: int = 200):
+    def __init__(self, dpi: int = 200, pdf_in_memory: bool = PDF_IN_MEMORY, df_chunk_rows: Optional[int] = DF_CHUNK_ROWS):
         """Initialize the Ingestor with converters.
         Args:
             dpi (int, optional): DPI for PDF to image conversion. Defaults to 200.
+            pdf_in_memory (bool, optional): Render PDF pages lazily in memory instead of through temporary PNG files.
+                Defaults to PDF_IN_MEMORY.
+            df_chunk_rows (int, optional): Read CSV and XLSX files lazily in chunks of this many rows, as type 'dfs',
+                instead of loading them whole. None disables chunking. Defaults to DF_CHUNK_ROWS.
         """
         self.pdf_to_image = PDFToImageConverter(dpi=dpi)
+        self.pdf_in_memory = pdf_in_memory
+        self.df_chunk_rows = df_chunk_rows
         self.file_reader = FileReader()
         self._handler_map = self._initialize_handlers()
 
@@ -51,18 +63,25 @@ class Ingestor:
         handlers.update({ext: self._handle_text for ext in self.SUPPORTED_TEXT_FORMATS})
         handlers.update({ext: self._handle_xlsx for ext in self.SUPPORTED_XLSX_FORMATS})
         handlers.update({ext: self._handle_json for ext in self.SUPPORTED_JSON_FORMATS})
+        handlers.update({ext: self._handle_jsonl for ext in self.SUPPORTED_JSONL_FORMATS})
         handlers.update({ext: self._handle_csv for ext in self.SUPPORTED_CSV_FORMATS})
         return handlers
 
-    def _handle_pdf(self, file_bytes: bytes) -> Tuple[List[Image.Image], str]:
-        """Convert PDF bytes to a list of images.
+    def _handle_pdf(self, file_bytes: bytes) -> Tuple[Union[PDFPages, List[Image.Image]], str]:
+        """Convert PDF bytes to a sequence of images.
         Args:
             file_bytes (bytes): The PDF file content in bytes.
         Returns:
-            Tuple[List[Image.Image], str]: A tuple containing a list of images and the type 'imgs'.
+            Tuple[Union[PDFPages, List[Image.Image]], str]: A tuple containing the page images and the type 'imgs'.
         """
+        if self.pdf_in_memory:
+            return self.pdf_to_image.convert_in_memory(file_bytes), "imgs"
         image_paths = self.pdf_to_image.convert(file_bytes)
-        images = [self.file_reader.read_image(p) for p in image_paths if p.exists()]
+        images = []
+        for p in image_paths:
+            if p.exists():
+                images.append(self.file_reader.read_image(p))
+                p.unlink()
         return images, "imgs"
 
     def _handle_image(self, file_bytes: bytes) -> Tuple[Image.Image, str]:
@@ -101,14 +120,35 @@ class Ingestor:
         """
         return self.file_reader.read_xlsx(file_bytes), "df"
 
-    def _handle_json(self, file_bytes: bytes) -> Tuple[List[Dict], str]:
+    def _handle_df_chunks(self, source: Union[Path, Any], ext: str) -> DataFrameChunks:
+        """Read a CSV or XLSX file lazily in chunks of `df_chunk_rows` rows.
+        Args:
+            source (Union[Path, Any]): The file path or a seekable binary file object.
+            ext (str): The file extension.
+        Returns:
+            DataFrameChunks: The chunks of the table.
+        """
+        if ext in self.SUPPORTED_XLSX_FORMATS:
+            return self.file_reader.read_xlsx_chunks(source, self.df_chunk_rows)
+        return self.file_reader.read_csv_chunks(source, self.df_chunk_rows)
+
+    def _handle_json(self, file_bytes: bytes) -> Tuple[Union[Dict, List], str]:
         """Read JSON bytes into a dictionary or list of dictionaries.
         Args:
             file_bytes (bytes): The JSON file content in bytes.
         Returns:
-            Tuple[List[Dict], str]: A tuple containing the JSON data and the type 'json'.
+            Tuple[Union[Dict, List], str]: A tuple containing the JSON data and the type 'json'.
         """
-        return [self.file_reader.read_json(file_bytes)], "json"
+        return self.file_reader.read_json(file_bytes), "json"
+
+    def _handle_jsonl(self, file_bytes: bytes) -> Tuple[List[Any], str]:
+        """Read JSON Lines bytes into a list of records.
+        Args:
+            file_bytes (bytes): The JSON Lines file content in bytes.
+        Returns:
+            Tuple[List[Any], str]: A tuple containing the records and the type 'json'.
+        """
+        return self.file_reader.read_json_lines(file_bytes), "json"
     
     def ingest_directory(self, dir_path: Path) -> List[Tuple[Any, str]]:
         """
@@ -118,18 +158,38 @@ class Ingestor:
         Returns:
             List[Tuple[Any, str]]: A list of tuples containing ingested content and its type.
         """
+        return [ingested_content for _, ingested_content in self.iter_directory(dir_path)]
+
+    def iter_directory(self, dir_path: Path) -> Iterator[Tuple[Path, Tuple[Any, str]]]:
+        """
+        Lazily ingest the supported files in a directory, one file at a time.
+        Files that cannot be ingested are skipped.
+        Args:
+            dir_path (Path): The directory path to ingest files from.
+        Returns:
+            Iterator[Tuple[Path, Tuple[Any, str]]]: Pairs of file path and ingested content with its type.
+        """
+        for file_path in self.iter_directory_files(dir_path):
+            try:
+                ingested_content = self.ingest(file_path)
+            except Exception as e:
+                print(f"Error ingesting {file_path}: {e}")
+                continue
+            yield file_path, ingested_content
+
+    def iter_directory_files(self, dir_path: Path) -> Iterator[Path]:
+        """
+        Iterate over the paths of all supported files in a directory, recursively.
+        Args:
+            dir_path (Path): The directory path to walk.
+        Returns:
+            Iterator[Path]: The paths of the supported files.
+        """
         if not dir_path.is_dir():
             raise NotADirectoryError(f"Provided path is not a directory: {dir_path}")
-
-        ingested_files = []
         for file_path in dir_path.rglob('*'):
-            if file_path.suffix.lower() in self.SUPPORTED_FILE_FORMATS:
-                try:
-                    ingested_content = self.ingest(file_path)
-                    ingested_files.append(ingested_content)
-                except Exception as e:
-                    print(f"Error ingesting {file_path}: {e}")
-        return ingested_files
+            if file_path.is_file() and file_path.suffix.lower() in self.SUPPORTED_FILE_FORMATS:
+                yield file_path
 
     def ingest(self, file: Union[UploadFile, Path]) -> Tuple[Any, str]:
         """
@@ -145,11 +205,16 @@ class Ingestor:
                 raise FileNotFoundError(f"Path not found: {file}")
             if file.is_dir():
                 raise ValueError(f"Expected a file but got a directory: {file}. Use ingest_directory instead.")
-            file_bytes = file.read_bytes()
             ext = file.suffix.lower()
+            source = file
         else: # isinstance(file, UploadFile)
-            file_bytes = file.file.read()
             ext = f".{file.filename.split('.')[-1].lower()}"
+            source = file.file
+
+        if self.df_chunk_rows and ext in self.SUPPORTED_CSV_FORMATS | self.SUPPORTED_XLSX_FORMATS:
+            # Tables are read straight from the file, one chunk at a time
+            return self._handle_df_chunks(source, ext), "dfs"
+        file_bytes = source.read_bytes() if isinstance(source, Path) else source.read()
 
         handler = self._handler_map.get(ext)
         if not handler:
@@ -157,3 +222,37 @@ class Ingestor:
 
         return handler(file_bytes)
 
+    def list_archive(self, path: Union[str, Path]) -> List[zipfile.ZipInfo]:
+        """
+        List the supported files of a zip archive from its central directory, without extracting them.
+        Args:
+            path (Union[str, Path]): The archive path.
+        Returns:
+            List[zipfile.ZipInfo]: The supported members, in archive order. Their `file_size` is the size
+                they extract to.
+        """
+        with zipfile.ZipFile(path) as archive:
+            return [
+                member for member in archive.infolist()
+                if not member.is_dir() and Path(member.filename).suffix.lower() in self.SUPPORTED_FILE_FORMATS
+            ]
+
+    def ingest_bytes(self, content: bytes, filename: str) -> Tuple[Any, str]:
+        """
+        Ingest the content of a file already read into memory, such as an upload handed to a worker process.
+        Args:
+            content (bytes): The file content.
+            filename (str): The file name, whose extension selects the reader.
+        Returns:
+            Tuple[Any, str]: A tuple containing the ingested content and a string representing its type.
+        """
+        ext = Path(filename).suffix.lower()
+        if self.df_chunk_rows and ext in self.SUPPORTED_CSV_FORMATS | self.SUPPORTED_XLSX_FORMATS:
+            return self._handle_df_chunks(BytesIO(content), ext), "dfs"
+
+        handler = self._handler_map.get(ext)
+        if not handler:
+            raise ValueError(f"Unsupported file type: {ext}")
+
+        return handler(content)
+
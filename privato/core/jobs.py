@@ -0,0 +1,227 @@
+"""SQLite-backed store of background analysis and redaction jobs, with their uploads and results on disk."""
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Union
+from privato.core.config import logger, JOBS_DIR, JOBS_TTL
+
+JOB_OPERATIONS = ("analyze", "redact")
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+
+@dataclass
+class Job:
+    """A background analysis or redaction of an uploaded file.
+    Attributes:
+        id (str): The job ID.
+        operation (str): 'analyze' or 'redact'.
+        filename (str): The name of the uploaded file.
+        language (str): The language of the content.
+        status (str): 'queued', 'running', 'done' or 'failed'.
+        pages_done (int): Pages processed so far, for PDF documents.
+        pages_total (Optional[int]): Page count of a PDF document, None until known.
+        result_file (Optional[str]): Name of the result file in the job directory, once done.
+        error (Optional[str]): Why the job failed.
+        created_at (float): When the job was submitted, as a Unix timestamp.
+        updated_at (float): When the job last changed, as a Unix timestamp.
+    """
+    id: str
+    operation: str
+    filename: str
+    language: str
+    status: str
+    pages_done: int
+    pages_total: Optional[int]
+    result_file: Optional[str]
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+
+class JobStore:
+    """
+    A store of jobs shared by the server and the job workers through a SQLite database.
+
+    Every job has a directory under `jobs_dir` holding its upload and its result. Finished jobs
+    are removed with their directory `ttl` seconds after they are done or failed; queued and
+    running jobs are never removed.
+    """
+    def __init__(self, jobs_dir: Union[str, Path] = JOBS_DIR, ttl: Optional[float] = JOBS_TTL):
+        """Initialize the store, creating its database if needed.
+        Args:
+            jobs_dir (Union[str, Path], optional): The directory of the database and job files. Defaults to JOBS_DIR.
+            ttl (float, optional): Seconds a finished job is kept after it is done or failed, None to keep jobs
+                forever. Defaults to JOBS_TTL.
+        """
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.jobs_dir / "jobs.sqlite3"), timeout=30, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # Lets workers write progress while the server reads job status
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, operation TEXT NOT NULL, filename TEXT NOT NULL, language TEXT NOT NULL, "
+            "status TEXT NOT NULL, pages_done INTEGER NOT NULL DEFAULT 0, pages_total INTEGER, "
+            "result_file TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def job_dir(self, job_id: str) -> Path:
+        """The directory holding the upload and result of a job.
+        Args:
+            job_id (str): The job ID.
+        Returns:
+            Path: The job directory.
+        """
+        return self.jobs_dir / job_id
+
+    def input_path(self, job: Job) -> Path:
+        """The path the upload of a job is saved to, keeping its extension.
+        Args:
+            job (Job): The job.
+        Returns:
+            Path: The upload path.
+        """
+        return self.job_dir(job.id) / f"input{Path(job.filename).suffix.lower()}"
+
+    def result_path(self, job: Job) -> Optional[Path]:
+        """The path of the result of a job.
+        Args:
+            job (Job): The job.
+        Returns:
+            Optional[Path]: The result path, or None if the job is not done.
+        """
+        return self.job_dir(job.id) / job.result_file if job.result_file else None
+
+    def create(self, operation: str, filename: str, language: str = "en") -> Job:
+        """Register a new queued job and create its directory.
+        Args:
+            operation (str): 'analyze' or 'redact'.
+            filename (str): The name of the uploaded file.
+            language (str, optional): The language of the content. Defaults to "en".
+        Returns:
+            Job: The new job.
+        """
+        if operation not in JOB_OPERATIONS:
+            raise ValueError(f"Unsupported job operation: {operation}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self.job_dir(job_id).mkdir(parents=True)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, operation, filename, language, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, operation, filename, language, now, now),
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Job:
+        """Look up a job.
+        Args:
+            job_id (str): The job ID.
+        Returns:
+            Job: The job.
+        Raises:
+            KeyError: If the job is unknown or has expired.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Job '{job_id}' was not found or has expired.")
+        return Job(**dict(row))
+
+    def unfinished(self) -> List[Job]:
+        """List the jobs still queued or running, oldest first, e.g. to resume them after a restart.
+        Returns:
+            List[Job]: The unfinished jobs.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [Job(**dict(row)) for row in rows]
+
+    def set_running(self, job_id: str) -> None:
+        """Mark a job as running.
+        Args:
+            job_id (str): The job ID.
+        """
+        self._update(job_id, status="running", pages_done=0, error=None)
+
+    def set_progress(self, job_id: str, pages_done: int, pages_total: Optional[int]) -> None:
+        """Record how many pages of a job are processed.
+        Args:
+            job_id (str): The job ID.
+            pages_done (int): Pages processed so far.
+            pages_total (int, optional): Page count of the document.
+        """
+        self._update(job_id, pages_done=pages_done, pages_total=pages_total)
+
+    def set_done(self, job_id: str, result_file: str) -> None:
+        """Mark a job as done.
+        Args:
+            job_id (str): The job ID.
+            result_file (str): Name of the result file in the job directory.
+        """
+        self._update(job_id, status="done", result_file=result_file)
+
+    def set_failed(self, job_id: str, error: str) -> None:
+        """Mark a job as failed.
+        Args:
+            job_id (str): The job ID.
+            error (str): Why the job failed.
+        """
+        self._update(job_id, status="failed", error=error)
+
+    def purge_expired(self) -> int:
+        """Remove the jobs done or failed for longer than the TTL, with their upload and result.
+        Returns:
+            int: The number of jobs removed.
+        """
+        if self.ttl is None:
+            return 0
+        deadline = time.time() - self.ttl
+        with self._lock:
+            expired = [row[0] for row in self._db.execute(
+                "SELECT id FROM jobs WHERE status IN ('done', 'failed') AND updated_at <= ?", (deadline,)
+            )]
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+            self._db.commit()
+        for job_id in expired:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        if expired:
+            logger.info(f"Removed {len(expired)} expired job(s).")
+        return len(expired)
+
+    def _update(self, job_id: str, **fields) -> None:
+        """Update the fields of a job and its modification time."""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+
+_job_store: Optional[JobStore] = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Get the process-wide job store, creating it on first use.
+    Returns:
+        JobStore: The shared job store.
+    """
+    global _job_store
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                _job_store = JobStore()
+    return _job_store
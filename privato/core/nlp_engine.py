@@ -0,0 +1,99 @@
+"""NLP engine that loads language pipelines on demand."""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import yaml
+from presidio_analyzer.nlp_engine import NlpArtifacts, NlpEngine, NlpEngineProvider, NerModelConfiguration
+from privato.core.config import LANGUAGE_CONFIG, logger
+
+
+class LazyNlpEngine(NlpEngine):
+    """
+    An NlpEngine that loads a language's pipeline the first time that language is used.
+
+    At most `max_loaded_languages` pipelines stay resident; when the cap is reached the
+    least recently used language is evicted and reloaded on its next request.
+    Attributes:
+        max_loaded_languages (Optional[int]): Maximum number of resident pipelines, or None for no limit.
+    """
+    def __init__(self, language_conf: str = LANGUAGE_CONFIG, max_loaded_languages: Optional[int] = None):
+        """Initialize the engine from a language configuration file without loading any model.
+        Args:
+            language_conf (str, optional): Path to the language configuration file. Defaults to LANGUAGE_CONFIG.
+            max_loaded_languages (int, optional): Maximum number of resident pipelines. Defaults to None (no limit).
+        """
+        if max_loaded_languages is not None and max_loaded_languages < 1:
+            raise ValueError("max_loaded_languages must be at least 1.")
+        with open(language_conf, "r", encoding="utf-8") as f:
+            self._configuration: Dict = yaml.safe_load(f)
+        self._models: Dict[str, Dict] = {model["lang_code"]: model for model in self._configuration["models"]}
+        self.max_loaded_languages = max_loaded_languages
+        self._engines: "OrderedDict[str, NlpEngine]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _get_engine(self, language: str) -> NlpEngine:
+        """Return the engine for `language`, loading it and evicting the least recently used one if needed.
+        Args:
+            language (str): The language code.
+        Returns:
+            NlpEngine: A loaded single-language NLP engine.
+        """
+        with self._lock:
+            engine = self._engines.get(language)
+            if engine is not None:
+                self._engines.move_to_end(language)
+                return engine
+            if language not in self._models:
+                raise ValueError(f"Language '{language}' is not configured in the NLP engine.")
+            if self.max_loaded_languages is not None:
+                while len(self._engines) >= self.max_loaded_languages:
+                    evicted, _ = self._engines.popitem(last=False)
+                    logger.info(f"Evicted NLP pipeline for language '{evicted}'.")
+            logger.info(f"Loading NLP pipeline for language '{language}'...")
+            configuration = dict(self._configuration, models=[self._models[language]])
+            engine = NlpEngineProvider(nlp_configuration=configuration).create_engine()
+            self._engines[language] = engine
+            return engine
+
+    @property
+    def loaded_languages(self) -> List[str]:
+        """The languages whose pipelines are currently resident, least recently used first."""
+        with self._lock:
+            return list(self._engines)
+
+    def load(self) -> None:
+        """Eagerly load every configured language, subject to the residency cap."""
+        for language in self._models:
+            self._get_engine(language)
+
+    def is_loaded(self) -> bool:
+        """The engine is always usable since pipelines are loaded on demand."""
+        return True
+
+    def process_text(self, text: str, language: str) -> NlpArtifacts:
+        """Process a single text with the pipeline of `language`."""
+        return self._get_engine(language).process_text(text, language)
+
+    def process_batch(self, texts: Iterable[str], language: str, batch_size: int = 1, n_process: int = 1,
+                      **kwargs) -> Iterator[Tuple[str, NlpArtifacts]]:
+        """Process a batch of texts with the pipeline of `language`."""
+        return self._get_engine(language).process_batch(
+            texts, language, batch_size=batch_size, n_process=n_process, **kwargs
+        )
+
+    def is_stopword(self, word: str, language: str) -> bool:
+        """Return True if `word` is a stop word in `language`."""
+        return self._get_engine(language).is_stopword(word, language)
+
+    def is_punct(self, word: str, language: str) -> bool:
+        """Return True if `word` is punctuation in `language`."""
+        return self._get_engine(language).is_punct(word, language)
+
+    def get_supported_entities(self) -> List[str]:
+        """Return the entities the NER models map to, without loading any model."""
+        ner_configuration = NerModelConfiguration.from_dict(self._configuration.get("ner_model_configuration", {}))
+        return list(set(ner_configuration.model_to_presidio_entity_mapping.values()))
+
+    def get_supported_languages(self) -> List[str]:
+        """Return the configured language codes."""
+        return list(self._models)
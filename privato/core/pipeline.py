@@ -0,0 +1,80 @@
+"""Streaming ingest, analyze/redact and save pipelines with bounded memory."""
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple
+from privato.core.analyzer import Analyzer
+from privato.core.redactor import Redactor
+from privato.core.save_files import SaveFiles
+from privato.core.utils import batched
+from privato.core.config import PIPELINE_WINDOW_SIZE
+
+
+def iter_analyze(entries: Iterable[Tuple[Path, Tuple[Any, str]]], analyzer: Analyzer, language: str = "en",
+                 entities: list = None, window_size: int = PIPELINE_WINDOW_SIZE) -> Iterator[Tuple[Path, Any]]:
+    """Analyze a stream of ingested files, holding at most `window_size` documents in memory.
+
+    Each window goes through `Analyzer.analyze_files`, so its text files are still batched.
+    Args:
+        entries (Iterable[Tuple[Path, Tuple[Any, str]]]): Pairs of file path and ingested content with its type,
+            as produced by `Ingestor.iter_directory`.
+        analyzer (Analyzer): The analyzer to use.
+        language (str, optional): The language of the content. Defaults to "en".
+        entities (list, optional): List of entity types to look for. Defaults to None.
+        window_size (int, optional): Number of documents in flight. Defaults to PIPELINE_WINDOW_SIZE.
+    Returns:
+        Iterator[Tuple[Path, Any]]: Pairs of file path and analysis result, in input order.
+    """
+    for window in batched(entries, window_size):
+        results = analyzer.analyze_files([file for _, file in window], language=language, entities=entities)
+        for (path, _), result in zip(window, results):
+            yield path, result
+
+
+def iter_redact(entries: Iterable[Tuple[Path, Tuple[Any, str]]], redactor: Redactor, language: str = "en",
+                window_size: int = PIPELINE_WINDOW_SIZE) -> Iterator[Tuple[Path, Any]]:
+    """Redact a stream of ingested files, holding at most `window_size` documents in memory.
+
+    Each window goes through `Redactor.redact_files`, so its text files are still batched.
+    Args:
+        entries (Iterable[Tuple[Path, Tuple[Any, str]]]): Pairs of file path and ingested content with its type,
+            as produced by `Ingestor.iter_directory`.
+        redactor (Redactor): The redactor to use.
+        language (str, optional): The language of the content. Defaults to "en".
+        window_size (int, optional): Number of documents in flight. Defaults to PIPELINE_WINDOW_SIZE.
+    Returns:
+        Iterator[Tuple[Path, Any]]: Pairs of file path and redacted content, in input order.
+    """
+    for window in batched(entries, window_size):
+        redacted_files = redactor.redact_files([file for _, file in window], language=language)
+        for (path, _), redacted_file in zip(window, redacted_files):
+            yield path, redacted_file
+
+
+def redact_and_save(entries: Iterable[Tuple[Path, Tuple[Any, str]]], redactor: Redactor, saver: SaveFiles,
+                    language: str = "en", window_size: int = PIPELINE_WINDOW_SIZE,
+                    root: Optional[Path] = None) -> Iterator[Tuple[Path, Path]]:
+    """Redact a stream of ingested files and save each output as soon as it is produced.
+    Args:
+        entries (Iterable[Tuple[Path, Tuple[Any, str]]]): Pairs of file path and ingested content with its type.
+        redactor (Redactor): The redactor to use.
+        saver (SaveFiles): The saver writing the redacted files.
+        language (str, optional): The language of the content. Defaults to "en".
+        window_size (int, optional): Number of documents in flight. Defaults to PIPELINE_WINDOW_SIZE.
+        root (Path, optional): The directory the files were found in. Outputs mirror their subdirectories, so
+            that files with the same name in different subdirectories do not overwrite each other.
+            Defaults to None (outputs named by file name only).
+    Returns:
+        Iterator[Tuple[Path, Path]]: Pairs of input path and saved redacted file path.
+    """
+    for path, redacted_file in iter_redact(entries, redactor, language=language, window_size=window_size):
+        yield path, saver.save_files([redacted_file], filenames=[output_name(path, root)])[0]
+
+
+def output_name(path: Path, root: Optional[Path] = None) -> str:
+    """Name the output of a file found in a directory, relative to that directory.
+    Args:
+        path (Path): The input file.
+        root (Path, optional): The directory walked. Defaults to None.
+    Returns:
+        str: The file path relative to `root` as a POSIX path, or the file name when `root` is not given.
+    """
+    return path.relative_to(root).as_posix() if root is not None else path.name
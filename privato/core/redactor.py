@@ -1,15 +1,24 @@
 """Module for redacting sensitive information from text and images."""
 from presidio_image_redactor import ImageRedactorEngine
-from privato.core.image_analyzer_engine import CustomImageAnalyzerEngine as ImageAnalyzerEngine
-from presidio_anonymizer import AnonymizerEngine
-from PIL import Image
-from privato.core.analyzer_engine import CustomAnalyzerEngine as AnalyzerEngine
-from typing import Any, Dict, List, Tuple, Union
+from presidio_image_redactor.entities import ImageRecognizerResult
+from PIL import Image, ImageDraw
+from privato.core.engine_registry import EngineRegistry, get_engine_registry
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import json
 from pathlib import Path
 from pandas import DataFrame
 import tempfile
-from privato.core.utils import images_to_pdf
+from presidio_analyzer import RecognizerResult
+from privato.core.utils import images_to_pdf, batched, track_progress, try_fingerprint
+from privato.core.analysis_store import AnalysisStore, StoredAnalysis, AnalysisMismatchError, get_analysis_store
+from privato.core.cache import ResultCache, get_chunk_cache, get_result_cache
+from privato.core.config import NLP_BATCH_SIZE, NLP_N_PROCESS, PDF_REDACTION_MODE, PDF_REDACTION_MODES, PAGE_WORKERS
+from privato.core.config import MEMOIZATION_FLAG, TEXT_INCREMENTAL, TEXT_INCREMENTAL_MIN_CHARS, TEXT_WINDOW_CHARS
+from privato.core.config import JSON_STREAM_BATCH_SIZE, JSON_STREAM_CHUNK_CHARS, logger
+from privato.core.converter import PDFPages, iter_page_images
+from privato.core.file_reader import DataFrameChunks
+from privato.core.structured import DataFrameAnalyzer, DataFrameRedactor, JsonAnalyzer, JsonPath
+from privato.core.structured import iter_json_strings, map_json_strings, json_path_key, iter_json_array, iter_json_lines
 
 class Redactor():
     """Redactor class for text and image redaction.
@@ -17,84 +26,318 @@ class Redactor():
         image_redactor (ImageRedactorEngine): Instance of the image redactor engine.
         analyzer_engine (AnalyzerEngine): Instance of the text analyzer engine.
         text_anonymyzer (AnonymizerEngine): Instance of the text anonymizer engine.
+        dataframe_analyzer (DataFrameAnalyzer): Maps DataFrame columns to the entity type they hold.
+        dataframe_redactor (DataFrameRedactor): Redacts DataFrame columns with vectorized operators.
+        json_analyzer (JsonAnalyzer): Analyzes the string leaves of JSON data.
+        pdf_redaction_mode (str): How PDF documents are redacted, "raster" or "vector".
+        page_workers (int): Number of threads redacting the pages of a document concurrently.
+        analysis_store (AnalysisStore): Where analyses redeemable by handle are kept.
     """
-    def __init__(self):
-        """Initialize the Redactor class."""
-        self.image_redactor = ImageRedactorEngine(image_analyzer_engine=ImageAnalyzerEngine())
-        self.analyzer_engine = AnalyzerEngine()
-        self.text_anonymyzer = AnonymizerEngine()
+    def __init__(self, registry: Optional[EngineRegistry] = None, pdf_redaction_mode: str = PDF_REDACTION_MODE,
+                 page_workers: int = PAGE_WORKERS, analysis_store: Optional[AnalysisStore] = None,
+                 use_cache: bool = MEMOIZATION_FLAG, cache: Optional[ResultCache] = None,
+                 incremental_text: bool = TEXT_INCREMENTAL, chunk_cache: Optional[ResultCache] = None):
+        """Initialize the Redactor class.
+        Args:
+            registry (EngineRegistry, optional): The engine registry to take engines from. Defaults to the process-wide registry.
+            pdf_redaction_mode (str, optional): "raster" to redact re-rendered page images or "vector" to apply
+                redactions to the original PDF. Defaults to PDF_REDACTION_MODE.
+            page_workers (int, optional): Number of threads redacting the pages of a document concurrently. Defaults to PAGE_WORKERS.
+            analysis_store (AnalysisStore, optional): Where analyses redeemable by handle are kept. Defaults to the
+                process-wide store.
+            use_cache (bool, optional): Reuse the results of content redacted before. Defaults to MEMOIZATION_FLAG.
+            cache (ResultCache, optional): The result cache to use. Defaults to the process-wide cache.
+            incremental_text (bool, optional): Analyze large texts paragraph by paragraph, reusing the cached results
+                of paragraphs seen before. Defaults to TEXT_INCREMENTAL.
+            chunk_cache (ResultCache, optional): The cache of paragraph results. Defaults to the process-wide
+                paragraph cache.
+        """
+        if pdf_redaction_mode not in PDF_REDACTION_MODES:
+            raise ValueError(f"Unsupported PDF redaction mode: {pdf_redaction_mode}")
+        self.pdf_redaction_mode = pdf_redaction_mode
+        self.page_workers = page_workers
+        self.analysis_store = analysis_store or get_analysis_store()
+        self.cache = (cache or get_result_cache()) if use_cache else None
+        self.incremental_text = incremental_text
+        self.chunk_cache = (chunk_cache or get_chunk_cache()) if incremental_text else None
+        registry = registry or get_engine_registry()
+        self.image_redactor = ImageRedactorEngine(image_analyzer_engine=registry.get_image_analyzer_engine())
+        self.analyzer_engine = registry.get_analyzer_engine()
+        self.text_anonymyzer = registry.get_anonymizer_engine()
+        self.dataframe_analyzer = DataFrameAnalyzer(self.analyzer_engine)
+        self.dataframe_redactor = DataFrameRedactor()
+        self.json_analyzer = JsonAnalyzer(self.analyzer_engine)
         self._handler_map : Dict[str, callable] = {
             "img": self.redact_image,
             "text": self.redact_text,
             "imgs": self.redact_pdf,
             "json": self.redact_json,
-            "df": self.redact_df
+            "df": self.redact_df,
+            "dfs": self.redact_df_chunks
         }
 
-    def redact(self, data: Any, data_type: str, language: str = "en", download: bool = False) -> Any:
+    def redact(self, data: Any, data_type: str, language: str = "en", download: bool = False,
+               analysis: Optional[Union[str, StoredAnalysis, List[Any]]] = None,
+               progress: Optional[Callable[[int, int], None]] = None) -> Any:
         """Redact sensitive information from the given data based on its type.
         Args:
             data (Any): The data to redact.
-            data_type (str): The type of the data ('img', 'text', 'json', 'df').
+            data_type (str): The type of the data ('img', 'text', 'json', 'df', 'dfs').
             language (str, optional): The language of the content. Defaults to "en".
             download (bool, optional): Whether to return a downloadable PDF for 'imgs' type. Defaults to False.
+            analysis (Union[str, StoredAnalysis, List[Any]], optional): A handle returned by
+                `Analyzer.analyze_with_handle`, the stored analysis it refers to, or precomputed analysis results
+                of the data. The data is then redacted without being analyzed again. Defaults to None.
+            progress (Callable[[int, int], None], optional): Called with the number of pages redacted and the
+                page count after each page of an 'imgs' document. Defaults to None.
         Returns:
             Any: The redacted data.
         """
         if data_type not in self._handler_map:
             raise ValueError(f"Unsupported data type: {data_type}")
-        return self._handler_map[data_type](data, language=language, download=download)
+        analysis = self._resolve_analysis(data, data_type, analysis)
+        if analysis is not None:
+            return self._handler_map[data_type](data, language=language, download=download, analysis=analysis,
+                                                progress=progress)
+        key = self._cache_key(data, data_type, language, download=download)
+        if key is not None:
+            cached_result = self.cache.get(key)
+            if cached_result is not None:
+                if progress is not None and data_type == "imgs":
+                    progress(len(data), len(data))
+                return cached_result
+        result = self._handler_map[data_type](data, language=language, download=download, progress=progress)
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def _cache_key(self, data: Any, data_type: str, language: str, download: bool = False) -> Optional[str]:
+        """Build the result cache key of a redaction.
+        Args:
+            data (Any): The data to redact.
+            data_type (str): The type of the data.
+            language (str): The language of the content.
+            download (bool, optional): Whether a downloadable PDF is requested. Defaults to False.
+        Returns:
+            Optional[str]: The cache key, or None if caching is disabled or the data cannot be hashed.
+        """
+        if self.cache is None or data_type == "dfs":
+            # Chunked tables are redacted lazily, so there is no result to cache
+            return None
+        content_hash = try_fingerprint(data, data_type)
+        if content_hash is None:
+            return None
+        return self.cache.make_key(content_hash, "redact", data_type, language,
+                                   pdf_redaction_mode=self.pdf_redaction_mode, download=download and data_type == "imgs",
+                                   incremental_text=self.incremental_text)
+
+    def _resolve_analysis(self, data: Any, data_type: str,
+                          analysis: Optional[Union[str, StoredAnalysis, List[Any]]]) -> Optional[List[Any]]:
+        """Turn an analysis handle into the stored analysis results, checking they belong to the data.
+        Args:
+            data (Any): The data to redact.
+            data_type (str): The type of the data.
+            analysis (Union[str, StoredAnalysis, List[Any]], optional): A handle, a stored analysis already looked
+                up, for instance by the process owning the store, precomputed results, or None.
+        Returns:
+            Optional[List[Any]]: The analysis results, or None if the data must be analyzed.
+        Raises:
+            AnalysisNotFoundError: If the handle is unknown or has expired.
+            AnalysisMismatchError: If the stored analysis was made on different content.
+        """
+        if isinstance(analysis, StoredAnalysis):
+            stored = analysis
+        elif isinstance(analysis, str):
+            stored = self.analysis_store.get(analysis)
+        else:
+            return analysis
+        if stored.data_type != data_type:
+            raise AnalysisMismatchError("The analysis does not belong to the given content.")
+        content_hash = try_fingerprint(data, data_type)
+        if content_hash is None or stored.fingerprint is None:
+            # Content that cannot be hashed can only be checked by its type
+            logger.warning(f"The content of the '{data_type}' data cannot be hashed, its analysis is not verified.")
+        elif content_hash != stored.fingerprint:
+            raise AnalysisMismatchError("The analysis does not belong to the given content.")
+        return stored.analysis
 
     def redact_files(self, files: List[Tuple[Any, str]], language: str = "en") -> List[Any]:
         """Redact sensitive information from a list of files.
         Args:
-            files (List[Tuple[Any, str]]): The list of files to redact.
+            files (List[Tuple[Any, str]]): The list of files to redact. Text files are analyzed in a single batched NLP run,
+                and images in a single detector batch.
             language (str, optional): The language of the content. Defaults to "en".
         Returns:
             List[Any]: The list of redacted files.
         """
+        files = list(files)
+        text_indices = [i for i, (_, file_type) in enumerate(files) if file_type == "text"]
+        redacted_texts = self.redact_texts([files[i][0] for i in text_indices], language=language)
+        image_indices = [i for i, (_, file_type) in enumerate(files) if file_type == "img"]
+        redacted_images = self.redact_images([files[i][0] for i in image_indices], language=language)
+        redacted = dict(zip(text_indices, redacted_texts))
+        redacted.update(zip(image_indices, redacted_images))
         redacted_files = []
-        for file, file_type in files:
-            redacted_file = self.redact(file, data_type=file_type, language=language)
+        for i, (file, file_type) in enumerate(files):
+            redacted_file = redacted[i] if i in redacted else self.redact(file, data_type=file_type, language=language)
             redacted_files.append(redacted_file)
         return redacted_files
 
-    def redact_image(self, img: Image.Image, language: str = "en", **kwargs) -> Image.Image:
+    def redact_image(self, img: Image.Image, language: str = "en", analysis: Optional[List[Any]] = None,
+                     **kwargs) -> Image.Image:
         """Redact sensitive information from an image.
         Args:
             img (Image): The image to redact.
             language (str, optional): The language of the image content. Defaults to "en".
+            analysis (List[Any], optional): Precomputed results of the image, as ImageRecognizerResults or their
+                dictionaries. The image is analyzed when not given. Defaults to None.
         Returns:
             Image: The redacted image.
         """
+        if analysis is not None:
+            return self._draw_boxes(img, _to_image_results(analysis))
         redacted_image = self.image_redactor.redact(image=img,language=language)
         return redacted_image
 
-    def redact_text(self, text: str, language: str = "en", **kwargs) -> Dict:
+    def redact_images(self, images: List[Image.Image], language: str = "en") -> List[Image.Image]:
+        """Redact many separate images, running the detectors on them in batches.
+
+        Images found in the result cache are not redacted again.
+        Args:
+            images (List[Image.Image]): The images to redact.
+            language (str, optional): The language of the image content. Defaults to "en".
+        Returns:
+            List[Image.Image]: The redacted images, in input order.
+        """
+        if not images:
+            return []
+        keys = [self._cache_key(img, "img", language) for img in images]
+        redacted: List[Optional[Image.Image]] = [self.cache.get(key) if key is not None else None for key in keys]
+        missing = [i for i, result in enumerate(redacted) if result is None]
+        if missing:
+            pages = self.image_redactor.image_analyzer_engine.iter_analyze_pages(
+                ((images[i], None) for i in missing), language=language, max_workers=self.page_workers
+            )
+            for i, (img, boxes) in zip(missing, pages):
+                redacted[i] = self._draw_boxes(img, boxes)
+                if keys[i] is not None:
+                    self.cache.put(keys[i], redacted[i])
+        return redacted
+
+    def redact_text(self, text: str, language: str = "en", analysis: Optional[List[Any]] = None, **kwargs) -> Dict:
         """Redact sensitive information from text.
         Args:
             text (str): The text to redact.
             language (str, optional): The language of the text. Defaults to "en".
+            analysis (List[Any], optional): Precomputed results of the text, as RecognizerResults or their
+                dictionaries. The text is analyzed when not given. Defaults to None.
+        Returns:
+            Dict: The redacted text in JSON format.
+        """
+        if analysis is not None:
+            return self._anonymize_text(text, _to_text_results(analysis))
+        text_mode = self._text_mode(text)
+        if text_mode == "incremental":
+            analyzed_text = self.analyzer_engine.analyze_incremental(text, language=language, cache=self.chunk_cache)
+        elif text_mode == "windowed":
+            analyzed_text = self.analyzer_engine.analyze_windowed(text, language=language)
+        else:
+            analyzed_text = self.analyzer_engine.analyze(text=text, language=language)
+        return self._anonymize_text(text, analyzed_text)
+
+    def _text_mode(self, text: str) -> str:
+        """Choose how a text is analyzed.
+        Args:
+            text (str): The text to redact.
+        Returns:
+            str: "incremental" to analyze it paragraph by paragraph with cached paragraph results, "windowed"
+                to analyze it in overlapping windows when it is longer than TEXT_WINDOW_CHARS, or "whole".
+        """
+        if self.chunk_cache is not None and len(text) >= TEXT_INCREMENTAL_MIN_CHARS:
+            return "incremental"
+        if len(text) > TEXT_WINDOW_CHARS:
+            return "windowed"
+        return "whole"
+
+    def redact_texts(self, texts: List[str], language: str = "en", batch_size: int = NLP_BATCH_SIZE,
+                     n_process: int = NLP_N_PROCESS) -> List[Dict]:
+        """Redact sensitive information from many texts analyzed in one batched NLP run.
+
+        Texts found in the result cache are not analyzed again and large texts are analyzed incrementally or in windows.
+        Args:
+            texts (List[str]): The texts to redact.
+            language (str, optional): The language of the texts. Defaults to "en".
+            batch_size (int, optional): Number of texts per spaCy batch. Defaults to NLP_BATCH_SIZE.
+            n_process (int, optional): Number of spaCy worker processes. Defaults to NLP_N_PROCESS.
+        Returns:
+            List[Dict]: The redacted texts in JSON format, in input order.
+        """
+        if not texts:
+            return []
+        keys = [self._cache_key(text, "text", language) for text in texts]
+        redacted: List[Optional[Dict]] = [self.cache.get(key) if key is not None else None for key in keys]
+        for i, text in enumerate(texts):
+            if redacted[i] is None and self._text_mode(text) != "whole":
+                redacted[i] = self.redact_text(text, language=language)
+                if keys[i] is not None:
+                    self.cache.put(keys[i], redacted[i])
+        missing = [i for i, result in enumerate(redacted) if result is None]
+        if missing:
+            batch_results = self.analyzer_engine.analyze_batch(
+                [texts[i] for i in missing], language=language, batch_size=batch_size, n_process=n_process
+            )
+            for i, results in zip(missing, batch_results):
+                redacted[i] = self._anonymize_text(texts[i], results)
+                if keys[i] is not None:
+                    self.cache.put(keys[i], redacted[i])
+        return redacted
+
+    def _anonymize_text(self, text: str, analyzer_results: List[RecognizerResult]) -> Dict:
+        """Anonymize text given its analyzer results.
+        Args:
+            text (str): The text to anonymize.
+            analyzer_results (List[RecognizerResult]): The entities found in the text.
         Returns:
             Dict: The redacted text in JSON format.
         """
-        analyzed_text = self.analyzer_engine.analyze(text=text, language=language)
-        anonymized_text = self.text_anonymyzer.anonymize(text=text, analyzer_results=analyzed_text)
+        anonymized_text = self.text_anonymyzer.anonymize(text=text, analyzer_results=analyzer_results)
         return json.loads(anonymized_text.to_json())
 
-    def redact_pdf(self, images : List[Image.Image], language: str = "en", download: bool = False) -> Union[bytes, List[Image.Image]]:
+    def redact_pdf(self, images : List[Image.Image], language: str = "en", download: bool = False,
+                   analysis: Optional[List[List[Any]]] = None,
+                   progress: Optional[Callable[[int, int], None]] = None, **kwargs) -> Union[bytes, List[Image.Image]]:
         """Redact sensitive information from a list of images (PDF pages).
         Args:
             images (List[Image.Image]): The list of images to redact.
             language (str, optional): The language of the image content. Defaults to "en".
             download (bool, optional): Whether to return a downloadable PDF. Defaults to False.
+            analysis (List[List[Any]], optional): Precomputed results of each page. The pages are analyzed when
+                not given. Defaults to None.
+            progress (Callable[[int, int], None], optional): Called with the number of pages done and the page
+                count after each page. Defaults to None.
+        Born-digital PDF pages are analyzed from their embedded text layer instead of OCR.
+        In "vector" mode, PDF documents are redacted in place and the redacted PDF bytes are always returned.
+        The detectors run on batches of pages, OCR runs on `page_workers` threads and pages are kept in order.
         """
+        if analysis is not None:
+            if len(analysis) != len(images):
+                raise ValueError("The analysis must hold one result list per page.")
+            analysis = [_to_image_results(page_results) for page_results in analysis]
+        if self.pdf_redaction_mode == "vector" and isinstance(images, PDFPages):
+            return self._redact_pdf_vector(images, language=language, analysis=analysis, progress=progress)
         with tempfile.TemporaryDirectory() as temp_dir:
                temp_dir_path = Path(temp_dir)
                redacted_imgs = []
                redacted_img_paths = []
-               for i, img in enumerate(images, start=1):
-                   redacted_img = self.image_redactor.redact(img, language=language)
+               if analysis is not None:
+                   pages = zip(images, analysis)
+               else:
+                   pages = self.image_redactor.image_analyzer_engine.iter_analyze_pages(
+                       iter_page_images(images), language=language, max_workers=self.page_workers
+                   )
+               pages = track_progress(pages, len(images), progress)
+               for i, (img, boxes) in enumerate(pages, start=1):
+                   redacted_img = self._draw_boxes(img, boxes)
                    temp_img_path = temp_dir_path / f"redacted_page_{i}.png"
                    redacted_img.save(temp_img_path)
                    redacted_imgs.append(redacted_img)
@@ -107,22 +350,162 @@ class Redactor():
                return output_pdf_path.read_bytes()
         
     
-    def redact_json(self, json_data: Dict, **kwargs) -> Dict:
-        """Redact sensitive information from JSON data.
+    def _redact_pdf_vector(self, pages: PDFPages, language: str = "en",
+                           analysis: Optional[List[List[ImageRecognizerResult]]] = None,
+                           progress: Optional[Callable[[int, int], None]] = None) -> bytes:
+        """Redact a PDF document with redaction annotations placed on the analyzer's boxes.
+        Args:
+            pages (PDFPages): The pages of the PDF document.
+            language (str, optional): The language of the document. Defaults to "en".
+            analysis (List[List[ImageRecognizerResult]], optional): Precomputed boxes of each page. Defaults to None.
+            progress (Callable[[int, int], None], optional): Called with the number of pages analyzed and the
+                page count after each page. Defaults to None.
+        Returns:
+            bytes: The bytes of the redacted PDF document.
+        """
+        if analysis is not None:
+            return pages.redact(analysis)
+        analyzed_pages = self.image_redactor.image_analyzer_engine.iter_analyze_pages(
+            iter_page_images(pages), language=language, max_workers=self.page_workers
+        )
+        analyzed_pages = track_progress(analyzed_pages, len(pages), progress)
+        return pages.redact([boxes for _, boxes in analyzed_pages])
+
+    def _draw_boxes(self, img: Image.Image, boxes: List[ImageRecognizerResult],
+                    fill: Tuple[int, int, int] = (0, 0, 0)) -> Image.Image:
+        """Paint redaction boxes over a copy of an image.
+        Args:
+            img (Image): The image to redact.
+            boxes (List[ImageRecognizerResult]): The areas to cover.
+            fill (Tuple[int, int, int], optional): RGB fill color. Defaults to black.
+        Returns:
+            Image: The redacted image.
+        """
+        redacted_img = img.copy()
+        draw = ImageDraw.Draw(redacted_img)
+        for box in boxes:
+            draw.rectangle([box.left, box.top, box.left + box.width, box.top + box.height], fill=fill)
+        return redacted_img
+
+    def redact_json(self, json_data: Union[Dict, List], language: str = "en",
+                    analysis: Optional[Dict[str, Any]] = None, **kwargs) -> Union[Dict, List]:
+        """Redact sensitive information from JSON data of any nesting, including arrays of records.
+        Every distinct string leaf is analyzed once in a batched NLP run and anonymized in place.
+        Args:
+            json_data (Union[Dict, List]): The JSON data to redact. It is not modified.
+            language (str, optional): The language of the data. Defaults to "en".
+            analysis (Dict[str, Any], optional): A precomputed analysis, as returned by `Analyzer.analyze_json`.
+                The string leaves of every mapped field are then replaced whole, and the leaves of the other
+                fields are analyzed and anonymized as without an analysis. Defaults to None.
+        Returns:
+            Union[Dict, List]: The redacted JSON data.
+        """
+        entity_mapping = analysis["entity_mapping"] if analysis is not None else {}
+        value_results = self.json_analyzer.analyze_values(
+            (value for path, value in iter_json_strings(json_data) if json_path_key(path) not in entity_mapping),
+            language=language
+        )
+        anonymized = {
+            value: self._anonymize_text(value, results)["text"]
+            for value, results in value_results.items()
+            if results
+        }
+
+        def redact_leaf(path: JsonPath, value: str) -> str:
+            entity_type = entity_mapping.get(json_path_key(path))
+            return f"<{entity_type}>" if entity_type else anonymized.get(value, value)
+
+        return map_json_strings(json_data, redact_leaf)
+
+    def redact_json_file(self, source: Path, destination: Path, language: str = "en",
+                         batch_size: int = JSON_STREAM_BATCH_SIZE) -> Path:
+        """Redact a JSON or JSON Lines file record by record, without loading it whole.
+        Top-level arrays and JSON Lines are streamed in batches of `batch_size` records, each
+        redacted with a single batched NLP run. Other JSON documents are redacted in memory.
         Args:
-            json_data (Dict): The JSON data to redact.
+            source (Path): The JSON (.json) or JSON Lines (.jsonl) file to redact.
+            destination (Path): The path the redacted file is written to.
+            language (str, optional): The language of the data. Defaults to "en".
+            batch_size (int, optional): Number of records redacted together. Defaults to JSON_STREAM_BATCH_SIZE.
         Returns:
-            Dict: The redacted JSON data.
+            Path: The path of the redacted file.
         """
-        # To be Implemented
-        raise NotImplementedError("JSON redaction not implemented yet.")
+        with open(source, "r", encoding="utf-8") as src, open(destination, "w", encoding="utf-8") as dst:
+            if source.suffix.lower() == ".jsonl":
+                for batch in batched(iter_json_lines(src), batch_size):
+                    for record in self.redact_json(list(batch), language=language):
+                        dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+                return destination
+            is_array = src.read(JSON_STREAM_CHUNK_CHARS).lstrip().startswith("[")
+            src.seek(0)
+            if not is_array:
+                json.dump(self.redact_json(json.load(src), language=language), dst, ensure_ascii=False, indent=4)
+                return destination
+            dst.write("[")
+            separator = "\n"
+            for batch in batched(iter_json_array(src), batch_size):
+                for record in self.redact_json(list(batch), language=language):
+                    dst.write(separator + json.dumps(record, ensure_ascii=False))
+                    separator = ",\n"
+            dst.write("\n]\n")
+        return destination
     
-    def redact_df(self, df: DataFrame, **kwargs) -> DataFrame:
+    def redact_df(self, df: DataFrame, language: str = "en", analysis: Optional[Dict[str, Any]] = None,
+                  **kwargs) -> DataFrame:
         """Redact sensitive information from a DataFrame.
+        The columns mapped to an entity type are redacted whole with vectorized operators.
         Args:
             df (DataFrame): The DataFrame to redact.
+            language (str, optional): The language of the data. Defaults to "en".
+            analysis (Dict[str, Any], optional): A precomputed analysis of the DataFrame, as returned by
+                `Analyzer.analyze_dataframe`. The DataFrame is analyzed when not given. Defaults to None.
         Returns:
             DataFrame: The redacted DataFrame.
         """
-        # To be implemented
-        raise NotImplementedError("DataFrame redaction not implemented yet.")
+        if analysis is None:
+            analysis = self.dataframe_analyzer.analyze(df, language=language)
+        return self.dataframe_redactor.redact(df, analysis["entity_mapping"])
+
+
+    def redact_df_chunks(self, chunks: DataFrameChunks, language: str = "en", analysis: Optional[Dict[str, Any]] = None,
+                         **kwargs) -> DataFrameChunks:
+        """Redact sensitive information from a table read in chunks.
+        The table is analyzed in a first pass over the chunks, unless an analysis is given, and the
+        returned chunks are redacted lazily while they are read again, one chunk at a time.
+        Args:
+            chunks (DataFrameChunks): The chunks of the table.
+            language (str, optional): The language of the data. Defaults to "en".
+            analysis (Dict[str, Any], optional): A precomputed analysis of the table, as returned by
+                `Analyzer.analyze_dataframe_chunks`. The table is analyzed when not given. Defaults to None.
+        Returns:
+            DataFrameChunks: The redacted chunks.
+        """
+        if analysis is None:
+            analysis = self.dataframe_analyzer.analyze_chunks(chunks, language=language)
+        entity_mapping = analysis["entity_mapping"]
+        return chunks.map(lambda chunk: self.dataframe_redactor.redact(chunk, entity_mapping))
+
+
+def _to_image_results(results: List[Any]) -> List[ImageRecognizerResult]:
+    """Rebuild image analysis results that may have been serialized to dictionaries.
+    Args:
+        results (List[Any]): ImageRecognizerResults or their dictionaries.
+    Returns:
+        List[ImageRecognizerResult]: The results.
+    """
+    return [
+        result if isinstance(result, ImageRecognizerResult) else ImageRecognizerResult(
+            entity_type=result["entity_type"], start=result["start"], end=result["end"], score=result["score"],
+            left=result["left"], top=result["top"], width=result["width"], height=result["height"],
+        )
+        for result in results
+    ]
+
+def _to_text_results(results: List[Any]) -> List[RecognizerResult]:
+    """Rebuild text analysis results that may have been serialized to dictionaries.
+    Args:
+        results (List[Any]): RecognizerResults or their dictionaries.
+    Returns:
+        List[RecognizerResult]: The results.
+    """
+    return [result if isinstance(result, RecognizerResult) else RecognizerResult.from_json(result) for result in results]
@@ -3,10 +3,10 @@
 from pathlib import Path
 from typing import Any, List, Union
 from PIL import Image
-from io import BytesIO
 import logging
 import json
 from pandas import DataFrame
+from privato.core.file_reader import DataFrameChunks
 
 
 logger = logging.getLogger(__name__)
@@ -24,7 +24,8 @@ class SaveFiles:
             "text": self._save_text,
             "imgs": self._save_pdf,
             "json": self._save_json,
-            "df": self._save_dataframe
+            "df": self._save_dataframe,
+            "dfs": self._save_dataframe_chunks
         }
         self._types_map = {
             Image.Image: "img",
@@ -33,20 +34,24 @@ class SaveFiles:
             list[Image.Image]: "imgs",
             dict: "json",
             list: "json", # Assuming list of dicts for JSON
-            DataFrame: "df"
+            DataFrame: "df",
+            DataFrameChunks: "dfs"
 
         }
     def save(self, data: Union[Image.Image, str, bytes], data_type: str, filename: str) -> Path:
         """Save data to a file based on its type.
         Args:
             data (Union[Image.Image, str, bytes]): The data to save.
-            data_type (str): The type of the data ('img', 'text', 'json', 'df', 'imgs').
-            filename (str): The base filename to use for saving the file (without extension).
+            data_type (str): The type of the data ('img', 'text', 'json', 'df', 'dfs', 'imgs').
+            filename (str): The base filename to use for saving the file (without extension), possibly
+                under subdirectories of the output directory.
         Returns:
             Path: The path to the saved file.
         """
         if data_type not in self._handler_map:
             raise ValueError(f"Unsupported data type: {data_type}")
+        # Filenames may hold subdirectories, mirroring the input directory
+        (self.output_path / filename).parent.mkdir(parents=True, exist_ok=True)
         return self._handler_map[data_type](data, filename)
     def save_files(self, files: List[Union[Image.Image, str, bytes]], filenames: list[str]) -> list[Path]:
         """Save a list of files based on their types.
@@ -71,7 +76,9 @@ class SaveFiles:
             raise ValueError("No images provided to save as PDF.")
         output_file = self.output_path / f"{filename}.pdf"
         if isinstance(images, bytes):
-            images = [Image.open(BytesIO(images))]
+            output_file.write_bytes(images)
+            logger.info(f"PDF saved to: {output_file}")
+            return output_file
         images[0].save(output_file, save_all=True, append_images=images[1:], format="PDF")
         logger.info(f"PDF saved to: {output_file}")
         return output_file
@@ -98,6 +105,14 @@ class SaveFiles:
         df.to_csv(output_file, index=False)
         logger.info(f"DataFrame saved to: {output_file}")
         return output_file
+    def _save_dataframe_chunks(self, chunks: DataFrameChunks, filename: str) -> Path:
+        """Write a table chunk by chunk, so that only one chunk is held in memory."""
+        output_file = self.output_path / f"{filename}.csv"
+        with open(output_file, "w", encoding="utf-8", newline="") as f:
+            for index, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=index == 0)
+        logger.info(f"DataFrame saved to: {output_file}")
+        return output_file
     def _get_datatype(self, file: Any) -> str:
         if isinstance(file,list):
             if file and isinstance(file[0], dict):
@@ -0,0 +1,443 @@
+"""Column-wise analysis and redaction of tabular data, and leaf-wise analysis of JSON data."""
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from presidio_analyzer import RecognizerResult
+from pandas import DataFrame, Series, factorize
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype, is_timedelta64_dtype
+from privato.core.analyzer_engine import CustomAnalyzerEngine
+from privato.core.config import DF_SAMPLE_SIZE, DF_ENTITY_THRESHOLD, NLP_BATCH_SIZE, NLP_N_PROCESS
+from privato.core.config import DF_REDACTION_OPERATOR, DF_REDACTION_OPERATORS, DF_MASK_CHAR, DF_HASH_SALT
+from privato.core.config import JSON_STREAM_CHUNK_CHARS
+
+JsonPath = Tuple[Union[str, int], ...]
+_NON_WHITESPACE = re.compile(r"\S")
+
+
+class DataFrameAnalyzer:
+    """
+    Finds the entity type held by each column of a DataFrame.
+
+    Every distinct value is analyzed once, in a single batched NLP run shared by all columns,
+    and weighted by how often it occurs. A column is mapped to its most frequent entity type
+    when that type covers at least `threshold` of its non-empty values. Numeric, boolean and
+    date/time columns are skipped without being analyzed.
+    """
+    def __init__(self, analyzer_engine: CustomAnalyzerEngine, sample_size: Optional[int] = DF_SAMPLE_SIZE,
+                 threshold: float = DF_ENTITY_THRESHOLD, batch_size: int = NLP_BATCH_SIZE,
+                 n_process: int = NLP_N_PROCESS, random_state: int = 0):
+        """Initialize the DataFrame analyzer.
+        Args:
+            analyzer_engine (CustomAnalyzerEngine): The text analyzer engine.
+            sample_size (int, optional): Number of rows sampled to classify columns, None to use every row.
+                Defaults to DF_SAMPLE_SIZE.
+            threshold (float, optional): Minimum share of a column's values holding an entity type for the column
+                to be mapped to it. Defaults to DF_ENTITY_THRESHOLD.
+            batch_size (int, optional): Number of values per spaCy batch. Defaults to NLP_BATCH_SIZE.
+            n_process (int, optional): Number of spaCy worker processes. Defaults to NLP_N_PROCESS.
+            random_state (int, optional): Seed of the row sampling. Defaults to 0.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("The column threshold must be in (0, 1].")
+        self.analyzer_engine = analyzer_engine
+        self.sample_size = sample_size
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.random_state = random_state
+
+    def analyze(self, df: DataFrame, language: str = "en", entities: Optional[List[str]] = None) -> Dict[str, Dict[Any, str]]:
+        """Map the columns of a DataFrame to the entity type they hold.
+        Args:
+            df (DataFrame): The DataFrame to analyze.
+            language (str, optional): The language of the data. Defaults to "en".
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+        Returns:
+            Dict[str, Dict[Any, str]]: The analysis, as {"entity_mapping": {column: entity type}}. Columns without
+                a dominant entity type are left out.
+        """
+        if self.sample_size is not None and len(df) > self.sample_size:
+            df = df.sample(n=self.sample_size, random_state=self.random_state)
+        return self._map_columns(self._column_value_counts(df), language=language, entities=entities)
+
+    def analyze_chunks(self, chunks: Iterable[DataFrame], language: str = "en",
+                       entities: Optional[List[str]] = None) -> Dict[str, Dict[Any, str]]:
+        """Map the columns of a table read in chunks to the entity type they hold.
+
+        The value counts of every chunk are summed before classification, so only one chunk
+        and the distinct values of the table are held in memory at a time. With a sample size,
+        the first `sample_size` rows are used instead of a random sample.
+        Args:
+            chunks (Iterable[DataFrame]): The chunks of the table, sharing the same columns.
+            language (str, optional): The language of the data. Defaults to "en".
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+        Returns:
+            Dict[str, Dict[Any, str]]: The analysis, as {"entity_mapping": {column: entity type}}.
+        """
+        value_counts: Dict[Any, Series] = {}
+        rows = 0
+        for chunk in chunks:
+            if self.sample_size is not None:
+                chunk = chunk.head(self.sample_size - rows)
+            for column, counts in self._column_value_counts(chunk).items():
+                value_counts[column] = value_counts[column].add(counts, fill_value=0) if column in value_counts else counts
+            rows += len(chunk)
+            if self.sample_size is not None and rows >= self.sample_size:
+                break
+        return self._map_columns(value_counts, language=language, entities=entities)
+
+    def _column_value_counts(self, df: DataFrame) -> Dict[Any, Series]:
+        """Count the distinct values of every text column.
+        Args:
+            df (DataFrame): The DataFrame.
+        Returns:
+            Dict[Any, Series]: The value counts of each text column, indexed by value as str.
+        """
+        return {
+            column: df[column].dropna().astype(str).value_counts()
+            for column in df.columns
+            if self._is_text_column(df[column])
+        }
+
+    def _map_columns(self, value_counts: Dict[Any, Series], language: str,
+                     entities: Optional[List[str]] = None) -> Dict[str, Dict[Any, str]]:
+        """Classify the distinct values of every column and map each column to its dominant entity type.
+        Args:
+            value_counts (Dict[Any, Series]): The value counts of each text column.
+            language (str): The language of the data.
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+        Returns:
+            Dict[str, Dict[Any, str]]: The analysis, as {"entity_mapping": {column: entity type}}.
+        """
+        unique_values = list(dict.fromkeys(
+            value for counts in value_counts.values() for value in counts.index if value.strip()
+        ))
+        value_entities = self._classify_values(unique_values, language=language, entities=entities)
+
+        entity_mapping = {}
+        for column, counts in value_counts.items():
+            total = counts.sum()
+            if not total:
+                continue
+            # Values without an entity map to NaN, which groupby leaves out
+            entity_counts = counts.groupby(counts.index.map(value_entities)).sum()
+            if entity_counts.empty:
+                continue
+            entity = entity_counts.idxmax()
+            if entity_counts[entity] / total >= self.threshold:
+                entity_mapping[column] = entity
+        return {"entity_mapping": entity_mapping}
+
+    def _classify_values(self, values: List[str], language: str,
+                         entities: Optional[List[str]] = None) -> Dict[str, str]:
+        """Find the best scoring entity type of every distinct value.
+        Args:
+            values (List[str]): The distinct values.
+            language (str): The language of the data.
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+        Returns:
+            Dict[str, str]: The entity type of each value holding one.
+        """
+        if not values:
+            return {}
+        batch_results = self.analyzer_engine.analyze_batch(
+            values, language=language, entities=entities, batch_size=self.batch_size, n_process=self.n_process
+        )
+        return {
+            value: max(results, key=lambda result: result.score).entity_type
+            for value, results in zip(values, batch_results)
+            if results
+        }
+
+    @staticmethod
+    def _is_text_column(column: Series) -> bool:
+        """Whether a column may hold text entities, judging by its dtype.
+        Args:
+            column (Series): The column.
+        Returns:
+            bool: False for numeric, boolean and date/time columns.
+        """
+        return not (
+            is_bool_dtype(column) or is_numeric_dtype(column)
+            or is_datetime64_any_dtype(column) or is_timedelta64_dtype(column)
+        )
+
+
+class DataFrameRedactor:
+    """
+    Redacts the columns of a DataFrame mapped to an entity type, one whole column at a time.
+
+    Operators work on entire columns with pandas string methods, or once per distinct value
+    for hashing, so no cell goes through the text analyzer or anonymizer. Missing values are kept.
+    Operators:
+        replace: Replace every value with "<ENTITY_TYPE>".
+        mask: Replace every character of a value with the mask character.
+        hash: Replace every value with the SHA-256 of the salt and the value.
+    """
+    def __init__(self, operators: Optional[Dict[str, str]] = None, default_operator: str = DF_REDACTION_OPERATOR,
+                 mask_char: str = DF_MASK_CHAR, hash_salt: str = DF_HASH_SALT):
+        """Initialize the DataFrame redactor.
+        Args:
+            operators (Dict[str, str], optional): Operator to use per entity type. Defaults to DF_REDACTION_OPERATORS.
+            default_operator (str, optional): Operator for entity types without one. Defaults to DF_REDACTION_OPERATOR.
+            mask_char (str, optional): Character used by the mask operator. Defaults to DF_MASK_CHAR.
+            hash_salt (str, optional): Salt prepended to values by the hash operator. Defaults to DF_HASH_SALT.
+        """
+        self._operator_map: Dict[str, Callable[[Series, str], Series]] = {
+            "replace": self._replace,
+            "mask": self._mask,
+            "hash": self._hash,
+        }
+        self.operators = dict(DF_REDACTION_OPERATORS if operators is None else operators)
+        self.default_operator = default_operator
+        for operator in [*self.operators.values(), default_operator]:
+            if operator not in self._operator_map:
+                raise ValueError(f"Unsupported DataFrame redaction operator: {operator}")
+        if len(mask_char) != 1:
+            raise ValueError("The mask character must be a single character.")
+        self.mask_char = mask_char
+        self.hash_salt = hash_salt
+
+    def redact(self, df: DataFrame, entity_mapping: Dict[Any, str]) -> DataFrame:
+        """Redact the columns of a DataFrame holding entities.
+        Args:
+            df (DataFrame): The DataFrame to redact. It is not modified.
+            entity_mapping (Dict[Any, str]): The entity type of each column to redact.
+        Returns:
+            DataFrame: A redacted copy of the DataFrame.
+        """
+        redacted_df = df.copy()
+        for column, entity_type in entity_mapping.items():
+            if column not in redacted_df.columns:
+                continue
+            values = redacted_df[column]
+            present = values.notna()
+            operator = self._operator_map[self.operators.get(entity_type, self.default_operator)]
+            redacted_values = values.astype(object)
+            redacted_values[present] = operator(values[present].astype(str), entity_type)
+            redacted_df[column] = redacted_values
+        return redacted_df
+
+    def _replace(self, values: Series, entity_type: str) -> Series:
+        """Replace every value with the entity type placeholder."""
+        return Series(f"<{entity_type}>", index=values.index, dtype=object)
+
+    def _mask(self, values: Series, entity_type: str) -> Series:
+        """Replace every character of every value with the mask character."""
+        return Series(self.mask_char, index=values.index, dtype=object).str.repeat(values.str.len())
+
+    def _hash(self, values: Series, entity_type: str) -> Series:
+        """Replace every value with its salted SHA-256, computed once per distinct value."""
+        codes, uniques = factorize(values)
+        digests = [hashlib.sha256(f"{self.hash_salt}{value}".encode()).hexdigest() for value in uniques]
+        return Series(np.asarray(digests, dtype=object)[codes], index=values.index, dtype=object)
+
+
+def iter_json_strings(data: Any, path: JsonPath = ()) -> Iterator[Tuple[JsonPath, str]]:
+    """Walk a JSON value of any nesting, yielding its string leaves.
+    Args:
+        data (Any): The JSON value.
+        path (JsonPath, optional): The path of `data` in the whole document. Defaults to ().
+    Returns:
+        Iterator[Tuple[JsonPath, str]]: Pairs of leaf path, made of keys and list indices, and leaf string.
+    """
+    if isinstance(data, str):
+        yield path, data
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield from iter_json_strings(value, path + (key,))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            yield from iter_json_strings(value, path + (index,))
+
+
+def map_json_strings(data: Any, func: Callable[[JsonPath, str], str], path: JsonPath = ()) -> Any:
+    """Rebuild a JSON value with every string leaf replaced by `func(path, leaf)`.
+    Args:
+        data (Any): The JSON value. It is not modified.
+        func (Callable[[JsonPath, str], str]): The replacement of a leaf.
+        path (JsonPath, optional): The path of `data` in the whole document. Defaults to ().
+    Returns:
+        Any: The new JSON value.
+    """
+    if isinstance(data, str):
+        return func(path, data)
+    if isinstance(data, dict):
+        return {key: map_json_strings(value, func, path + (key,)) for key, value in data.items()}
+    if isinstance(data, list):
+        return [map_json_strings(value, func, path + (index,)) for index, value in enumerate(data)]
+    return data
+
+
+def json_path_key(path: JsonPath) -> str:
+    """Name the field of a leaf path, leaving out list indices so that all records of an array share it.
+    Args:
+        path (JsonPath): The leaf path.
+    Returns:
+        str: The dotted field name, e.g. 'users.address.city'.
+    """
+    return ".".join(str(part) for part in path if not isinstance(part, int))
+
+
+class JsonAnalyzer:
+    """
+    Analyzes the string leaves of JSON data of any nesting, including arrays of records.
+
+    Every distinct leaf string is analyzed once, in a single batched NLP run. Fields are named
+    by their dotted key path without list indices, and a field is mapped to its most frequent
+    entity type when that type covers at least `threshold` of its leaves.
+    """
+    def __init__(self, analyzer_engine: CustomAnalyzerEngine, threshold: float = DF_ENTITY_THRESHOLD,
+                 batch_size: int = NLP_BATCH_SIZE, n_process: int = NLP_N_PROCESS):
+        """Initialize the JSON analyzer.
+        Args:
+            analyzer_engine (CustomAnalyzerEngine): The text analyzer engine.
+            threshold (float, optional): Minimum share of a field's leaves holding an entity type for the field
+                to be mapped to it. Defaults to DF_ENTITY_THRESHOLD.
+            batch_size (int, optional): Number of strings per spaCy batch. Defaults to NLP_BATCH_SIZE.
+            n_process (int, optional): Number of spaCy worker processes. Defaults to NLP_N_PROCESS.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("The field threshold must be in (0, 1].")
+        self.analyzer_engine = analyzer_engine
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.n_process = n_process
+
+    def analyze(self, data: Any, language: str = "en", entities: Optional[List[str]] = None) -> Dict[str, Dict[str, str]]:
+        """Map the fields of JSON data to the entity type they hold.
+        Args:
+            data (Any): The JSON data.
+            language (str, optional): The language of the data. Defaults to "en".
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+        Returns:
+            Dict[str, Dict[str, str]]: The analysis, as {"entity_mapping": {field: entity type}}. Fields without
+                a dominant entity type are left out.
+        """
+        leaves = list(iter_json_strings(data))
+        value_results = self.analyze_values((value for _, value in leaves), language=language, entities=entities)
+        totals: Counter = Counter()
+        entity_counts: Dict[str, Counter] = defaultdict(Counter)
+        for path, value in leaves:
+            key = json_path_key(path)
+            totals[key] += 1
+            if value_results.get(value):
+                entity_counts[key][max(value_results[value], key=lambda result: result.score).entity_type] += 1
+        entity_mapping = {}
+        for key, counts in entity_counts.items():
+            entity, count = counts.most_common(1)[0]
+            if count / totals[key] >= self.threshold:
+                entity_mapping[key] = entity
+        return {"entity_mapping": entity_mapping}
+
+    def analyze_values(self, values: Iterable[str], language: str = "en",
+                       entities: Optional[List[str]] = None) -> Dict[str, List[RecognizerResult]]:
+        """Analyze distinct strings in one batched NLP run.
+        Args:
+            values (Iterable[str]): The strings, possibly repeated.
+            language (str, optional): The language of the data. Defaults to "en".
+            entities (List[str], optional): Entity types to look for. Defaults to None (all).
+        Returns:
+            Dict[str, List[RecognizerResult]]: The results of each distinct non-blank string.
+        """
+        unique_values = [value for value in dict.fromkeys(values) if value.strip()]
+        if not unique_values:
+            return {}
+        batch_results = self.analyzer_engine.analyze_batch(
+            unique_values, language=language, entities=entities, batch_size=self.batch_size, n_process=self.n_process
+        )
+        return dict(zip(unique_values, batch_results))
+
+
+class _JsonArrayReader:
+    """Incremental reader of the items of a JSON array from a text stream."""
+    def __init__(self, stream: TextIO, chunk_chars: int):
+        self.stream = stream
+        self.chunk_chars = chunk_chars
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self) -> bool:
+        """Append the next chunk of the stream to the buffer, dropping what was consumed."""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_chars)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        """Skip whitespace and return the next character, None at the end of the stream."""
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self._read_more():
+                return None
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, which must be one of `chars`."""
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError(f"Malformed JSON array: expected one of {list(chars)}, found {char!r}.")
+        self.pos += 1
+        return char
+
+    def decode(self) -> Any:
+        """Decode the next value, reading more of the stream until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A value cut at the end of the buffer, such as a number, may continue in the next chunk,
+                # so it is only complete once the array separator or end follows it
+                following = _NON_WHITESPACE.search(self.buffer, end)
+                if self.eof or (following and following.group() in ",]"):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+
+def iter_json_array(stream: TextIO, chunk_chars: int = JSON_STREAM_CHUNK_CHARS) -> Iterator[Any]:
+    """Parse the items of a top-level JSON array one at a time, without loading the whole document.
+    Args:
+        stream (TextIO): The text stream holding the array.
+        chunk_chars (int, optional): Number of characters read at a time. Defaults to JSON_STREAM_CHUNK_CHARS.
+    Returns:
+        Iterator[Any]: The items of the array, in order.
+    Raises:
+        ValueError: If the document is not a JSON array.
+    """
+    reader = _JsonArrayReader(stream, chunk_chars)
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.decode()
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_json_lines(stream: TextIO) -> Iterator[Any]:
+    """Parse a JSON Lines stream one record at a time, skipping blank lines.
+    Args:
+        stream (TextIO): The text stream with one JSON value per line.
+    Returns:
+        Iterator[Any]: The records, in order.
+    """
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
@@ -0,0 +1,169 @@
+"""Splitting of large texts into chunks analyzed separately, and recombination of their results."""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from presidio_analyzer import RecognizerResult
+from privato.core.config import TEXT_CHUNK_MAX_CHARS, TEXT_WINDOW_CHARS, TEXT_WINDOW_OVERLAP
+
+# A paragraph ends at a blank line, a line at a line break.
+_PARAGRAPH_BREAK = re.compile(r"\n(?:[ \t\r\f\v]*\n)+")
+_LINE_BREAK = re.compile(r"\n")
+# A sentence ends at terminal punctuation followed by whitespace, or at a line break.
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def split_paragraphs(text: str, max_chars: int = TEXT_CHUNK_MAX_CHARS) -> List[Tuple[int, str]]:
+    """Split a text into paragraphs, further split into lines when longer than `max_chars`.
+
+    The chunks only depend on their own content, so an unchanged paragraph of an edited
+    document produces the same chunk as before. Whitespace-only chunks are dropped.
+    Args:
+        text (str): The text to split.
+        max_chars (int, optional): Paragraphs longer than this are split on line breaks. Defaults to TEXT_CHUNK_MAX_CHARS.
+    Returns:
+        List[Tuple[int, str]]: Pairs of chunk start offset in the text and chunk text, in order.
+    """
+    chunks = []
+    for start, paragraph in _split(text, 0, _PARAGRAPH_BREAK):
+        if len(paragraph) > max_chars:
+            chunks.extend(_split(paragraph, start, _LINE_BREAK))
+        else:
+            chunks.append((start, paragraph))
+    return [(start, chunk) for start, chunk in chunks if chunk.strip()]
+
+
+def _split(text: str, offset: int, separator: "re.Pattern") -> List[Tuple[int, str]]:
+    """Split a text on a separator pattern, keeping the offset of every part.
+    Args:
+        text (str): The text to split.
+        offset (int): The offset of `text` in the whole document.
+        separator (re.Pattern): The separator pattern.
+    Returns:
+        List[Tuple[int, str]]: Pairs of part offset in the document and part text.
+    """
+    parts = []
+    start = 0
+    for match in separator.finditer(text):
+        parts.append((offset + start, text[start:match.start()]))
+        start = match.end()
+    parts.append((offset + start, text[start:]))
+    return parts
+
+
+def shift_results(results: List[Dict[str, Any]], offset: int) -> List[RecognizerResult]:
+    """Rebuild the results of a chunk as results of the whole document.
+    Args:
+        results (List[Dict[str, Any]]): The serialized results of the chunk, with offsets relative to the chunk.
+        offset (int): The start offset of the chunk in the document.
+    Returns:
+        List[RecognizerResult]: New results with document offsets.
+    """
+    return [
+        RecognizerResult(
+            entity_type=result["entity_type"],
+            start=result["start"] + offset,
+            end=result["end"] + offset,
+            score=result["score"],
+            analysis_explanation=result.get("analysis_explanation"),
+            recognition_metadata=result.get("recognition_metadata"),
+        )
+        for result in results
+    ]
+
+
+def split_windows(text: str, window_chars: int = TEXT_WINDOW_CHARS,
+                  overlap_chars: int = TEXT_WINDOW_OVERLAP) -> List[Tuple[int, str]]:
+    """Split a text into overlapping windows of at most `window_chars` characters cut at sentence boundaries.
+
+    Consecutive windows share about `overlap_chars` characters, so an entity cut at the end of a
+    window is found whole at the start of the next one. Windows fall back to cutting at whitespace,
+    and then anywhere, when no sentence boundary is close enough.
+    Args:
+        text (str): The text to split.
+        window_chars (int, optional): The maximum window length. Defaults to TEXT_WINDOW_CHARS.
+        overlap_chars (int, optional): The overlap between consecutive windows. Defaults to TEXT_WINDOW_OVERLAP.
+    Returns:
+        List[Tuple[int, str]]: Pairs of window start offset in the text and window text, in order.
+    """
+    if overlap_chars * 2 >= window_chars:
+        raise ValueError("The window overlap must be less than half the window length.")
+    windows = []
+    start = 0
+    while True:
+        end = min(start + window_chars, len(text))
+        if end < len(text):
+            end = _last_boundary(text, start + window_chars // 2, end) or end
+        windows.append((start, text[start:end]))
+        if end >= len(text):
+            return windows
+        # Start the next window at the first boundary of the overlap, so that it begins a sentence
+        overlap_start = end - overlap_chars
+        start = _first_boundary(text, overlap_start, end) or overlap_start
+
+
+def _last_boundary(text: str, start: int, end: int) -> Optional[int]:
+    """Find the last sentence boundary, or else whitespace, in text[start:end].
+    Returns:
+        Optional[int]: The offset where the boundary ends a chunk, or None if there is none.
+    """
+    for pattern in (_SENTENCE_BREAK, _WHITESPACE):
+        matches = list(pattern.finditer(text, start, end))
+        if matches:
+            return matches[-1].start() or None
+    return None
+
+
+def _first_boundary(text: str, start: int, end: int) -> Optional[int]:
+    """Find the first sentence boundary, or else whitespace, in text[start:end].
+    Returns:
+        Optional[int]: The offset where the next chunk begins after the boundary, or None if there is none.
+    """
+    for pattern in (_SENTENCE_BREAK, _WHITESPACE):
+        match = pattern.search(text, start, end)
+        if match and match.end() < end:
+            return match.end()
+    return None
+
+
+def merge_window_results(window_results: List[Tuple[int, int, List[RecognizerResult]]]) -> List[RecognizerResult]:
+    """Merge the results of overlapping windows into results of the whole text.
+
+    Results touching a cut between two windows may be truncated entities and are dropped when they lie
+    within the overlap, as the neighbouring window sees them whole. Entities found in both windows of an
+    overlap are kept once, and overlapping results of the same type are reduced to the best scoring,
+    then longest, one.
+    Args:
+        window_results (List[Tuple[int, int, List[RecognizerResult]]]): The start offset, length and results,
+            with offsets relative to the window, of every window in order.
+    Returns:
+        List[RecognizerResult]: The merged results with offsets in the whole text, sorted by start.
+    """
+    candidates = []
+    for index, (offset, length, results) in enumerate(window_results):
+        previous_end = window_results[index - 1][0] + window_results[index - 1][1] if index > 0 else None
+        next_start = window_results[index + 1][0] if index + 1 < len(window_results) else None
+        for result in results:
+            cut_at_start = previous_end is not None and result.start == 0 and offset + result.end <= previous_end
+            cut_at_end = next_start is not None and result.end == length and offset + result.start >= next_start
+            if cut_at_start or cut_at_end:
+                continue
+            result.start += offset
+            result.end += offset
+            candidates.append(result)
+
+    # Kept results of a type never overlap each other, so sorted by start they are sorted by end too, and
+    # a candidate can only overlap the kept result of its type starting last before the candidate ends
+    merged: List[RecognizerResult] = []
+    kept_starts: Dict[str, List[int]] = defaultdict(list)
+    kept_ends: Dict[str, List[int]] = defaultdict(list)
+    for result in sorted(candidates, key=lambda r: (r.score, r.end - r.start), reverse=True):
+        starts, ends = kept_starts[result.entity_type], kept_ends[result.entity_type]
+        index = bisect_left(starts, result.end)
+        if index and ends[index - 1] > result.start:
+            continue
+        starts.insert(index, result.start)
+        ends.insert(index, result.end)
+        merged.append(result)
+    return sorted(merged, key=lambda r: (r.start, r.end))
@@ -5,8 +5,15 @@ from typing import List
 from io import BytesIO
 from PIL import Image
 from pathlib import Path
-from typing import Union, Optional,Any, Dict, List
+from typing import Union, Optional,Any, Callable, Dict, List, Iterable, Iterator, Tuple
+from itertools import islice
+import hashlib
+import json
+from pandas import DataFrame
+from pandas.util import hash_pandas_object
 from privato.core.ingestion import Ingestor
+from privato.core.converter import PDFPages
+from privato.core.file_reader import DataFrameChunks
 
 def load_image(image_path: str) -> Image.Image:
     """
@@ -78,54 +85,107 @@ def images_to_pdf(image_paths: List[Path], output_pdf_path: Path) -> Optional[Pa
         # and closed as they are consumed by the .save() method.
     
 
-def check_json_complexity(data: Dict[str, Any]) -> None:
+def get_dir_files_names(dir_path: Path) -> List[str]:
+    """Get a list of file names in a directory.
+    Args:
+        dir_path (Path): The directory path.
+    Returns:
+        List[str]: List of file names in the directory.
     """
-    Recursively checks a dictionary to see if it contains a list of dictionaries.
-
-    This is used to identify complex JSON structures that are not supported
-    by the `JsonAnalysisBuilder` and require manual analysis definition.
+    if not dir_path.is_dir():
+        raise NotADirectoryError(f"Provided path is not a directory: {dir_path}")
+    return [file.name for file in dir_path.iterdir() if file.is_file() and file.suffix in Ingestor.SUPPORTED_FILE_FORMATS]
 
+def batched(iterable: Iterable[Any], size: int) -> Iterator[Tuple[Any, ...]]:
+    """Split an iterable into consecutive tuples of at most `size` items.
     Args:
-        data: The dictionary (JSON object) to check.
-
-    Raises:
-        NotImplementedError: If a list containing a dictionary is found.
+        iterable (Iterable[Any]): The items to split.
+        size (int): The maximum number of items per batch.
+    Returns:
+        Iterator[Tuple[Any, ...]]: The batches, in order.
     """
-    for value in data.values():
-        if isinstance(value, dict):
-            # If the value is another dictionary, recurse into it
-            check_json_complexity(value)
-        elif isinstance(value, list):
-            # If the value is a list, check its items
-            _check_list_items(value)
-
-def _check_list_items(items: List[Any]) -> None:
-    """Helper function to check items within a list.
+    if size < 1:
+        raise ValueError("Batch size must be at least 1.")
+    iterator = iter(iterable)
+    while batch := tuple(islice(iterator, size)):
+        yield batch
+
+
+def track_progress(items: Iterable[Any], total: int,
+                   progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Any]:
+    """Yield items, reporting after each one how many have been produced so far.
     Args:
-        items (List[Any]): The list of items to check.
-    Raises:
-        NotImplementedError: If a list containing a dictionary is found.
+        items (Iterable[Any]): The items, such as the analyzed pages of a document.
+        total (int): The expected number of items.
+        progress (Callable[[int, int], None], optional): Called with the number of items done and `total`.
+            Defaults to None (no reporting).
     Returns:
-        None
+        Iterator[Any]: The items, in order.
     """
+    if progress is None:
+        yield from items
+        return
+    done = 0
     for item in items:
-        if isinstance(item, dict):
-            # This is the "complex" case: a dictionary inside a list
-            raise NotImplementedError(
-                "Handling JSON with nested objects (dictionaries) in lists is not supported. "
-                "Please define the analysis manually using StructuredAnalysis."
-            )
-        elif isinstance(item, list):
-            # Recurse in case of nested lists (e.g., list of lists)
-            _check_list_items(item)
+        yield item
+        done += 1
+        progress(done, total)
 
-def get_dir_files_names(dir_path: Path) -> List[str]:
-    """Get a list of file names in a directory.
+
+def fingerprint(data: Any, data_type: str) -> str:
+    """Compute a content hash of ingested data, used to tell whether two inputs are the same document.
     Args:
-        dir_path (Path): The directory path.
+        data (Any): The ingested data (text, image, PDF pages, list of images, DataFrame, DataFrame chunks or JSON).
+        data_type (str): The type of the data ('img', 'imgs', 'text', 'json', 'df', 'dfs').
     Returns:
-        List[str]: List of file names in the directory.
+        str: The hex SHA-256 digest of the data type and content.
     """
-    if not dir_path.is_dir():
-        raise NotADirectoryError(f"Provided path is not a directory: {dir_path}")
-    return [file.name for file in dir_path.iterdir() if file.is_file() and file.suffix in Ingestor.SUPPORTED_FILE_FORMATS]
\ No newline at end of file
+    digest = hashlib.sha256(data_type.encode())
+    _update_digest(digest, data)
+    return digest.hexdigest()
+
+def try_fingerprint(data: Any, data_type: str) -> Optional[str]:
+    """Compute the content hash of ingested data, if its content can be hashed.
+    Args:
+        data (Any): The ingested data.
+        data_type (str): The type of the data ('img', 'imgs', 'text', 'json', 'df', 'dfs').
+    Returns:
+        Optional[str]: The hex SHA-256 digest of the data type and content, or None if the data cannot be hashed,
+            such as a DataFrame holding unhashable cells.
+    """
+    try:
+        return fingerprint(data, data_type)
+    except TypeError:
+        return None
+
+def _update_digest(digest: "hashlib._Hash", data: Any) -> None:
+    """Feed the content of ingested data into a hash.
+    Args:
+        digest (hashlib._Hash): The hash to update.
+        data (Any): The data to hash.
+    Raises:
+        TypeError: If the data type cannot be hashed.
+    """
+    if isinstance(data, str):
+        digest.update(data.encode())
+    elif isinstance(data, bytes):
+        digest.update(data)
+    elif isinstance(data, PDFPages):
+        digest.update(f"pdf:{data.dpi}:".encode())
+        digest.update(data.pdf_bytes)
+    elif isinstance(data, Image.Image):
+        digest.update(f"{data.mode}:{data.size}:".encode())
+        digest.update(data.tobytes())
+    elif isinstance(data, DataFrame):
+        digest.update(json.dumps([str(column) for column in data.columns]).encode())
+        digest.update(hash_pandas_object(data, index=True).values.tobytes())
+    elif isinstance(data, DataFrameChunks):
+        for chunk in data:
+            _update_digest(digest, chunk)
+    elif isinstance(data, (list, tuple)) and all(isinstance(item, Image.Image) for item in data):
+        for item in data:
+            _update_digest(digest, item)
+    elif isinstance(data, (dict, list)):
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    else:
+        raise TypeError(f"Cannot fingerprint data of type {type(data).__name__}")
@@ -0,0 +1,632 @@
+"""Process pool helpers to analyze and redact many files in parallel."""
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from collections import deque
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from privato.core.analyzer import Analyzer
+from privato.core.redactor import Redactor
+from privato.core.ingestion import Ingestor
+from privato.core.save_files import SaveFiles
+from privato.core.pipeline import output_name
+from privato.core.analysis_store import StoredAnalysis
+from privato.core.jobs import Job, JobStore
+from privato.core.utils import save_img_to_buffer, try_fingerprint
+from privato.core.config import logger, PDF_REDACTION_MODE, DF_CHUNK_ROWS, API_WORKERS, API_MAX_QUEUE, JOB_WORKERS
+
+# Engines of the current worker, built once by the pool initializers. They are kept per thread, as an
+# executor's initializer and tasks run in the same thread: a worker process has its own engines, and so has
+# the thread of every executor running in the current process (workers=0), however many there are.
+_engines = threading.local()
+# Seconds between attempts to get a slot of a full inference pool
+_SLOT_POLL_INTERVAL = 0.05
+
+
+def _init_analyzer_worker(df_chunk_rows: Optional[int] = DF_CHUNK_ROWS) -> None:
+    """Build the ingestor and analyzer engines of an analysis worker process.
+    Args:
+        df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files, None to read them whole.
+            Defaults to DF_CHUNK_ROWS.
+    """
+    _engines.ingestor = Ingestor(df_chunk_rows=df_chunk_rows)
+    _engines.analyzer = Analyzer()
+
+
+def _init_redactor_worker(output_path: Path, pdf_redaction_mode: str = PDF_REDACTION_MODE,
+                          df_chunk_rows: Optional[int] = DF_CHUNK_ROWS) -> None:
+    """Build the ingestor, redactor engines and file saver of a redaction worker process.
+    Args:
+        output_path (Path): The directory the redacted files are saved to.
+        pdf_redaction_mode (str, optional): How PDF documents are redacted. Defaults to PDF_REDACTION_MODE.
+        df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files, None to read them whole.
+            Defaults to DF_CHUNK_ROWS.
+    """
+    _engines.ingestor = Ingestor(df_chunk_rows=df_chunk_rows)
+    _engines.redactor = Redactor(pdf_redaction_mode=pdf_redaction_mode)
+    _engines.saver = SaveFiles(output_path)
+
+
+def _analyze_path(path: Path, language: str = "en") -> Optional[Any]:
+    """Ingest and analyze a single file in a worker process.
+    Args:
+        path (Path): The file to analyze.
+        language (str, optional): The language of the content. Defaults to "en".
+    Returns:
+        Optional[Any]: The analysis result, or None if the file could not be ingested.
+    """
+    try:
+        file, ext = _engines.ingestor.ingest(path)
+    except Exception as e:
+        logger.error(f"Error ingesting {path}: {e}")
+        return None
+    return _engines.analyzer.analyze(file, data_type=ext, language=language)
+
+
+def _redact_path(path: Path, language: str = "en", root: Optional[Path] = None) -> Optional[Path]:
+    """Ingest, redact and save a single file in a worker process.
+    Args:
+        path (Path): The file to redact.
+        language (str, optional): The language of the content. Defaults to "en".
+        root (Path, optional): The directory the file was found in, whose subdirectories the output mirrors.
+            Defaults to None.
+    Returns:
+        Optional[Path]: The path of the saved redacted file, or None if the file could not be ingested.
+    """
+    try:
+        file, ext = _engines.ingestor.ingest(path)
+    except Exception as e:
+        logger.error(f"Error ingesting {path}: {e}")
+        return None
+    redacted_file = _engines.redactor.redact(file, data_type=ext, language=language)
+    return _engines.saver.save_files([redacted_file], filenames=[output_name(path, root)])[0]
+
+
+def iter_analyze_parallel(paths: List[Path], language: str = "en", workers: int = 2,
+                          chunksize: int = 1, df_chunk_rows: Optional[int] = DF_CHUNK_ROWS) -> Iterator[Tuple[Path, Any]]:
+    """Analyze files in a pool of worker processes, yielding results in input order.
+
+    Each worker builds its engines once and then pulls files from the pool's shared queue.
+    Files that cannot be ingested are skipped.
+    Args:
+        paths (List[Path]): The files to analyze.
+        language (str, optional): The language of the content. Defaults to "en".
+        workers (int, optional): Number of worker processes. Defaults to 2.
+        chunksize (int, optional): Number of files handed to a worker at a time. Defaults to 1.
+        df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files, None to read them whole.
+            Defaults to DF_CHUNK_ROWS.
+    Returns:
+        Iterator[Tuple[Path, Any]]: Pairs of file path and analysis result.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_analyzer_worker,
+                             initargs=(df_chunk_rows,)) as executor:
+        results = executor.map(partial(_analyze_path, language=language), paths, chunksize=chunksize)
+        for path, result in zip(paths, results):
+            if result is not None:
+                yield path, result
+
+
+def iter_redact_parallel(paths: List[Path], output_path: Union[str, Path], language: str = "en",
+                         workers: int = 2, chunksize: int = 1,
+                         pdf_redaction_mode: str = PDF_REDACTION_MODE,
+                         df_chunk_rows: Optional[int] = DF_CHUNK_ROWS,
+                         root: Optional[Path] = None) -> Iterator[Tuple[Path, Path]]:
+    """Redact files in a pool of worker processes, yielding saved paths in input order.
+
+    Each worker builds its engines once, pulls files from the pool's shared queue and saves
+    its redacted output directly, so no image data is sent back to the parent process.
+    Files that cannot be ingested are skipped.
+    Args:
+        paths (List[Path]): The files to redact.
+        output_path (Union[str, Path]): The directory the redacted files are saved to.
+        language (str, optional): The language of the content. Defaults to "en".
+        workers (int, optional): Number of worker processes. Defaults to 2.
+        chunksize (int, optional): Number of files handed to a worker at a time. Defaults to 1.
+        pdf_redaction_mode (str, optional): How PDF documents are redacted. Defaults to PDF_REDACTION_MODE.
+        df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files, None to read them whole.
+            Defaults to DF_CHUNK_ROWS.
+        root (Path, optional): The directory the files were found in. Outputs mirror its subdirectories.
+            Defaults to None (outputs named by file name only).
+    Returns:
+        Iterator[Tuple[Path, Path]]: Pairs of input path and saved redacted file path.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_redactor_worker,
+                             initargs=(Path(output_path), pdf_redaction_mode, df_chunk_rows)) as executor:
+        saved_paths = executor.map(partial(_redact_path, language=language, root=root), paths, chunksize=chunksize)
+        for path, saved_path in zip(paths, saved_paths):
+            if saved_path is not None:
+                yield path, saved_path
+
+
+def _init_api_worker(pdf_redaction_mode: str = PDF_REDACTION_MODE, df_chunk_rows: Optional[int] = DF_CHUNK_ROWS) -> None:
+    """Build the ingestor, analyzer and redactor engines of an API inference worker.
+    Args:
+        pdf_redaction_mode (str, optional): How PDF documents are redacted. Defaults to PDF_REDACTION_MODE.
+        df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files, None to read them whole.
+            Defaults to DF_CHUNK_ROWS.
+    """
+    _engines.ingestor = Ingestor(df_chunk_rows=df_chunk_rows)
+    _engines.analyzer = Analyzer()
+    _engines.redactor = Redactor(pdf_redaction_mode=pdf_redaction_mode)
+
+
+def _warm_up() -> int:
+    """A no-op task forcing a worker to start and build its engines.
+    Returns:
+        int: The process ID of the worker.
+    """
+    return os.getpid()
+
+
+def analyze_upload(path: Path, language: str = "en",
+                   entities: Optional[list] = None) -> Tuple[Any, str, Optional[str]]:
+    """Ingest and analyze an uploaded file in an API inference worker.
+    Args:
+        path (Path): The upload, spooled to disk by the server process with the extension of its file name.
+        language (str, optional): The language of the content. Defaults to "en".
+        entities (list, optional): List of entity types to look for. Defaults to None.
+    Returns:
+        Tuple[Any, str, Optional[str]]: The analysis result, the data type and the content fingerprint, so that
+            the analysis can be stored by the server process.
+    """
+    data, data_type = _engines.ingestor.ingest(path)
+    analysis, content_hash = _engines.analyzer.analyze_with_fingerprint(data, data_type=data_type, language=language,
+                                                                        entities=entities)
+    return analysis, data_type, content_hash
+
+
+def redact_upload(path: Path, language: str = "en",
+                  analysis: Optional[StoredAnalysis] = None) -> Tuple[str, Any]:
+    """Ingest and redact an uploaded file in an API inference worker.
+
+    The redacted output is serialized in the worker, so that no image or DataFrame is sent back.
+    Args:
+        path (Path): The upload, spooled to disk by the server process with the extension of its file name.
+        language (str, optional): The language of the content. Defaults to "en".
+        analysis (StoredAnalysis, optional): A previous analysis of the same content. Defaults to None.
+    Returns:
+        Tuple[str, Any]: The data type and the redacted output: PNG bytes for 'img', PDF bytes for 'imgs',
+            CSV bytes for 'df', the path of a temporary CSV file for 'dfs', and JSON-serializable data otherwise.
+    """
+    data, data_type = _engines.ingestor.ingest(path)
+    redacted = _engines.redactor.redact(data, data_type=data_type, language=language, download=True, analysis=analysis)
+    if data_type == "img":
+        return data_type, save_img_to_buffer(redacted).getvalue()
+    if data_type == "df":
+        return data_type, redacted.to_csv(index=False).encode("utf-8")
+    if data_type == "dfs":
+        # Written chunk by chunk, so that the table is never held whole in memory
+        fd, output_file = tempfile.mkstemp(prefix="privato-", suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for index, chunk in enumerate(redacted):
+                chunk.to_csv(f, index=False, header=index == 0)
+        return data_type, Path(output_file)
+    return data_type, redacted
+
+
+def analyze_uploads(uploads: List[Tuple[str, bytes]], language: str = "en",
+                    entities: Optional[list] = None) -> List[Dict[str, Any]]:
+    """Ingest and analyze a batch of uploaded files in an API inference worker.
+
+    The files go through `Analyzer.analyze_files`, so their texts share one NLP run and their
+    images one detector batch. A file that cannot be ingested or analyzed does not fail the others.
+    Args:
+        uploads (List[Tuple[str, bytes]]): Pairs of file name and content.
+        language (str, optional): The language of the content. Defaults to "en".
+        entities (list, optional): List of entity types to look for. Defaults to None.
+    Returns:
+        List[Dict[str, Any]]: Per file, in order, its 'filename' and either its 'data_type', 'analysis' and
+            content 'fingerprint', or an 'error'.
+    """
+    outcomes: List[Dict[str, Any]] = []
+    ingested = []
+    for filename, content in uploads:
+        try:
+            data, data_type = _engines.ingestor.ingest_bytes(content, filename)
+        except Exception as e:
+            outcomes.append({"filename": filename, "error": str(e)})
+            continue
+        outcomes.append({"filename": filename, "data_type": data_type, "fingerprint": try_fingerprint(data, data_type)})
+        ingested.append((len(outcomes) - 1, data, data_type))
+    try:
+        analyses = _engines.analyzer.analyze_files([(data, data_type) for _, data, data_type in ingested],
+                                           language=language, entities=entities)
+    except Exception as e:
+        logger.error(f"Error during batch analysis: {e}")
+        for index, _, _ in ingested:
+            outcomes[index] = {"filename": outcomes[index]["filename"], "error": str(e)}
+        return outcomes
+    for (index, _, _), analysis in zip(ingested, analyses):
+        outcomes[index]["analysis"] = analysis
+    return outcomes
+
+
+def redact_uploads(uploads: List[Tuple[str, bytes]], language: str = "en") -> List[Dict[str, Any]]:
+    """Ingest and redact a batch of uploaded files in an API inference worker.
+
+    The files go through `Redactor.redact_files`, so their texts share one NLP run and their
+    images one detector batch. A file that cannot be ingested or redacted does not fail the others.
+    Args:
+        uploads (List[Tuple[str, bytes]]): Pairs of file name and content.
+        language (str, optional): The language of the content. Defaults to "en".
+    Returns:
+        List[Dict[str, Any]]: Per file, in order, its 'filename' and either the redacted file 'content' with
+            its 'extension', or an 'error'.
+    """
+    outcomes: List[Dict[str, Any]] = []
+    ingested = []
+    for filename, content in uploads:
+        try:
+            data, data_type = _engines.ingestor.ingest_bytes(content, filename)
+        except Exception as e:
+            outcomes.append({"filename": filename, "error": str(e)})
+            continue
+        outcomes.append({"filename": filename})
+        ingested.append((len(outcomes) - 1, data, data_type))
+    try:
+        redacted_files = _engines.redactor.redact_files([(data, data_type) for _, data, data_type in ingested],
+                                                        language=language)
+    except Exception as e:
+        logger.error(f"Error during batch redaction: {e}")
+        for index, _, _ in ingested:
+            outcomes[index]["error"] = str(e)
+        return outcomes
+    for (index, _, data_type), redacted in zip(ingested, redacted_files):
+        try:
+            outcomes[index]["content"], outcomes[index]["extension"] = _to_file_bytes(redacted, data_type)
+        except Exception as e:
+            outcomes[index]["error"] = str(e)
+    return outcomes
+
+
+def _to_file_bytes(redacted: Any, data_type: str) -> Tuple[bytes, str]:
+    """Serialize a redacted file the way SaveFiles would write it.
+    Args:
+        redacted (Any): The redacted content.
+        data_type (str): The type of the content.
+    Returns:
+        Tuple[bytes, str]: The file content and its extension.
+    """
+    if data_type == "img":
+        return save_img_to_buffer(redacted).getvalue(), ".png"
+    if data_type == "imgs":
+        if isinstance(redacted, bytes):
+            return redacted, ".pdf"
+        buffer = BytesIO()
+        redacted[0].save(buffer, save_all=True, append_images=redacted[1:], format="PDF")
+        return buffer.getvalue(), ".pdf"
+    if data_type == "df":
+        return redacted.to_csv(index=False).encode("utf-8"), ".csv"
+    if data_type == "dfs":
+        chunks = [chunk.to_csv(index=False, header=index == 0) for index, chunk in enumerate(redacted)]
+        return "".join(chunks).encode("utf-8"), ".csv"
+    return json.dumps(redacted, ensure_ascii=False, indent=4).encode("utf-8"), ".json"
+
+
+def _make_api_executor(workers: int, thread_name_prefix: str, pdf_redaction_mode: str = PDF_REDACTION_MODE,
+                       df_chunk_rows: Optional[int] = DF_CHUNK_ROWS) -> Executor:
+    """Build an executor whose workers hold API engines.
+    Args:
+        workers (int): Number of worker processes, 0 for a single thread of the current process with its own engines.
+        thread_name_prefix (str): Name prefix of the thread used when `workers` is 0.
+        pdf_redaction_mode (str, optional): How PDF documents are redacted. Defaults to PDF_REDACTION_MODE.
+        df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files. Defaults to DF_CHUNK_ROWS.
+    Returns:
+        Executor: The executor.
+    """
+    initargs = (pdf_redaction_mode, df_chunk_rows)
+    if workers > 0:
+        # Spawned rather than forked, as the server process runs an event loop and threads
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_api_worker, initargs=initargs,
+        )
+    return ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix=thread_name_prefix,
+        initializer=_init_api_worker, initargs=initargs,
+    )
+
+
+class WorkerPoolFullError(RuntimeError):
+    """Raised when a task is submitted to an inference pool whose queue is full."""
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised when a worker of an inference pool died while its task was queued or running."""
+
+
+class InferencePool:
+    """
+    A pool of pre-warmed worker processes running analysis and redaction for the API.
+
+    Each worker builds its engines once, so requests never share engines between threads and
+    CPU-bound inference is not limited by the server's GIL. At most `workers + max_queue` tasks
+    are in flight; further submissions fail at once with WorkerPoolFullError. When a worker dies,
+    e.g. killed for running out of memory, the pool is replaced by fresh, warmed-up workers and the
+    tasks it held fail with WorkerCrashedError.
+    """
+    def __init__(self, workers: int = API_WORKERS, max_queue: int = API_MAX_QUEUE,
+                 pdf_redaction_mode: str = PDF_REDACTION_MODE, df_chunk_rows: Optional[int] = DF_CHUNK_ROWS):
+        """Initialize the pool. Workers are started by `warm_up` or by the first task.
+        Args:
+            workers (int, optional): Number of worker processes, 0 to run tasks in a single thread of the
+                current process. Defaults to API_WORKERS.
+            max_queue (int, optional): Number of tasks allowed to wait for a worker. Defaults to API_MAX_QUEUE.
+            pdf_redaction_mode (str, optional): How PDF documents are redacted. Defaults to PDF_REDACTION_MODE.
+            df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files, None to read them whole.
+                Defaults to DF_CHUNK_ROWS.
+        """
+        if workers < 0 or max_queue < 0:
+            raise ValueError("The number of workers and the queue size cannot be negative.")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pdf_redaction_mode = pdf_redaction_mode
+        self.df_chunk_rows = df_chunk_rows
+        self._executor = self._make_executor()
+        self._executor_lock = threading.Lock()
+        self._closed = False
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+
+    def _make_executor(self) -> Executor:
+        """Build the executor of the pool's workers."""
+        return _make_api_executor(self.workers, "privato-inference", self.pdf_redaction_mode, self.df_chunk_rows)
+
+    def _start_workers(self) -> List[Future]:
+        """Start every worker, returning the futures of their warm-up tasks."""
+        return [self._executor.submit(_warm_up) for _ in range(max(self.workers, 1))]
+
+    def warm_up(self) -> None:
+        """Start every worker and wait until their engines are built."""
+        wait(self._start_workers())
+        logger.info(f"Inference pool ready with {max(self.workers, 1)} worker(s).")
+
+    def _replace_broken(self, executor: Executor) -> None:
+        """Replace a broken executor by new workers, which start building their engines at once.
+        Args:
+            executor (Executor): The executor found broken. Nothing is done if it was already replaced.
+        """
+        with self._executor_lock:
+            if self._closed or self._executor is not executor:
+                return
+            logger.error("An inference worker died, restarting the inference pool.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._make_executor()
+            self._start_workers()
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a task in the pool without blocking the event loop.
+        Args:
+            func (Callable[..., Any]): The task, a picklable module-level function.
+            *args: Positional arguments of the task.
+            **kwargs: Keyword arguments of the task.
+        Returns:
+            Any: The result of the task.
+        Raises:
+            WorkerPoolFullError: If the pool already holds `workers + max_queue` tasks.
+            WorkerCrashedError: If the worker died before finishing the task. The pool is restarted.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise WorkerPoolFullError("All inference workers are busy and the queue is full.")
+        executor = self._executor
+        try:
+            future = executor.submit(func, *args, **kwargs)
+        except BaseException as e:
+            self._slots.release()
+            if isinstance(e, BrokenExecutor):
+                self._replace_broken(executor)
+                raise WorkerCrashedError("The inference workers were restarted, please retry.") from e
+            raise
+        # The slot is freed when the task ends, even if the request awaiting it was cancelled
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenExecutor as e:
+            self._replace_broken(executor)
+            raise WorkerCrashedError("An inference worker died while processing the request, please retry.") from e
+
+    async def run_when_free(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a task in the pool, waiting for a free slot instead of failing when the queue is full.
+        Args:
+            func (Callable[..., Any]): The task, a picklable module-level function.
+            *args: Positional arguments of the task.
+            **kwargs: Keyword arguments of the task.
+        Returns:
+            Any: The result of the task.
+        """
+        while True:
+            try:
+                return await self.run(func, *args, **kwargs)
+            except WorkerPoolFullError:
+                await asyncio.sleep(_SLOT_POLL_INTERVAL)
+
+    async def iter_map(self, func: Callable[..., Any], batches: AsyncIterator[Any], **kwargs: Any) -> AsyncIterator[Any]:
+        """Run a task per batch, yielding the results in order as they complete.
+
+        Up to one batch per worker runs at a time, so the next results are computed while the
+        current ones are sent, and batches are only pulled from `batches` when they are submitted.
+        Only the first batch fails with WorkerPoolFullError when the pool is full; later ones wait
+        for a slot, as their response is already under way.
+        Args:
+            func (Callable[..., Any]): The task, a picklable module-level function taking a batch.
+            batches (AsyncIterator[Any]): The batches.
+            **kwargs: Keyword arguments of the task.
+        Returns:
+            AsyncIterator[Any]: The result of each batch.
+        """
+        in_flight: Deque[asyncio.Future] = deque()
+        submitted = 0
+        exhausted = False
+
+        async def submit() -> None:
+            nonlocal submitted, exhausted
+            try:
+                batch = await batches.__anext__()
+            except StopAsyncIteration:
+                exhausted = True
+                return
+            run = self.run if submitted == 0 else self.run_when_free
+            in_flight.append(asyncio.ensure_future(run(func, batch, **kwargs)))
+            submitted += 1
+
+        try:
+            while not exhausted and len(in_flight) < max(self.workers, 1):
+                await submit()
+            while in_flight:
+                result = await in_flight.popleft()
+                if not exhausted:
+                    await submit()
+                yield result
+        finally:
+            for pending in in_flight:
+                pending.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel the queued tasks and stop the workers."""
+        with self._executor_lock:
+            self._closed = True
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def run_job(job_id: str, jobs_dir: str) -> None:
+    """Run a submitted job in a job worker, recording its progress and result in the job store.
+    Args:
+        job_id (str): The job ID.
+        jobs_dir (str): The directory of the job store.
+    """
+    job_store = getattr(_engines, "job_store", None)
+    if job_store is None or job_store.jobs_dir != Path(jobs_dir):
+        job_store = _engines.job_store = JobStore(jobs_dir, ttl=None)
+    try:
+        job = job_store.get(job_id)
+    except KeyError:
+        # Expired before a worker picked it up
+        return
+    job_store.set_running(job_id)
+    input_path = job_store.input_path(job)
+    try:
+        data, data_type = _engines.ingestor.ingest(input_path)
+        pages_total = len(data) if data_type == "imgs" else None
+        job_store.set_progress(job_id, 0, pages_total)
+        progress = partial(_record_progress, job_store, job_id)
+        saver = SaveFiles(job_store.job_dir(job_id))
+        if job.operation == "analyze":
+            analysis = _engines.analyzer.analyze(data, data_type=data_type, language=job.language, progress=progress)
+            saved_path = saver.save(analysis, data_type="json", filename="result")
+        else:
+            redacted = _engines.redactor.redact(data, data_type=data_type, language=job.language, download=True,
+                                        progress=progress)
+            saved_path = saver.save_files([redacted], filenames=["result"])[0]
+        if pages_total is not None:
+            job_store.set_progress(job_id, pages_total, pages_total)
+        job_store.set_done(job_id, saved_path.name)
+        logger.info(f"Job {job_id} done.")
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        job_store.set_failed(job_id, str(e))
+    finally:
+        input_path.unlink(missing_ok=True)
+
+
+def _record_progress(job_store: JobStore, job_id: str, pages_done: int, pages_total: int) -> None:
+    """Progress callback of a job, storing the number of pages done."""
+    job_store.set_progress(job_id, pages_done, pages_total)
+
+
+class JobRunner:
+    """
+    Runs submitted jobs in background worker processes holding API engines.
+
+    Jobs live in the job store rather than in the runner, so jobs left unfinished by a
+    restart are resumed by `resume`. When a worker dies, the workers are replaced: the job it
+    was running fails and the jobs still queued are submitted again.
+    """
+    def __init__(self, job_store: JobStore, workers: int = JOB_WORKERS,
+                 pdf_redaction_mode: str = PDF_REDACTION_MODE, df_chunk_rows: Optional[int] = DF_CHUNK_ROWS):
+        """Initialize the runner.
+        Args:
+            job_store (JobStore): The store of the jobs to run.
+            workers (int, optional): Number of worker processes, 0 to run jobs in a single thread of the current
+                process. Defaults to JOB_WORKERS.
+            pdf_redaction_mode (str, optional): How PDF documents are redacted. Defaults to PDF_REDACTION_MODE.
+            df_chunk_rows (int, optional): Rows per chunk when reading CSV and XLSX files, None to read them whole.
+                Defaults to DF_CHUNK_ROWS.
+        """
+        if workers < 0:
+            raise ValueError("The number of workers cannot be negative.")
+        self.job_store = job_store
+        self.workers = workers
+        self.pdf_redaction_mode = pdf_redaction_mode
+        self.df_chunk_rows = df_chunk_rows
+        self._executor = self._make_executor()
+        self._executor_lock = threading.Lock()
+        self._closed = False
+
+    def _make_executor(self) -> Executor:
+        """Build the executor of the job workers."""
+        return _make_api_executor(self.workers, "privato-jobs", self.pdf_redaction_mode, self.df_chunk_rows)
+
+    def submit(self, job: Job) -> None:
+        """Queue a job whose upload is saved.
+        Args:
+            job (Job): The job to run.
+        """
+        executor = self._executor
+        try:
+            future = executor.submit(run_job, job.id, str(self.job_store.jobs_dir))
+        except BrokenExecutor:
+            self._replace_broken(executor)
+            future = self._executor.submit(run_job, job.id, str(self.job_store.jobs_dir))
+        future.add_done_callback(partial(self._log_crash, job.id, executor))
+
+    def resume(self) -> None:
+        """Queue again the jobs left queued or running, e.g. by a restart."""
+        for job in self.job_store.unfinished():
+            logger.info(f"Resuming job {job.id}.")
+            self.submit(job)
+
+    def _replace_broken(self, executor: Executor) -> None:
+        """Replace a broken executor by new workers.
+        Args:
+            executor (Executor): The executor found broken. Nothing is done if it was already replaced.
+        """
+        with self._executor_lock:
+            if self._closed or self._executor is not executor:
+                return
+            logger.error("A job worker died, restarting the job workers.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._make_executor()
+
+    def _log_crash(self, job_id: str, executor: Executor, future: Future) -> None:
+        """Handle a job whose worker died before recording the outcome.
+
+        The workers are replaced; the job fails if it was running, and is queued again if it never started.
+        """
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            return
+        if isinstance(error, BrokenExecutor):
+            self._replace_broken(executor)
+            try:
+                job = self.job_store.get(job_id)
+            except KeyError:
+                return
+            if job.status == "queued" and not self._closed:
+                logger.info(f"Requeuing job {job_id} after a worker crash.")
+                self.submit(job)
+                return
+        logger.error(f"Job {job_id} crashed: {error}")
+        self.job_store.set_failed(job_id, f"The job worker crashed: {error}")
+
+    def shutdown(self) -> None:
+        """Stop the workers. Queued jobs stay in the store and are resumed on the next start."""
+        with self._executor_lock:
+            self._closed = True
+            self._executor.shutdown(wait=False, cancel_futures=True)
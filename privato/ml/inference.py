@@ -1,80 +1,223 @@
 """To perform inference on image data using machine learning models."""
 
 import os 
+import numpy as np
 from ultralytics import YOLO
+from ultralytics.engine.results import Results
 from PIL import Image
-from privato.core.config import MODEL_PATH, SIGNATURE_MODEL_NAME, FACE_MODEL_NAME
+from privato.core.config import MODEL_PATH, SIGNATURE_MODEL_NAME, FACE_MODEL_NAME, DETECTION_BATCH_SIZE
+from privato.core.config import DETECTION_CONFIDENCE_THRESHOLD, DETECTION_CLASSES
+from privato.core.config import DETECTION_BACKEND, DETECTION_BACKENDS, DETECTION_QUANTIZED, FACE_ONNX_MODEL_NAME
+from privato.ml.onnx_detector import OnnxYoloDetector, quantized_model_name
 from presidio_image_redactor.entities import ImageRecognizerResult
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+from contextlib import nullcontext
+import onnx
+import threading
 import importlib.resources as pkg_resources
 from privato.ml import model
 
 class ImageInference:
     """Class to handle image inference using a pre-trained YOLO models."""
 
-    def __init__(self, model_path: str = MODEL_PATH):
+    def __init__(self, model_path: str = MODEL_PATH, confidence_threshold: float = DETECTION_CONFIDENCE_THRESHOLD,
+                 classes: Optional[Iterable[str]] = DETECTION_CLASSES, backend: str = DETECTION_BACKEND,
+                 quantized: bool = DETECTION_QUANTIZED):
         """Initialize the ImageInference class with the model path and name.
         Args:
             model_path (str): The path where the model is stored.
+            confidence_threshold (float, optional): Minimum score of a kept detection. Defaults to DETECTION_CONFIDENCE_THRESHOLD.
+            classes (Iterable[str], optional): Entity names to keep, or None to keep every class. Defaults to DETECTION_CLASSES.
+            backend (str, optional): "ultralytics" or "onnxruntime". Defaults to DETECTION_BACKEND.
+            quantized (bool, optional): Use the INT8 dynamic-quantized ONNX models with the "onnxruntime" backend.
+                Defaults to DETECTION_QUANTIZED.
         """
+        if backend not in DETECTION_BACKENDS:
+            raise ValueError(f"Unsupported detection backend: {backend}")
+        self.backend = backend
+        self.confidence_threshold = confidence_threshold
+        self.classes = set(classes) if classes is not None else None
+        # Ultralytics predictors are not thread-safe, so concurrent pages take turns on each model,
+        # while the face and signature models can still run alongside each other.
+        # ONNX Runtime sessions can be run concurrently.
+        self._face_lock = threading.Lock() if backend == "ultralytics" else nullcontext()
+        self._signature_lock = threading.Lock() if backend == "ultralytics" else nullcontext()
+        self._batching_support: Dict[str, bool] = {}
         self.signature_model_name = SIGNATURE_MODEL_NAME
-        self.face_model_name = FACE_MODEL_NAME
+        self.face_model_name = FACE_MODEL_NAME if backend == "ultralytics" else FACE_ONNX_MODEL_NAME
+        if backend == "onnxruntime" and quantized:
+            self.signature_model_name = quantized_model_name(self.signature_model_name)
+            self.face_model_name = quantized_model_name(self.face_model_name)
         # Load signature model
-        with pkg_resources.path(model, self.signature_model_name) as signature_path:
-            self.signature_model_path = str(signature_path)
-            self.signature_model = YOLO(self.signature_model_path, task="detect")
-
+        self.signature_model_path, self.signature_model = self._load_model(self.signature_model_name)
         # Load face model
-        with pkg_resources.path(model, self.face_model_name) as face_path:
-            self.face_model_path = str(face_path)
-            self.face_model = YOLO(self.face_model_path, task="detect")
+        self.face_model_path, self.face_model = self._load_model(self.face_model_name)
+
+    def _load_model(self, model_name: str) -> Tuple[str, Union[YOLO, OnnxYoloDetector]]:
+        """Load a packaged detection model with the configured backend.
+        Args:
+            model_name (str): The file name of the model in the model package.
+        Returns:
+            Tuple[str, Union[YOLO, OnnxYoloDetector]]: The path of the model file and the loaded model.
+        """
+        with pkg_resources.path(model, model_name) as path:
+            model_file_path = str(path)
+            if self.backend == "onnxruntime":
+                return model_file_path, OnnxYoloDetector(model_file_path)
+            return model_file_path, YOLO(model_file_path, task="detect")
 
-    def perform_inference(self, image: Image.Image) -> List[Dict]:
+    def perform_inference(self, image: Image.Image) -> List[ImageRecognizerResult]:
         """Perform inference on the given image and return annotated results.
         Args:
             image (Image): The input image for inference.
         Returns:
-            List[Dict]: A list of dictionaries containing detected entities and their details.
+            List[ImageRecognizerResult]: A list of detected entities and their details.
         """
+        return self.perform_inference_batch([image], batch_size=1)[0]
 
-        sign_results = self.signature_model(image)[0]
-        face_results = self.face_model(image)[0]
-        return self._convert_yolo_to_presidio(json.loads(face_results.to_json())) + self._convert_yolo_to_presidio(json.loads(sign_results.to_json()))
+    def perform_inference_batch(self, images: List[Image.Image], batch_size: int = DETECTION_BATCH_SIZE) -> List[List[ImageRecognizerResult]]:
+        """Perform inference on many images, sending them through each model in batches.
+        Args:
+            images (List[Image]): The input images for inference.
+            batch_size (int, optional): Number of images per model call. Defaults to DETECTION_BATCH_SIZE.
+        Returns:
+            List[List[ImageRecognizerResult]]: The detected entities of each image, in input order.
+        """
+        face_results = self.detect_faces(images, batch_size)
+        sign_results = self.detect_signatures(images, batch_size)
+        return [face + sign for face, sign in zip(face_results, sign_results)]
 
-    def _convert_yolo_to_presidio(self,yolo_results: Dict[str, Any]) -> List[ImageRecognizerResult]:
+    def detect_faces(self, images: List[Image.Image], batch_size: int = DETECTION_BATCH_SIZE) -> List[List[ImageRecognizerResult]]:
+        """Run the face detector on many images.
+        Args:
+            images (List[Image]): The input images.
+            batch_size (int, optional): Number of images per model call. Defaults to DETECTION_BATCH_SIZE.
+        Returns:
+            List[List[ImageRecognizerResult]]: The detected faces of each image, in input order.
+        """
+        with self._face_lock:
+            return self._detect(self.face_model, self.face_model_path, images, batch_size)
+
+    def detect_signatures(self, images: List[Image.Image], batch_size: int = DETECTION_BATCH_SIZE) -> List[List[ImageRecognizerResult]]:
+        """Run the signature detector on many images.
+        Args:
+            images (List[Image]): The input images.
+            batch_size (int, optional): Number of images per model call. Defaults to DETECTION_BATCH_SIZE.
+        Returns:
+            List[List[ImageRecognizerResult]]: The detected signatures of each image, in input order.
+        """
+        with self._signature_lock:
+            return self._detect(self.signature_model, self.signature_model_path, images, batch_size)
+
+    def _detect(self, detector: Union[YOLO, OnnxYoloDetector], detector_path: str, images: List[Image.Image],
+                batch_size: int) -> List[List[ImageRecognizerResult]]:
+        """Run one detector over images with the configured backend.
+        Args:
+            detector (Union[YOLO, OnnxYoloDetector]): The model to run.
+            detector_path (str): The path of the model file.
+            images (List[Image]): The input images.
+            batch_size (int): Number of images per model call.
+        Returns:
+            List[List[ImageRecognizerResult]]: The detected entities of each image, in input order.
+        """
+        if isinstance(detector, OnnxYoloDetector):
+            return [
+                self._detections_to_presidio(xyxy, conf, cls, detector.names)
+                for xyxy, conf, cls in detector.predict(images, batch_size=batch_size)
+            ]
+        return [self._convert_yolo_to_presidio(result) for result in self._predict_batch(detector, detector_path, images, batch_size)]
+
+    def _predict_batch(self, yolo_model: YOLO, yolo_model_path: str, images: List[Image.Image], batch_size: int) -> List[Any]:
+        """Run a model over images in chunks of `batch_size`, one image at a time for static-batch ONNX models.
+        Args:
+            yolo_model (YOLO): The model to run.
+            yolo_model_path (str): The path of the model file.
+            images (List[Image]): The input images.
+            batch_size (int): Number of images per model call.
+        Returns:
+            List[Any]: The Ultralytics results of each image, in input order.
+        """
+        if not self._supports_batching(yolo_model_path):
+            batch_size = 1
+        results = []
+        for start in range(0, len(images), batch_size):
+            results.extend(yolo_model(images[start:start + batch_size]))
+        return results
+
+    def _supports_batching(self, yolo_model_path: str) -> bool:
+        """Check whether a model accepts more than one image per call.
+
+        PyTorch models always do; ONNX models only when exported with a dynamic batch axis.
+        Args:
+            yolo_model_path (str): The path of the model file.
+        Returns:
+            bool: True if the model can run on batches.
+        """
+        if yolo_model_path not in self._batching_support:
+            supports_batching = True
+            if yolo_model_path.endswith(".onnx"):
+                graph = onnx.load(yolo_model_path, load_external_data=False).graph
+                supports_batching = bool(graph.input[0].type.tensor_type.shape.dim[0].dim_param)
+            self._batching_support[yolo_model_path] = supports_batching
+        return self._batching_support[yolo_model_path]
+
+    def _convert_yolo_to_presidio(self, yolo_results: Results) -> List[ImageRecognizerResult]:
         """
         Converts YOLO model detection results to a list of ImageRecognizerResult objects.
 
         Args:
-            yolo_results: A dictionary containing the YOLO model's output, including
-                          'boxes', 'scores', and 'labels'.
+            yolo_results: The Ultralytics results of a single image, whose `boxes`
+                          hold the `xyxy`, `conf` and `cls` tensors.
 
         Returns:
             A list of ImageRecognizerResult objects.
         """
-        presidio_results = []
-        num_detections = len(yolo_results)
-        
-        for i in range(num_detections):
-            # Extract data for a single detection
-            box = yolo_results[i]['box']
-            score = yolo_results[i]['confidence']
-            label = yolo_results[i]['name']
-            boxes = tuple(box.values())
-            x_min, y_min, x_max, y_max = boxes
-            # Create the ImageRecognizerResult object
-            result = ImageRecognizerResult(
-                entity_type=label,
+        boxes = yolo_results.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+        return self._detections_to_presidio(
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy().astype(int),
+            yolo_results.names
+        )
+
+    def _detections_to_presidio(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray,
+                                names: Dict[int, str]) -> List[ImageRecognizerResult]:
+        """
+        Filters detections by confidence and class and converts the kept ones to ImageRecognizerResult objects.
+
+        The filtering and box arithmetic are done on the whole arrays before any Python object is created.
+        Args:
+            xyxy (np.ndarray): Boxes as an (N, 4) array of x_min, y_min, x_max, y_max.
+            conf (np.ndarray): Confidence score of each box.
+            cls (np.ndarray): Class index of each box.
+            names (Dict[int, str]): Mapping from class index to entity name.
+        Returns:
+            List[ImageRecognizerResult]: The kept detections.
+        """
+        keep = conf >= self.confidence_threshold
+        if self.classes is not None:
+            class_ids = [class_id for class_id, name in names.items() if name in self.classes]
+            keep &= np.isin(cls, class_ids)
+        if not keep.any():
+            return []
+        xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+        lefts = xyxy[:, 0].astype(int).tolist()
+        tops = xyxy[:, 1].astype(int).tolist()
+        widths = (xyxy[:, 2] - xyxy[:, 0]).astype(int).tolist()
+        heights = (xyxy[:, 3] - xyxy[:, 1]).astype(int).tolist()
+        return [
+            ImageRecognizerResult(
+                entity_type=names[class_id],
                 start=0,
                 end=1,
-                score=float(score),
-                left=int(x_min),
-                top=int(y_min),
-                width=int(x_max - x_min),
-                height=int(y_max - y_min),
+                score=score,
+                left=left,
+                top=top,
+                width=width,
+                height=height,
             )
-            presidio_results.append(result)
-
-        return presidio_results
-
+            for class_id, score, left, top, width, height
+            in zip(cls.tolist(), conf.astype(float).tolist(), lefts, tops, widths, heights)
+        ]
@@ -0,0 +1,183 @@
+"""YOLO object detection on ONNX Runtime with tunable session options."""
+import ast
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import onnxruntime as ort
+from PIL import Image
+from privato.core.config import (
+    ORT_INTRA_OP_THREADS,
+    ORT_INTER_OP_THREADS,
+    ORT_GRAPH_OPTIMIZATION_LEVEL,
+    ORT_EXECUTION_PROVIDERS,
+)
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+Detections = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def quantized_model_name(model_name: str) -> str:
+    """Get the file name of the INT8 dynamic-quantized variant of an ONNX model.
+    Args:
+        model_name (str): The file name of the model, e.g. 'yolov8s.onnx'.
+    Returns:
+        str: The file name of the quantized model, e.g. 'yolov8s.int8.onnx'.
+    """
+    return f"{Path(model_name).stem}.int8.onnx"
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression.
+    Args:
+        boxes (np.ndarray): Boxes as an (N, 4) array of x_min, y_min, x_max, y_max.
+        scores (np.ndarray): Score of each box.
+        iou_threshold (float): Boxes overlapping a kept box by more than this IoU are dropped.
+    Returns:
+        np.ndarray: Indices of the kept boxes, by decreasing score.
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
+
+
+class OnnxYoloDetector:
+    """
+    Runs a YOLOv8 detection model exported to ONNX directly on ONNX Runtime.
+
+    Pre-processing (letterboxing) and post-processing (confidence filtering and NMS)
+    are done in NumPy, so the session options, threading and execution provider are
+    fully under our control.
+    Attributes:
+        names (Dict[int, str]): Mapping from class index to class name, read from the model metadata.
+    """
+    def __init__(self, model_path: str, intra_op_num_threads: int = ORT_INTRA_OP_THREADS,
+                 inter_op_num_threads: int = ORT_INTER_OP_THREADS,
+                 graph_optimization_level: str = ORT_GRAPH_OPTIMIZATION_LEVEL,
+                 providers: Optional[Sequence[str]] = None, conf_threshold: float = 0.25,
+                 iou_threshold: float = 0.7, max_detections: int = 300):
+        """Create the inference session.
+        Args:
+            model_path (str): Path to the ONNX model.
+            intra_op_num_threads (int, optional): Threads used within an operator, 0 to let ONNX Runtime decide.
+                Defaults to ORT_INTRA_OP_THREADS.
+            inter_op_num_threads (int, optional): Threads used across operators, 0 to let ONNX Runtime decide.
+                Defaults to ORT_INTER_OP_THREADS.
+            graph_optimization_level (str, optional): One of 'disable', 'basic', 'extended' or 'all'.
+                Defaults to ORT_GRAPH_OPTIMIZATION_LEVEL.
+            providers (Sequence[str], optional): Execution providers by priority. Defaults to ORT_EXECUTION_PROVIDERS.
+            conf_threshold (float, optional): Minimum confidence of a detection. Defaults to 0.25.
+            iou_threshold (float, optional): IoU threshold of the non-maximum suppression. Defaults to 0.7.
+            max_detections (int, optional): Maximum number of detections per image. Defaults to 300.
+        """
+        if graph_optimization_level not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"Unsupported graph optimization level: {graph_optimization_level}")
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = intra_op_num_threads
+        session_options.inter_op_num_threads = inter_op_num_threads
+        session_options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[graph_optimization_level]
+        self.session = ort.InferenceSession(
+            model_path, sess_options=session_options, providers=list(providers or ORT_EXECUTION_PROVIDERS)
+        )
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim, _, height, width = model_input.shape
+        self.dynamic_batch = not isinstance(batch_dim, int)
+        self.input_size = (
+            height if isinstance(height, int) else 640,
+            width if isinstance(width, int) else 640,
+        )
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+
+    def predict(self, images: List[Image.Image], batch_size: int = 1) -> List[Detections]:
+        """Detect objects in images.
+        Args:
+            images (List[Image.Image]): The input images.
+            batch_size (int, optional): Number of images per session run when the model has a dynamic batch axis.
+                Defaults to 1.
+        Returns:
+            List[Detections]: For each image, the (xyxy, conf, cls) arrays of its detections in image coordinates.
+        """
+        if not self.dynamic_batch:
+            batch_size = 1
+        detections = []
+        for start in range(0, len(images), batch_size):
+            batch = images[start:start + batch_size]
+            letterboxed = [self._letterbox(image) for image in batch]
+            inputs = np.stack([array for array, _, _ in letterboxed])
+            outputs = self.session.run(None, {self.input_name: inputs})[0]
+            for output, image, (_, gain, pad) in zip(outputs, batch, letterboxed):
+                detections.append(self._postprocess(output, gain, pad, image.size))
+        return detections
+
+    def _letterbox(self, image: Image.Image) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        """Resize an image to the model input size, keeping its aspect ratio and padding the rest.
+        Args:
+            image (Image.Image): The input image.
+        Returns:
+            Tuple[np.ndarray, float, Tuple[int, int]]: The CHW float input array, the resize gain and the (x, y) padding.
+        """
+        target_h, target_w = self.input_size
+        width, height = image.size
+        gain = min(target_w / width, target_h / height)
+        new_w, new_h = max(1, round(width * gain)), max(1, round(height * gain))
+        pad = ((target_w - new_w) // 2, (target_h - new_h) // 2)
+        canvas = Image.new("RGB", (target_w, target_h), (114, 114, 114))
+        canvas.paste(image.convert("RGB").resize((new_w, new_h), Image.BILINEAR), pad)
+        array = np.asarray(canvas, dtype=np.float32).transpose(2, 0, 1) / 255.0
+        return array, gain, pad
+
+    def _postprocess(self, output: np.ndarray, gain: float, pad: Tuple[int, int],
+                     image_size: Tuple[int, int]) -> Detections:
+        """Turn a raw YOLOv8 output of shape (4 + classes, anchors) into filtered boxes in image coordinates.
+        Args:
+            output (np.ndarray): The raw model output of one image.
+            gain (float): The letterbox resize gain.
+            pad (Tuple[int, int]): The letterbox (x, y) padding.
+            image_size (Tuple[int, int]): The (width, height) of the original image.
+        Returns:
+            Detections: The (xyxy, conf, cls) arrays of the kept detections.
+        """
+        predictions = output.T
+        class_scores = predictions[:, 4:]
+        cls = class_scores.argmax(axis=1)
+        conf = class_scores[np.arange(len(class_scores)), cls]
+        keep = conf >= self.conf_threshold
+        boxes, conf, cls = predictions[keep, :4], conf[keep], cls[keep]
+        if not len(boxes):
+            return np.empty((0, 4), dtype=np.float32), conf, cls
+
+        xyxy = np.empty_like(boxes)
+        xyxy[:, 0] = boxes[:, 0] - boxes[:, 2] / 2
+        xyxy[:, 1] = boxes[:, 1] - boxes[:, 3] / 2
+        xyxy[:, 2] = boxes[:, 0] + boxes[:, 2] / 2
+        xyxy[:, 3] = boxes[:, 1] + boxes[:, 3] / 2
+        # Offset boxes by class so that NMS never suppresses boxes of another class
+        offsets = cls[:, None].astype(np.float32) * (max(self.input_size) + 1)
+        keep = non_max_suppression(xyxy + offsets, conf, self.iou_threshold)[:self.max_detections]
+        xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad[0]) / gain).clip(0, image_size[0])
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad[1]) / gain).clip(0, image_size[1])
+        return xyxy, conf, cls
@@ -1,7 +1,10 @@
 """Module to pull models from Hugging Face Hub."""
-from privato.core.config import HUGGING_FACE_KEY
+from privato.core.config import HUGGING_FACE_KEY, MODEL_PATH, SIGNATURE_MODEL_NAME, SIGNATURE_REPO_ID
+from privato.core.config import FACE_MODEL_NAME, FACE_REPO_ID, FACE_ONNX_MODEL_NAME
+from privato.ml.onnx_detector import quantized_model_name
 from huggingface_hub import login, hf_hub_download
 import os
+import shutil
 
 if HUGGING_FACE_KEY:
     login(token=str(HUGGING_FACE_KEY))
@@ -30,3 +33,60 @@ def download_model(repo_id: str, model_filename: str, model_path: str):
     
     return model_file_path
 
+
+def export_to_onnx(model_file_path: str, onnx_filename: str) -> str:
+    """Export an Ultralytics PyTorch model to ONNX with a dynamic batch axis.
+    Args:
+        model_file_path (str): The path to the PyTorch model file.
+        onnx_filename (str): The name of the exported ONNX file, saved next to the PyTorch model.
+    Returns:
+        str: The path to the exported ONNX model file.
+    """
+    from ultralytics import YOLO
+
+    onnx_file_path = os.path.join(os.path.dirname(model_file_path), onnx_filename)
+    if not os.path.isfile(onnx_file_path):
+        print(f"Exporting {model_file_path} to ONNX...")
+        exported_path = YOLO(model_file_path, task="detect").export(format="onnx", dynamic=True)
+        if os.path.abspath(exported_path) != os.path.abspath(onnx_file_path):
+            shutil.move(exported_path, onnx_file_path)
+        print(f"Model exported to {onnx_file_path}.")
+    else:
+        print(f"ONNX model already exists at {onnx_file_path}.")
+    return onnx_file_path
+
+def quantize_model(onnx_file_path: str) -> str:
+    """Produce an INT8 dynamic-quantized variant of an ONNX model.
+    Args:
+        onnx_file_path (str): The path to the ONNX model file.
+    Returns:
+        str: The path to the quantized model file, saved next to the original.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized_file_path = os.path.join(
+        os.path.dirname(onnx_file_path), quantized_model_name(os.path.basename(onnx_file_path))
+    )
+    if not os.path.isfile(quantized_file_path):
+        print(f"Quantizing {onnx_file_path} to INT8...")
+        quantize_dynamic(onnx_file_path, quantized_file_path, weight_type=QuantType.QUInt8)
+        print(f"Quantized model saved to {quantized_file_path}.")
+    else:
+        print(f"Quantized model already exists at {quantized_file_path}.")
+    return quantized_file_path
+
+def prepare_models(model_path: str = MODEL_PATH, quantize: bool = True) -> None:
+    """Download both detectors and prepare the ONNX (and optionally INT8) files used by the ONNX Runtime backend.
+    Args:
+        model_path (str, optional): The local directory to save the models. Defaults to MODEL_PATH.
+        quantize (bool, optional): Whether to also produce the INT8 dynamic-quantized models. Defaults to True.
+    """
+    signature_path = download_model(SIGNATURE_REPO_ID, SIGNATURE_MODEL_NAME, model_path)
+    face_path = download_model(FACE_REPO_ID, FACE_MODEL_NAME, model_path)
+    face_onnx_path = export_to_onnx(face_path, FACE_ONNX_MODEL_NAME)
+    if quantize:
+        quantize_model(signature_path)
+        quantize_model(face_onnx_path)
+
+if __name__ == "__main__":
+    prepare_models()
@@ -0,0 +1,118 @@
+"""Tests for the analysis handles redeemed by the Redactor."""
+import re
+import time
+import pandas as pd
+import pytest
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer import AnonymizerEngine
+import privato.core.analyzer as analyzer_module
+from privato.core.analysis_store import AnalysisMismatchError, AnalysisNotFoundError, AnalysisStore
+from privato.core.analyzer import Analyzer
+from privato.core.analyzer_engine import CustomAnalyzerEngine
+from privato.core.cache import ResultCache
+from privato.core.redactor import Redactor
+
+
+class _NameEngine(CustomAnalyzerEngine):
+    """An engine finding the name 'Jane' without an NLP model."""
+    def __init__(self):
+        pass
+
+    def analyze(self, text, language, entities=None, **kwargs):
+        return [RecognizerResult("PERSON", match.start(), match.end(), 0.85) for match in re.finditer("Jane", text)]
+
+    def analyze_batch(self, texts, language, entities=None, **kwargs):
+        return [self.analyze(text, language) for text in texts]
+
+
+class _Registry:
+    """A registry handing out engines that need no models."""
+    def get_analyzer_engine(self):
+        return _NameEngine()
+
+    def get_image_analyzer_engine(self):
+        return object()
+
+    def get_anonymizer_engine(self):
+        return AnonymizerEngine()
+
+
+@pytest.fixture
+def store():
+    return AnalysisStore(ttl=None)
+
+
+@pytest.fixture
+def analyzer(store):
+    return Analyzer(registry=_Registry(), analysis_store=store, use_cache=False, incremental_text=False)
+
+
+@pytest.fixture
+def redactor(store):
+    return Redactor(registry=_Registry(), analysis_store=store, use_cache=False, incremental_text=False)
+
+
+def test_store_put_and_get():
+    store = AnalysisStore(ttl=None)
+    handle = store.put(["result"], data_type="text", fingerprint="hash")
+    stored = store.get(handle)
+    assert (stored.analysis, stored.data_type, stored.fingerprint) == (["result"], "text", "hash")
+
+
+def test_store_unknown_handle():
+    with pytest.raises(AnalysisNotFoundError):
+        AnalysisStore().get("missing")
+
+
+def test_store_entries_expire():
+    store = AnalysisStore(ttl=0)
+    handle = store.put([], data_type="text", fingerprint="hash")
+    time.sleep(0.01)
+    with pytest.raises(AnalysisNotFoundError):
+        store.get(handle)
+
+
+def test_store_evicts_the_oldest_entries():
+    store = AnalysisStore(ttl=None, max_entries=2)
+    first, second, third = (store.put([], data_type="text", fingerprint=str(i)) for i in range(3))
+    with pytest.raises(AnalysisNotFoundError):
+        store.get(first)
+    assert store.get(second).fingerprint == "1"
+    assert store.get(third).fingerprint == "2"
+
+
+def test_handle_redacts_without_analyzing_again(analyzer, redactor, monkeypatch):
+    analysis, handle = analyzer.analyze_with_handle("Hello Jane", data_type="text")
+    assert [(result["start"], result["end"]) for result in analysis] == [(6, 10)]
+    monkeypatch.setattr(redactor.analyzer_engine, "analyze", lambda *args, **kwargs: pytest.fail("analyzed again"))
+    assert redactor.redact("Hello Jane", data_type="text", analysis=handle)["text"] == "Hello <PERSON>"
+
+
+def test_handle_rejects_other_content(analyzer, redactor):
+    _, handle = analyzer.analyze_with_handle("Hello Jane", data_type="text")
+    with pytest.raises(AnalysisMismatchError):
+        redactor.redact("Hello Bob", data_type="text", analysis=handle)
+    with pytest.raises(AnalysisMismatchError):
+        redactor.redact({"name": "Hello Jane"}, data_type="json", analysis=handle)
+
+
+def test_handle_content_is_hashed_once(store, monkeypatch):
+    calls = []
+    real_fingerprint = analyzer_module.try_fingerprint
+    monkeypatch.setattr(analyzer_module, "try_fingerprint", lambda *args: calls.append(args) or real_fingerprint(*args))
+    analyzer = Analyzer(registry=_Registry(), analysis_store=store, cache=ResultCache(disk_path=None),
+                        incremental_text=False)
+    _, handle = analyzer.analyze_with_handle("Hello Jane", data_type="text")
+    assert len(calls) == 1
+    assert store.get(handle).fingerprint == real_fingerprint("Hello Jane", "text")
+
+
+def test_handle_of_unhashable_content(analyzer, redactor):
+    # Cells holding lists cannot be hashed, so the analysis is only checked by its data type
+    df = pd.DataFrame({"name": ["Jane", "Jane"], "tags": [["a"], ["b"]]})
+    analysis, handle = analyzer.analyze_with_handle(df, data_type="df")
+    assert analyzer.analysis_store.get(handle).fingerprint is None
+    redacted = redactor.redact(df, data_type="df", analysis=handle)
+    assert redacted["tags"].tolist() == [["a"], ["b"]]
+    with pytest.raises(AnalysisMismatchError):
+        redactor.redact("Jane", data_type="text", analysis=handle)
@@ -0,0 +1,46 @@
+"""Tests for the incremental analysis of large texts."""
+import re
+from typing import List
+from presidio_analyzer import RecognizerResult
+from privato.core.analyzer_engine import CustomAnalyzerEngine
+from privato.core.cache import ResultCache
+
+
+class _CountingEngine(CustomAnalyzerEngine):
+    """An engine finding the name 'Jane' without an NLP model, recording the texts it analyzes."""
+    def __init__(self):
+        self.analyzed: List[str] = []
+
+    def analyze_batch(self, texts, language, entities=None, **kwargs):
+        self.analyzed.extend(texts)
+        return [
+            [RecognizerResult("PERSON", match.start(), match.end(), 0.85) for match in re.finditer("Jane", text)]
+            for text in texts
+        ]
+
+
+def test_analyze_incremental_offsets_are_in_the_whole_text():
+    engine = _CountingEngine()
+    text = "Hello Jane.\n\nNothing here.\n\nBye Jane."
+    results = engine.analyze_incremental(text, language="en", cache=ResultCache(disk_path=None))
+    assert [text[result.start:result.end] for result in results] == ["Jane", "Jane"]
+
+
+def test_analyze_incremental_reuses_cached_paragraphs():
+    engine = _CountingEngine()
+    cache = ResultCache(disk_path=None)
+    engine.analyze_incremental("Hello Jane.\n\nSame paragraph.\n\nSame paragraph.", language="en", cache=cache)
+    # A repeated paragraph is analyzed once
+    assert engine.analyzed == ["Hello Jane.", "Same paragraph."]
+    engine.analyzed.clear()
+    results = engine.analyze_incremental("Hello Jane.\n\nA new paragraph.", language="en", cache=cache)
+    assert engine.analyzed == ["A new paragraph."]
+    assert [(result.start, result.end) for result in results] == [(6, 10)]
+
+
+def test_analyze_incremental_cache_depends_on_language():
+    engine = _CountingEngine()
+    cache = ResultCache(disk_path=None)
+    engine.analyze_incremental("Hello Jane.", language="en", cache=cache)
+    engine.analyze_incremental("Hello Jane.", language="de", cache=cache)
+    assert engine.analyzed == ["Hello Jane.", "Hello Jane."]
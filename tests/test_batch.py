@@ -0,0 +1,81 @@
+"""Tests for the helpers of the batch endpoints."""
+import asyncio
+import io
+import json
+import zipfile
+import pytest
+from fastapi import HTTPException, UploadFile
+from privato.app.batch import _member_name, _read_window, iter_zip, read_uploads
+from privato.core.ingestion import Ingestor
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def _read(files, tmp_path, **limits):
+    uploads = [UploadFile(io.BytesIO(content), filename=filename) for filename, content in files]
+    return asyncio.run(read_uploads(uploads, Ingestor(), tmp_path, **limits))
+
+
+def test_member_name_strips_parent_and_root_components():
+    used = set()
+    assert _member_name("../../etc/passwd.txt", ".txt", used) == "etc/passwd.txt"
+    assert _member_name("/abs/scan.png", ".pdf", used) == "abs/scan.pdf"
+    assert _member_name("C:\\Users\\jane\\photo.jpg", ".png", used) == "Users/jane/photo.png"
+    assert _member_name("..", ".txt", used) == "file.txt"
+
+
+def test_member_name_numbers_duplicates():
+    used = {"errors.json"}
+    assert _member_name("a.txt", ".txt", used) == "a.txt"
+    assert _member_name("./a.txt", ".txt", used) == "a_1.txt"
+    assert _member_name("a.txt", ".txt", used) == "a_2.txt"
+    assert _member_name("errors.json", ".json", used) == "errors_1.json"
+
+
+def test_read_uploads_lists_supported_archive_members(tmp_path):
+    archive = _zip({"docs/a.txt": "Hello Jane", "b.json": "{}", "notes.xyz": "skipped"})
+    entries = _read([("first.txt", b"Hello"), ("archive.zip", archive)], tmp_path)
+    assert [entry.filename for entry in entries] == ["first.txt", "docs/a.txt", "b.json"]
+    assert entries[0].member is None
+    assert _read_window(entries) == [("first.txt", b"Hello"), ("docs/a.txt", b"Hello Jane"), ("b.json", b"{}")]
+
+
+def test_read_uploads_limits_the_file_count(tmp_path):
+    archive = _zip({f"{i}.txt": "x" for i in range(3)})
+    with pytest.raises(HTTPException) as error:
+        _read([("first.txt", b"x"), ("archive.zip", archive)], tmp_path, max_files=3)
+    assert error.value.status_code == 413
+
+
+def test_read_uploads_counts_archive_members_uncompressed(tmp_path):
+    archive = _zip({"zeros.txt": "0" * 10_000})
+    assert len(archive) < 1_000
+    with pytest.raises(HTTPException) as error:
+        _read([("archive.zip", archive)], tmp_path, max_bytes=5_000)
+    assert error.value.status_code == 413
+
+
+def test_read_uploads_rejects_unreadable_archives(tmp_path):
+    with pytest.raises(HTTPException) as error:
+        _read([("archive.zip", b"not a zip")], tmp_path)
+    assert error.value.status_code == 400
+
+
+def test_iter_zip_names_files_and_lists_errors():
+    async def outcomes():
+        yield [{"filename": "../a.txt", "extension": ".json", "content": b"{}"}]
+        yield [{"filename": "a.json", "extension": ".json", "content": b"[]"}, {"filename": "b.png", "error": "boom"}]
+
+    async def collect():
+        return b"".join([chunk async for chunk in iter_zip(outcomes())])
+
+    with zipfile.ZipFile(io.BytesIO(asyncio.run(collect()))) as archive:
+        assert archive.namelist() == ["a.json", "a_1.json", "errors.json"]
+        assert archive.read("a_1.json") == b"[]"
+        assert json.loads(archive.read("errors.json")) == [{"filename": "b.png", "error": "boom"}]
@@ -0,0 +1,136 @@
+"""Tests for the content-addressed result cache."""
+import re
+import sqlite3
+from PIL import Image
+from presidio_analyzer import RecognizerResult
+from privato.core.analysis_store import AnalysisStore
+from privato.core.analyzer import Analyzer
+from privato.core.analyzer_engine import CustomAnalyzerEngine
+from privato.core.cache import ResultCache
+
+
+def test_make_key_depends_on_every_part():
+    key = ResultCache.make_key("hash", "analyze", "text", "en")
+    assert key == ResultCache.make_key("hash", "analyze", "text", "en")
+    assert key != ResultCache.make_key("other", "analyze", "text", "en")
+    assert key != ResultCache.make_key("hash", "redact", "text", "en")
+    assert key != ResultCache.make_key("hash", "analyze", "text", "de")
+    assert key != ResultCache.make_key("hash", "analyze", "text", "en", entities=["PERSON"])
+    assert key != ResultCache.make_key("hash", "analyze", "text", "en", download=True)
+
+
+def test_memory_tier_evicts_least_recently_used_entries():
+    cache = ResultCache(max_entries=2, disk_path=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_memory_tier_evicts_by_size():
+    cache = ResultCache(max_entries=100, max_bytes=250, disk_path=None)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"x" * 100)
+    cache.put("c", b"x" * 100)
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+
+
+def test_memory_tier_skips_results_larger_than_the_budget():
+    cache = ResultCache(max_entries=100, max_bytes=250, disk_path=None)
+    cache.put("a", b"x" * 100)
+    cache.put("big", b"x" * 1000)
+    assert cache.get("big") is None
+    assert cache.get("a") is not None
+
+
+def test_hits_are_copies():
+    cache = ResultCache(disk_path=None)
+    result = [{"entity_type": "PERSON", "start": 0, "end": 4}]
+    cache.put("a", result)
+    result.clear()
+    hit = cache.get("a")
+    hit[0]["start"] = 10
+    assert cache.get("a") == [{"entity_type": "PERSON", "start": 0, "end": 4}]
+    image = Image.new("RGB", (4, 4))
+    cache.put("img", image)
+    cache.get("img").paste((255, 0, 0), (0, 0, 4, 4))
+    assert cache.get("img").getpixel((0, 0)) == (0, 0, 0)
+
+
+def test_unpicklable_results_are_not_cached():
+    cache = ResultCache(disk_path=None)
+    cache.put("a", lambda: None)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_evicts_least_recently_used_rows(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ResultCache(max_entries=0, disk_path=path, disk_max_bytes=400)
+    for key in "abcde":
+        cache.put(key, b"x" * 100)
+    db = sqlite3.connect(str(path))
+    keys = [row[0] for row in db.execute("SELECT key FROM results ORDER BY accessed")]
+    total = db.execute("SELECT total FROM results_size").fetchone()[0]
+    assert keys[-1] == "e"
+    assert "a" not in keys
+    assert total == db.execute("SELECT SUM(size) FROM results").fetchone()[0] <= 400
+
+
+def test_disk_tier_is_shared_and_cleared(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    ResultCache(max_entries=0, disk_path=path).put("a", {"text": "redacted"})
+    cache = ResultCache(max_entries=0, disk_path=path)
+    assert cache.get("a") == {"text": "redacted"}
+    cache.clear()
+    assert cache.get("a") is None
+
+
+class _NameEngine(CustomAnalyzerEngine):
+    """An engine finding the name 'Jane' without an NLP model."""
+    def __init__(self):
+        pass
+
+    def analyze(self, text, language, entities=None, **kwargs):
+        return [RecognizerResult("PERSON", match.start(), match.end(), 0.85) for match in re.finditer("Jane", text)]
+
+
+class _Registry:
+    """A registry handing out engines that need no models."""
+    def get_analyzer_engine(self):
+        return _NameEngine()
+
+    def get_image_analyzer_engine(self):
+        return object()
+
+
+def _analyzer(cache, incremental_text=False):
+    return Analyzer(registry=_Registry(), analysis_store=AnalysisStore(), cache=cache, incremental_text=incremental_text)
+
+
+def test_analyzer_key_depends_on_incremental_text():
+    cache = ResultCache(disk_path=None)
+    whole, incremental = _analyzer(cache), _analyzer(cache, incremental_text=True)
+    assert whole._cache_key("Hello Jane", "text", "en", None) != incremental._cache_key("Hello Jane", "text", "en", None)
+
+
+def test_analyzer_reports_progress_on_cache_hits():
+    analyzer = _analyzer(ResultCache(disk_path=None))
+    pages = [Image.new("RGB", (4, 4)), Image.new("RGB", (4, 4), "white")]
+
+    def analyze_pages(images, progress=None, **kwargs):
+        for done in range(1, len(images) + 1):
+            progress(done, len(images))
+        return [[] for _ in images]
+
+    analyzer._handler_map["imgs"] = analyze_pages
+    reported = []
+    analyzer.analyze(pages, data_type="imgs", progress=lambda done, total: reported.append((done, total)))
+    assert reported[-1] == (2, 2)
+    reported.clear()
+    analyzer.analyze(pages, data_type="imgs", progress=lambda done, total: reported.append((done, total)))
+    assert reported == [(2, 2)]
@@ -0,0 +1,88 @@
+"""Tests for the store of background jobs."""
+import time
+import pytest
+from privato.core.jobs import JobStore
+
+
+@pytest.fixture
+def job_store(tmp_path):
+    return JobStore(tmp_path / "jobs", ttl=3600)
+
+
+def test_create_queues_a_job(job_store):
+    job = job_store.create("redact", filename="report.PDF", language="de")
+    assert job.status == "queued"
+    assert job.language == "de"
+    assert job.pages_done == 0 and job.pages_total is None
+    assert job_store.job_dir(job.id).is_dir()
+    assert job_store.input_path(job).name == "input.pdf"
+    assert job_store.result_path(job) is None
+
+
+def test_create_rejects_unknown_operations(job_store):
+    with pytest.raises(ValueError):
+        job_store.create("translate", filename="a.txt")
+
+
+def test_get_unknown_job(job_store):
+    with pytest.raises(KeyError):
+        job_store.get("missing")
+
+
+def test_job_lifecycle(job_store):
+    job = job_store.create("analyze", filename="a.pdf")
+    job_store.set_running(job.id)
+    assert job_store.get(job.id).status == "running"
+    job_store.set_progress(job.id, 3, 10)
+    running = job_store.get(job.id)
+    assert (running.pages_done, running.pages_total) == (3, 10)
+    job_store.set_done(job.id, "result.json")
+    done = job_store.get(job.id)
+    assert done.status == "done"
+    assert job_store.result_path(done) == job_store.job_dir(job.id) / "result.json"
+    assert done.updated_at >= done.created_at
+
+
+def test_failed_job_is_rerun_from_scratch(job_store):
+    job = job_store.create("redact", filename="a.txt")
+    job_store.set_running(job.id)
+    job_store.set_progress(job.id, 2, 5)
+    job_store.set_failed(job.id, "boom")
+    failed = job_store.get(job.id)
+    assert (failed.status, failed.error) == ("failed", "boom")
+    job_store.set_running(job.id)
+    rerun = job_store.get(job.id)
+    assert (rerun.status, rerun.error, rerun.pages_done) == ("running", None, 0)
+
+
+def test_unfinished_lists_queued_and_running_jobs(job_store):
+    queued = job_store.create("redact", filename="a.txt")
+    running = job_store.create("redact", filename="b.txt")
+    done = job_store.create("redact", filename="c.txt")
+    job_store.set_running(running.id)
+    job_store.set_done(done.id, "result.json")
+    assert [job.id for job in job_store.unfinished()] == [queued.id, running.id]
+
+
+def test_purge_expired_removes_only_finished_jobs(tmp_path):
+    job_store = JobStore(tmp_path / "jobs", ttl=0)
+    queued = job_store.create("redact", filename="a.txt")
+    running = job_store.create("redact", filename="b.txt")
+    done = job_store.create("redact", filename="c.txt")
+    failed = job_store.create("redact", filename="d.txt")
+    job_store.set_running(running.id)
+    job_store.set_done(done.id, "result.json")
+    job_store.set_failed(failed.id, "boom")
+    time.sleep(0.01)
+    assert job_store.purge_expired() == 2
+    assert not job_store.job_dir(done.id).exists()
+    with pytest.raises(KeyError):
+        job_store.get(failed.id)
+    assert {job.id for job in job_store.unfinished()} == {queued.id, running.id}
+
+
+def test_purge_expired_keeps_recently_finished_jobs(job_store):
+    job = job_store.create("redact", filename="a.txt")
+    job_store.set_done(job.id, "result.json")
+    assert job_store.purge_expired() == 0
+    assert job_store.get(job.id).status == "done"
@@ -0,0 +1,95 @@
+"""Tests for the vector redaction of PDF documents."""
+import fitz
+import pytest
+from presidio_anonymizer import AnonymizerEngine
+from presidio_image_redactor.entities import ImageRecognizerResult
+from privato.core.analysis_store import AnalysisStore
+from privato.core.converter import PDFPages
+from privato.core.redactor import Redactor
+
+DPI = 144
+
+
+def _pdf(*texts, rotation=0):
+    with fitz.open() as pdf:
+        for text in texts:
+            page = pdf.new_page()
+            page.insert_text((72, 100), text, fontsize=14)
+            page.set_rotation(rotation)
+        return pdf.tobytes()
+
+
+def _page_texts(pdf_bytes):
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        return [page.get_text().split() for page in pdf]
+
+
+def _word_boxes(pages, word):
+    """The boxes of a word on each page, in rendered image coordinates, taken from the text layer."""
+    boxes = []
+    for _, text_layer in pages.iter_pages():
+        boxes.append([
+            ImageRecognizerResult("PERSON", 0, len(word), 0.9, text_layer["left"][i], text_layer["top"][i],
+                                  text_layer["width"][i], text_layer["height"][i])
+            for i, text in enumerate(text_layer["text"]) if text == word
+        ])
+    return boxes
+
+
+@pytest.mark.parametrize("rotation", [0, 90])
+def test_pdf_pages_redact_removes_the_text_under_the_boxes(rotation):
+    pages = PDFPages(_pdf("Hello Jane Doe from Berlin", "Nothing to redact on this page", rotation=rotation), dpi=DPI)
+    redacted = pages.redact(_word_boxes(pages, "Jane"))
+    # The text layer is kept, without the redacted word
+    assert _page_texts(redacted) == [["Hello", "Doe", "from", "Berlin"], ["Nothing", "to", "redact", "on", "this", "page"]]
+
+
+class _JaneImageAnalyzer:
+    """An image analyzer boxing the word 'Jane' found in the text layer of the pages."""
+    def iter_analyze_pages(self, pages, language, max_workers=None):
+        for image, text_layer in pages:
+            yield image, [
+                ImageRecognizerResult("PERSON", 0, 4, 0.9, text_layer["left"][i], text_layer["top"][i],
+                                      text_layer["width"][i], text_layer["height"][i])
+                for i, text in enumerate(text_layer["text"]) if text == "Jane"
+            ]
+
+
+class _Registry:
+    """A registry handing out engines that need no models."""
+    def get_analyzer_engine(self):
+        return None
+
+    def get_image_analyzer_engine(self):
+        return _JaneImageAnalyzer()
+
+    def get_anonymizer_engine(self):
+        return AnonymizerEngine()
+
+
+@pytest.fixture
+def redactor():
+    return Redactor(registry=_Registry(), pdf_redaction_mode="vector", analysis_store=AnalysisStore(),
+                    use_cache=False, incremental_text=False)
+
+
+def test_vector_mode_redacts_the_original_document(redactor):
+    pages = PDFPages(_pdf("Hello Jane Doe from Berlin", "Jane called again today"), dpi=DPI)
+    reported = []
+    redacted = redactor.redact(pages, data_type="imgs", progress=lambda done, total: reported.append((done, total)))
+    assert isinstance(redacted, bytes)
+    assert _page_texts(redacted) == [["Hello", "Doe", "from", "Berlin"], ["called", "again", "today"]]
+    assert reported == [(1, 2), (2, 2)]
+
+
+def test_vector_mode_with_a_precomputed_analysis(redactor):
+    pages = PDFPages(_pdf("Hello Jane Doe from Berlin"), dpi=DPI)
+    analysis = [[result.to_dict() for result in page] for page in _word_boxes(pages, "Jane")]
+    redacted = redactor.redact(pages, data_type="imgs", analysis=analysis)
+    assert _page_texts(redacted) == [["Hello", "Doe", "from", "Berlin"]]
+
+
+def test_vector_mode_rejects_an_analysis_of_another_page_count(redactor):
+    pages = PDFPages(_pdf("Hello Jane Doe from Berlin", "The second page"), dpi=DPI)
+    with pytest.raises(ValueError):
+        redactor.redact(pages, data_type="imgs", analysis=[[]])
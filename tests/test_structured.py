@@ -0,0 +1,132 @@
+"""Tests for the DataFrame redactor and the JSON helpers."""
+import hashlib
+import io
+import json
+import re
+import pandas as pd
+import pytest
+from presidio_analyzer import RecognizerResult
+from privato.core.analyzer_engine import CustomAnalyzerEngine
+from privato.core.structured import (
+    DataFrameRedactor,
+    JsonAnalyzer,
+    iter_json_array,
+    iter_json_lines,
+    iter_json_strings,
+    json_path_key,
+    map_json_strings,
+)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "name": ["Jane", "Bob", None, "Jane"],
+        "age": [30, 40, 50, 60],
+    })
+
+
+def test_dataframe_redactor_replace(df):
+    redacted = DataFrameRedactor(default_operator="replace").redact(df, {"name": "PERSON"})
+    assert redacted["name"].tolist()[:2] == ["<PERSON>", "<PERSON>"]
+    assert pd.isna(redacted["name"][2])
+    assert redacted["age"].tolist() == df["age"].tolist()
+    # The input is not modified
+    assert df["name"][0] == "Jane"
+
+
+def test_dataframe_redactor_mask(df):
+    redacted = DataFrameRedactor(default_operator="mask", mask_char="#").redact(df, {"name": "PERSON"})
+    assert redacted["name"][0] == "####"
+    assert redacted["name"][1] == "###"
+    assert pd.isna(redacted["name"][2])
+
+
+def test_dataframe_redactor_hash(df):
+    redacted = DataFrameRedactor(default_operator="hash", hash_salt="salt").redact(df, {"name": "PERSON"})
+    assert redacted["name"][0] == hashlib.sha256(b"saltJane").hexdigest()
+    assert redacted["name"][0] == redacted["name"][3]
+    assert redacted["name"][0] != redacted["name"][1]
+    assert pd.isna(redacted["name"][2])
+
+
+def test_dataframe_redactor_operator_per_entity_type(df):
+    redactor = DataFrameRedactor(operators={"PERSON": "mask"}, default_operator="replace")
+    redacted = redactor.redact(df, {"name": "PERSON", "age": "AGE"})
+    assert redacted["name"][0] == "****"
+    assert redacted["age"].tolist() == ["<AGE>"] * 4
+
+
+def test_dataframe_redactor_ignores_unknown_columns(df):
+    redacted = DataFrameRedactor().redact(df, {"missing": "PERSON"})
+    assert redacted.equals(df)
+
+
+def test_dataframe_redactor_rejects_unknown_operators():
+    with pytest.raises(ValueError):
+        DataFrameRedactor(default_operator="encrypt")
+    with pytest.raises(ValueError):
+        DataFrameRedactor(operators={"PERSON": "encrypt"})
+    with pytest.raises(ValueError):
+        DataFrameRedactor(mask_char="##")
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 2, 3, 7, 64])
+def test_iter_json_array_values_cut_at_chunk_boundaries(chunk_chars):
+    items = [12345, -1.5e10, "a string, with [brackets]", {"name": "Jane", "ids": [1, 22, 333]}, True, None, []]
+    stream = io.StringIO(json.dumps(items, indent=2))
+    assert list(iter_json_array(stream, chunk_chars=chunk_chars)) == items
+
+
+def test_iter_json_array_number_at_the_end_of_a_chunk():
+    # The first chunk ends in the middle of the number, which must not be read as 12
+    assert list(iter_json_array(io.StringIO("[12345, 6]"), chunk_chars=3)) == [12345, 6]
+
+
+def test_iter_json_array_empty():
+    assert list(iter_json_array(io.StringIO("  [ ]  "), chunk_chars=2)) == []
+
+
+def test_iter_json_array_rejects_non_arrays():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"a": 1}')))
+
+
+def test_iter_json_array_rejects_truncated_arrays():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[1, {"a": '), chunk_chars=4))
+
+
+def test_iter_json_lines_skips_blank_lines():
+    stream = io.StringIO('{"a": 1}\n\n  \n[2]\n')
+    assert list(iter_json_lines(stream)) == [{"a": 1}, [2]]
+
+
+def test_iter_json_strings_and_map_json_strings():
+    data = {"users": [{"name": "Jane", "age": 30}, {"name": "Bob", "tags": ["a"]}]}
+    assert list(iter_json_strings(data)) == [
+        (("users", 0, "name"), "Jane"), (("users", 1, "name"), "Bob"), (("users", 1, "tags", 0), "a"),
+    ]
+    upper = map_json_strings(data, lambda path, value: value.upper())
+    assert upper == {"users": [{"name": "JANE", "age": 30}, {"name": "BOB", "tags": ["A"]}]}
+    assert data["users"][0]["name"] == "Jane"
+    assert json_path_key(("users", 1, "tags", 0)) == "users.tags"
+
+
+class _NameEngine(CustomAnalyzerEngine):
+    """An engine finding the names 'Jane' and 'Bob' without an NLP model."""
+    def __init__(self):
+        pass
+
+    def analyze_batch(self, texts, language, entities=None, **kwargs):
+        return [
+            [RecognizerResult("PERSON", match.start(), match.end(), 0.85) for match in re.finditer("Jane|Bob", text)]
+            for text in texts
+        ]
+
+
+def test_json_analyzer_maps_fields_to_their_dominant_entity_type():
+    data = {"users": [{"name": "Jane", "note": "hi"}, {"name": "Bob", "note": "Jane called"}, {"name": "x", "note": "ok"}]}
+    analysis = JsonAnalyzer(_NameEngine(), threshold=0.5).analyze(data)
+    # 'users.note' holds a name in one leaf out of three, under the threshold
+    assert analysis == {"entity_mapping": {"users.name": "PERSON"}}
@@ -0,0 +1,104 @@
+"""Tests for the splitting of large texts and the recombination of their results."""
+import pytest
+from presidio_analyzer import RecognizerResult
+from privato.core.text_chunking import merge_window_results, shift_results, split_paragraphs, split_windows
+
+
+def test_split_paragraphs_keeps_offsets():
+    text = "First paragraph.\n\n\nSecond one.\n  \nThird."
+    chunks = split_paragraphs(text)
+    assert [chunk for _, chunk in chunks] == ["First paragraph.", "Second one.", "Third."]
+    for start, chunk in chunks:
+        assert text[start:start + len(chunk)] == chunk
+
+
+def test_split_paragraphs_splits_long_paragraphs_into_lines():
+    text = "a" * 8 + "\n" + "b" * 8
+    assert split_paragraphs(text, max_chars=10) == [(0, "a" * 8), (9, "b" * 8)]
+
+
+def test_shift_results_moves_offsets_to_the_document():
+    results = [{"entity_type": "PERSON", "start": 2, "end": 6, "score": 0.85}]
+    shifted = shift_results(results, offset=100)
+    assert len(shifted) == 1
+    assert isinstance(shifted[0], RecognizerResult)
+    assert (shifted[0].entity_type, shifted[0].start, shifted[0].end, shifted[0].score) == ("PERSON", 102, 106, 0.85)
+
+
+def test_split_windows_covers_the_text_with_overlaps():
+    text = " ".join(f"Sentence number {i} is here." for i in range(200))
+    windows = split_windows(text, window_chars=500, overlap_chars=100)
+    assert len(windows) > 1
+    assert windows[0][0] == 0
+    assert windows[-1][0] + len(windows[-1][1]) == len(text)
+    for start, window in windows:
+        assert len(window) <= 500
+        assert text[start:start + len(window)] == window
+    for (start, window), (next_start, _) in zip(windows, windows[1:]):
+        # Consecutive windows overlap, so no part of the text is left out
+        assert start < next_start <= start + len(window)
+
+
+def test_split_windows_cuts_at_sentence_boundaries():
+    text = " ".join(f"Sentence number {i} is here." for i in range(200))
+    for start, window in split_windows(text, window_chars=500, overlap_chars=100)[1:]:
+        assert window.startswith("Sentence")
+
+
+def test_split_windows_short_text_is_one_window():
+    assert split_windows("Short text.", window_chars=100, overlap_chars=10) == [(0, "Short text.")]
+
+
+def test_split_windows_rejects_large_overlap():
+    with pytest.raises(ValueError):
+        split_windows("text", window_chars=100, overlap_chars=50)
+
+
+def test_merge_window_results_drops_duplicates_from_the_overlap():
+    # Two windows [0, 100) and [80, 180); the entity at 85-95 is found by both
+    window_results = [
+        (0, 100, [RecognizerResult("PERSON", 85, 95, 0.8)]),
+        (80, 100, [RecognizerResult("PERSON", 5, 15, 0.8)]),
+    ]
+    merged = merge_window_results(window_results)
+    assert [(r.entity_type, r.start, r.end) for r in merged] == [("PERSON", 85, 95)]
+
+
+def test_merge_window_results_drops_entities_cut_by_a_window_edge():
+    # The first window sees a truncated entity ending at its edge, the second sees it whole
+    window_results = [
+        (0, 100, [RecognizerResult("PERSON", 90, 100, 0.6)]),
+        (80, 100, [RecognizerResult("PERSON", 10, 25, 0.6)]),
+    ]
+    merged = merge_window_results(window_results)
+    assert [(r.start, r.end) for r in merged] == [(90, 105)]
+
+
+def test_merge_window_results_keeps_overlapping_entities_of_different_types():
+    window_results = [
+        (0, 100, [RecognizerResult("PERSON", 10, 20, 0.9), RecognizerResult("LOCATION", 15, 25, 0.7)]),
+    ]
+    merged = merge_window_results(window_results)
+    assert [r.entity_type for r in merged] == ["PERSON", "LOCATION"]
+
+
+def test_merge_window_results_keeps_the_best_of_overlapping_entities_of_a_type():
+    window_results = [
+        (0, 100, [
+            RecognizerResult("PERSON", 12, 30, 0.5),
+            RecognizerResult("PERSON", 10, 20, 0.9),
+            RecognizerResult("PERSON", 25, 35, 0.9),
+            RecognizerResult("PERSON", 40, 50, 0.4),
+        ]),
+    ]
+    merged = merge_window_results(window_results)
+    assert [(r.start, r.end, r.score) for r in merged] == [(10, 20, 0.9), (25, 35, 0.9), (40, 50, 0.4)]
+
+
+def test_merge_window_results_many_entities():
+    # Every entity is found by both windows of its overlap
+    first = [RecognizerResult("PERSON", i * 10, i * 10 + 5, 0.8) for i in range(20_000)]
+    second = [RecognizerResult("PERSON", i * 10, i * 10 + 5, 0.8) for i in range(10_000)]
+    merged = merge_window_results([(0, 200_000, first), (100_000, 200_000, second)])
+    assert len(merged) == 20_000
+    assert all(a.end <= b.start for a, b in zip(merged, merged[1:]))
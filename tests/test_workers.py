@@ -0,0 +1,95 @@
+"""Tests for the inference pool and the single-file routes running in it."""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from privato.app.api.routes.analyzer import router as analyzer_router
+from privato.app.api.routes.redactor import router as redactor_router
+from privato.app.dependencies import get_inference_pool
+from privato.core.workers import InferencePool, WorkerCrashedError, WorkerPoolFullError
+
+
+class _ThreadPool(InferencePool):
+    """A pool running tasks in a thread, without building engines."""
+    def _make_executor(self):
+        return ThreadPoolExecutor(max_workers=1)
+
+
+class _ProcessPool(InferencePool):
+    """A pool of spawned processes, without building engines."""
+    def _make_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def test_run_fails_at_once_when_the_queue_is_full():
+    pool = _ThreadPool(workers=0, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(WorkerPoolFullError):
+            await pool.run(os.getpid)
+        release.set()
+        assert await busy is True
+        # The slot of the finished task is free again
+        assert await pool.run(os.getpid) == os.getpid()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_run_restarts_the_pool_when_a_worker_dies():
+    pool = _ProcessPool(workers=1, max_queue=1)
+
+    async def scenario():
+        with pytest.raises(WorkerCrashedError):
+            await pool.run(os._exit, 1)
+        # The broken workers were replaced, so the next task runs
+        assert await pool.run(os.getpid) != os.getpid()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+
+class _FullPool:
+    """A pool whose queue is always full, recording the spooled uploads it was given."""
+    def __init__(self):
+        self.uploads = []
+
+    async def run(self, func, path, **kwargs):
+        self.uploads.append((path, path.read_bytes()))
+        raise WorkerPoolFullError("All inference workers are busy and the queue is full.")
+
+
+@pytest.fixture
+def client_and_pool():
+    app = FastAPI()
+    app.include_router(analyzer_router)
+    app.include_router(redactor_router)
+    pool = _FullPool()
+    app.dependency_overrides[get_inference_pool] = lambda: pool
+    return TestClient(app), pool
+
+
+@pytest.mark.parametrize("url", ["/analyzer/upload_file", "/redactor/upload_file"])
+def test_upload_is_spooled_and_a_full_pool_answers_503(client_and_pool, url):
+    client, pool = client_and_pool
+    response = client.post(url, files={"file": ("Note.TXT", b"Hello Jane", "text/plain")})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    [(path, content)] = pool.uploads
+    assert isinstance(path, Path) and path.suffix == ".txt"
+    assert content == b"Hello Jane"
+    # The spooled upload is removed once the request is answered
+    assert not path.exists()